@@ -0,0 +1,65 @@
+import datetime
+from typing import Callable, Optional, TypedDict
+
+from background_io import call_now
+from progress_backend import add_answer_events
+from settings import ANSWER_BATCH_SIZE
+
+
+class Answer(TypedDict):
+    question_id: int
+    is_right: bool
+    answered_at: datetime.datetime
+    response_time: Optional[int]
+
+
+class AnswerLog:
+    """Class collecting answers of the interview
+    and writing them to DB in batches.
+    Listeners get every answer at once, before it is written.
+    A batch is written by write(function, *args), which may
+    run it in a worker.
+    """
+
+    def __init__(self, batch_size: int = ANSWER_BATCH_SIZE,
+                 write: Callable[..., None] = call_now) -> None:
+        self.batch_size = batch_size
+        self.write = write
+        self.user_name: Optional[str] = None
+        self.answers: list[Answer] = []
+        self.listeners: list[Callable[[str, int, bool], None]] = []
+
+    def subscribe(self, listener: Callable[[str, int, bool], None]) -> None:
+        """Calls the listener with the user, question and result
+        of every answer.
+        """
+        self.listeners.append(listener)
+
+    def start(self, user_name: Optional[str]) -> None:
+        """Begins collecting answers of the user."""
+        self.flush()
+        self.user_name = user_name
+
+    def add(self, question_id: int, is_right: bool,
+            response_time: Optional[int] = None) -> None:
+        """Remembers the answer, writes the batch when it is full."""
+        if not self.user_name:
+            return
+        self.answers.append(
+            Answer(
+                question_id=question_id,
+                is_right=is_right,
+                answered_at=datetime.datetime.now(),
+                response_time=response_time
+                )
+            )
+        for listener in self.listeners:
+            listener(self.user_name, question_id, is_right)
+        if len(self.answers) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes every collected answer to DB."""
+        if self.user_name and self.answers:
+            self.write(add_answer_events, self.user_name, self.answers)
+        self.answers = []
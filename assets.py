@@ -0,0 +1,60 @@
+import json
+import os
+from functools import cache
+
+from PIL import Image
+import customtkinter as ctk
+
+from profiler import timed
+from settings import ATLAS_IMAGE, ATLAS_INDEX, ICON_SIZE, ICONS
+
+
+def build_atlas() -> None:
+    """Packs pre-resized icons into one sprite atlas.
+
+    Run it once after changing any icon in the images folder:
+        python assets.py
+    """
+    width, height = ICON_SIZE
+    atlas = Image.new('RGBA', (width * len(ICONS), height))
+    index = {}
+    for position, icon_name in enumerate(ICONS):
+        with Image.open(f'images/{icon_name}.png') as source:
+            icon = source.resize(ICON_SIZE).convert('RGBA')
+        atlas.paste(icon, (position * width, 0))
+        index[icon_name] = (position * width, 0, width, height)
+    atlas.save(ATLAS_IMAGE, optimize=True)
+    with open(ATLAS_INDEX, encoding='utf-8', mode='w') as f:
+        json.dump(index, f, indent=4)
+
+
+@cache
+@timed('image_loading')
+def load_atlas() -> dict[str, Image.Image]:
+    """Decodes the sprite atlas once and cuts it into icons."""
+    if not _is_atlas_built():
+        build_atlas()
+    with open(ATLAS_INDEX, encoding='utf-8', mode='r') as f:
+        index = json.load(f)
+    with Image.open(ATLAS_IMAGE) as atlas:
+        atlas.load()
+        return {
+            icon_name: atlas.crop((x, y, x + width, y + height))
+            for icon_name, (x, y, width, height) in index.items()
+        }
+
+
+@cache
+def get_icon(icon_name: str) -> ctk.CTkImage:
+    """Returns the shared CTkImage of the icon."""
+    icon = load_atlas()[icon_name]
+    return ctk.CTkImage(light_image=icon, dark_image=icon)
+
+
+def _is_atlas_built() -> bool:
+    """Checks the atlas existence in the images folder."""
+    return os.path.exists(ATLAS_IMAGE) and os.path.exists(ATLAS_INDEX)
+
+
+if __name__ == '__main__':
+    build_atlas()
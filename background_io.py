@@ -0,0 +1,64 @@
+"""Blocking I/O off the Tk main loop."""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from settings import IO_WORKERS
+from ui_dispatch import dispatcher
+
+
+class BackgroundIO:
+    """Runs blocking calls in worker threads.
+
+    Tk widgets may be touched only by the main thread, so workers
+    never call the callbacks themselves: a finished future is posted
+    to the UI dispatcher, which applies it on the next frame.
+    The window keeps drawing whatever the latency of the database
+    or the disk is.
+    """
+
+    def __init__(self, widget, workers: int = IO_WORKERS) -> None:
+        self.widget = widget
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='background_io'
+            )
+        self.is_stopped = False
+
+    def submit(self, function: Callable, *args,
+               on_done: Callable,
+               on_error: Optional[Callable] = None) -> Future:
+        """Calls the function in a worker, on_done gets its result
+        and on_error gets its exception in the main thread.
+        """
+        future = self.executor.submit(function, *args)
+        future.add_done_callback(
+            lambda future: dispatcher.post(
+                self.apply, future, on_done, on_error
+                )
+            )
+        return future
+
+    def apply(self, future: Future, on_done: Callable,
+              on_error: Optional[Callable]) -> None:
+        if self.is_stopped or future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            on_done(future.result())
+        elif on_error is not None:
+            on_error(error)
+        else:
+            self.widget.report_callback_exception(
+                type(error), error, error.__traceback__
+                )
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Drops the calls which have not started yet,
+        or finishes every submitted call if wait is true.
+        """
+        self.is_stopped = True
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+def call_now(function: Callable, *args) -> None:
+    """Writes to DB at once, used where no worker is given."""
+    function(*args)
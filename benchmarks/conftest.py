@@ -0,0 +1,48 @@
+import csv
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pytest  # noqa: E402
+
+from settings import DATABASE_ENV_VAR, QUESTIONS_FILE  # noqa: E402
+from benchmarks.synthetic import (BANK_SIZES, USER_TABLE_SIZES,  # noqa: E402
+                                  make_users, write_question_bank)
+
+# The app database must never be touched by the benchmarks
+os.environ[DATABASE_ENV_VAR] = os.path.join(
+    tempfile.mkdtemp(prefix='interview_bench_'), 'users.db'
+    )
+
+
+@pytest.fixture(scope='session')
+def source_rows() -> list[list[str]]:
+    with open(QUESTIONS_FILE, encoding='utf-8', mode='r') as f:
+        return list(csv.reader(f, delimiter=';'))
+
+
+@pytest.fixture(scope='session', params=BANK_SIZES, ids=lambda size: f'{size}q')
+def bank_file(request, source_rows, tmp_path_factory):
+    filepath = tmp_path_factory.mktemp('banks') / f'bank_{request.param}.csv'
+    write_question_bank(filepath, source_rows, request.param)
+    return filepath
+
+
+@pytest.fixture(scope='module', params=USER_TABLE_SIZES,
+                ids=lambda size: f'{size}u')
+def user_table(request):
+    from sqlalchemy import delete, insert
+
+    from models import Base, engine, User
+
+    Base.metadata.create_all(engine)
+    users = make_users(request.param)
+    with engine.connect() as conn:
+        conn.execute(delete(User))
+        conn.execute(insert(User), users)
+        conn.commit()
+    return [user['user_name'] for user in users]
@@ -0,0 +1,106 @@
+"""Generators of synthetic question banks and user tables."""
+import csv
+import itertools
+import os
+import random
+
+from progress_codec import encode_progress
+from settings import QuestionThreshold as qt
+
+SEED = 717
+BANK_SIZES = (10_000, 100_000)
+USER_TABLE_SIZES = (1_000, 10_000)
+RIGHT_ANSWERS_SHARE = 0.3
+
+
+def write_question_bank(filepath, source_rows: list[list[str]],
+                        size: int) -> None:
+    """Writes a bank of the size cycling the real questions
+    with new consecutive ids.
+    """
+    with open(filepath, encoding='utf-8', mode='w', newline='') as f:
+        writer = csv.writer(f, delimiter=';')
+        for question_id, row in zip(
+                range(qt.BASIC_FIRST_QUESTION,
+                      qt.BASIC_FIRST_QUESTION + size),
+                itertools.cycle(source_rows)):
+            writer.writerow([question_id, *row[1:]])
+
+
+def make_pack(bank_file, size: int, themes_amount: int = 7):
+    """Returns a pack of the bank split into themes of equal size."""
+    from question_packs import QuestionPack
+
+    first_question = qt.BASIC_FIRST_QUESTION
+    step = -(-size // themes_amount)
+    themes = [
+        {
+            'id': theme_id,
+            'title': f'Тема {theme_id}',
+            'short_title': f'Тема {theme_id}',
+            'first_question': first_question + start,
+            'last_question': first_question + min(start + step, size) - 1,
+            }
+        for theme_id, start in enumerate(range(0, size, step))
+        ]
+    return QuestionPack(
+        'synthetic',
+        os.path.dirname(bank_file),
+        {
+            'questions': os.path.basename(bank_file),
+            'knowledge': os.path.abspath('knowledge'),
+            'themes': themes
+            }
+        )
+
+
+def make_progress(question_ids, share=RIGHT_ANSWERS_SHARE,
+                  seed=SEED) -> dict[int, bool]:
+    """Returns progress where the share of questions is answered right."""
+    rng = random.Random(seed)
+    return {
+        question_id: rng.random() < share for question_id in question_ids
+        }
+
+
+def make_difficulty(question_ids, seed=SEED) -> dict[int, float]:
+    """Returns difficulty of the questions drawn from the standard normal."""
+    rng = random.Random(seed)
+    return {question_id: rng.gauss(0, 1) for question_id in question_ids}
+
+
+def make_answer_pairs(users_amount: int, questions_amount: int,
+                      share=RIGHT_ANSWERS_SHARE, seed=SEED):
+    """Returns numpy arrays of (user, question, attempts, right attempts)
+    for the share of all pairs, answers follow the Rasch model.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    pairs = np.flatnonzero(
+        rng.random(users_amount * questions_amount) < share
+        )
+    users, questions = np.divmod(pairs, questions_amount)
+    skill = rng.normal(size=users_amount)
+    difficulty = rng.normal(size=questions_amount)
+    attempts = rng.integers(1, 4, size=len(pairs))
+    right_attempts = rng.binomial(
+        attempts, 1 / (1 + np.exp(difficulty[questions] - skill[users]))
+        )
+    return users, questions, attempts, right_attempts
+
+
+def make_users(amount: int, seed=SEED) -> list[dict]:
+    """Returns rows of users table with random progress."""
+    rng = random.Random(seed)
+    question_ids = range(qt.BASIC_FIRST_QUESTION, qt.SQL_LAST_QUESTION + 1)
+    return [
+        {
+            'user_name': f'user{number}',
+            'interviews_duration': rng.randrange(0, 100 * 3600),
+            'progress': encode_progress(
+                make_progress(question_ids, rng.random(), seed + number)
+                ),
+        }
+        for number in range(amount)
+    ]
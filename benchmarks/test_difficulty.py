@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from benchmarks.synthetic import make_answer_pairs, USER_TABLE_SIZES
+from difficulty import FIT_ITERATIONS, fit_rasch, refresh_difficulty
+from settings import QuestionThreshold as qt
+
+QUESTIONS_AMOUNT = qt.SQL_LAST_QUESTION - qt.BASIC_FIRST_QUESTION + 1
+
+
+@pytest.mark.parametrize('users_amount', USER_TABLE_SIZES)
+def test_fit_rasch(benchmark, users_amount):
+    users, questions, attempts, right_attempts = make_answer_pairs(
+        users_amount, QUESTIONS_AMOUNT
+        )
+    benchmark(fit_rasch, users, questions, attempts, right_attempts,
+              np.zeros(QUESTIONS_AMOUNT), FIT_ITERATIONS)
+
+
+def test_refresh_difficulty_without_new_answers(benchmark, user_table):
+    refresh_difficulty()
+    benchmark(refresh_difficulty)
@@ -0,0 +1,65 @@
+"""Benchmarks which need a display, run them under Xvfb:
+    xvfb-run python -m pytest benchmarks/test_gui.py
+"""
+import glob
+import os
+from sys import platform
+
+import pytest
+
+from benchmarks.synthetic import make_pack
+
+pytestmark = pytest.mark.skipif(
+    platform.startswith('linux') and not os.environ.get('DISPLAY'),
+    reason='needs a display, run under xvfb-run'
+    )
+
+KNOWLEDGE_FILES = sorted(glob.glob('knowledge/*.pdf'))
+
+
+@pytest.fixture(scope='module')
+def main():
+    return pytest.importorskip('main')
+
+
+@pytest.fixture(scope='module')
+def root(main):
+    window = main.ctk.CTk()
+    yield window
+    window.destroy()
+
+
+@pytest.mark.parametrize('filepath', KNOWLEDGE_FILES)
+def test_pdf_get_page(benchmark, main, root, filepath):
+    miner = main.PDFMiner(filepath)
+    benchmark(miner.get_page, 0)
+
+
+def test_treeview_population(benchmark, main, root, bank_file):
+    pack = make_pack(bank_file, sum(1 for _ in open(bank_file, 'rb')))
+    tab = main.InterviewPassTab(
+        parent=root,
+        pack=pack,
+        database=pack.load_questions(),
+        show_hint_window=lambda filepath, page_number: None,
+        get_volume=lambda: 0,
+        set_volume=lambda volume: None,
+        get_current_user=lambda: None,
+        set_notebook_status=lambda status: None,
+        get_interview_mode=lambda: {},
+        get_user_progress=lambda: {},
+        update_progress=lambda: None,
+        request_difficulty_refresh=lambda: None,
+        get_question_difficulty=lambda: {},
+        write_db=lambda function, *args: None,
+        profiles=main.UserProfileCache(),
+        session=main.SessionCheckpoint(filepath=''),
+        )
+    tree = tab.question_tree
+
+    def refill():
+        tree.delete(*tree.get_children())
+        tab.fill_question_tree()
+
+    benchmark(refill)
+    tab.destroy()
@@ -0,0 +1,40 @@
+from benchmarks.synthetic import make_progress
+from live_statistics import LiveStatistics
+from questions import THEME_RANGES
+from user_statistics import get_snapshot_statistics
+
+QUESTION_IDS = range(8, 598)
+
+
+def count_snapshots(progress: dict) -> dict[int, dict]:
+    return {
+        theme: {'right_amount': sum(
+            1 for question_id in range(first_question, last_question + 1)
+            if progress.get(question_id)
+            )}
+        for theme, (first_question, last_question) in THEME_RANGES.items()
+        }
+
+
+def test_answers_between_frames(benchmark):
+    """An interview full of answers costs one publish per frame."""
+    progress = make_progress(QUESTION_IDS)
+    published = []
+
+    def answer_all():
+        statistics = LiveStatistics(schedule=lambda delay, function: None)
+        statistics.subscribe(published.append)
+        statistics.reset('user', progress, count_snapshots(progress),
+                         THEME_RANGES)
+        for question_id in QUESTION_IDS:
+            statistics.add_answer('user', question_id, True)
+        statistics.publish()
+        return statistics
+
+    statistics = benchmark(answer_all)
+    expected = get_snapshot_statistics(
+        count_snapshots(dict.fromkeys(QUESTION_IDS, True))
+        )
+    assert statistics.get_statistics() == expected
+    assert published[-1] == expected
+
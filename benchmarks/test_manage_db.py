@@ -0,0 +1,88 @@
+import datetime
+import itertools
+
+from benchmarks.synthetic import make_progress
+from manage_db import (add_answer_events, create_new_user, create_new_users,
+                       delete_this_user,
+                       get_last_enter_date, get_theme_snapshots,
+                       get_user_interview_duration,
+                       get_user_names, get_user_profile, get_user_progress,
+                       update_interview_duration, update_last_enter_date,
+                       update_user_progress)
+from settings import ANSWER_BATCH_SIZE, QuestionThreshold as qt
+
+
+def test_get_user_names(benchmark, user_table):
+    benchmark(get_user_names)
+
+
+def test_get_user_progress(benchmark, user_table):
+    benchmark(get_user_progress, user_table[-1])
+
+
+def test_get_last_enter_date(benchmark, user_table):
+    update_last_enter_date(user_table[-1], datetime.datetime.now())
+    benchmark(get_last_enter_date, user_table[-1])
+
+
+def test_get_user_interview_duration(benchmark, user_table):
+    benchmark(get_user_interview_duration, user_table[-1])
+
+
+def test_get_user_profile(benchmark, user_table):
+    benchmark(get_user_profile, user_table[-1])
+
+
+def test_update_user_progress(benchmark, user_table):
+    progress = make_progress(
+        range(qt.BASIC_FIRST_QUESTION, qt.SQL_LAST_QUESTION + 1)
+        )
+    benchmark(update_user_progress, user_table[-1], progress)
+
+
+def test_update_interview_duration(benchmark, user_table):
+    benchmark(update_interview_duration, user_table[-1], 3600)
+
+
+def test_create_and_delete_user(benchmark, user_table):
+    names = (f'bench{number}' for number in itertools.count())
+
+    def create_and_delete():
+        user_name = next(names)
+        create_new_user(user_name)
+        delete_this_user(user_name)
+
+    benchmark(create_and_delete)
+
+
+def test_import_cohort(benchmark, user_table):
+    """A cohort of 500 trainees, the previous one is removed untimed."""
+    cohorts = (
+        [f'cohort{number}_{trainee}' for trainee in range(500)]
+        for number in itertools.count()
+        )
+    imported = []
+
+    def setup():
+        for user_name in imported:
+            delete_this_user(user_name)
+        imported[:] = next(cohorts)
+        return (imported, ), {}
+
+    benchmark.pedantic(create_new_users, setup=setup, rounds=3)
+    setup()
+
+
+def test_add_answer_events(benchmark, user_table):
+    now = datetime.datetime.now()
+    answers = [
+        {'question_id': question_id, 'is_right': question_id % 3 == 0,
+         'answered_at': now, 'response_time': 5000}
+        for question_id in range(qt.BASIC_FIRST_QUESTION,
+                                 qt.BASIC_FIRST_QUESTION + ANSWER_BATCH_SIZE)
+        ]
+    benchmark(add_answer_events, user_table[-1], answers)
+
+
+def test_get_theme_snapshots(benchmark, user_table):
+    benchmark(get_theme_snapshots, user_table[-1])
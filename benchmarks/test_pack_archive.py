@@ -0,0 +1,32 @@
+import pytest
+
+from benchmarks.synthetic import make_pack
+from pack_archive import ArchivePack, build_pack_archive
+
+
+@pytest.fixture(scope='module')
+def pack(bank_file):
+    return make_pack(bank_file, sum(1 for _ in open(bank_file, 'rb')))
+
+
+@pytest.fixture(scope='module')
+def archive_pack(pack, tmp_path_factory):
+    filepath = tmp_path_factory.mktemp('archives') / 'synthetic.pack'
+    build_pack_archive(pack, str(filepath))
+    return ArchivePack('synthetic', str(filepath))
+
+
+def test_build_pack_archive(benchmark, pack, tmp_path):
+    benchmark(build_pack_archive, pack, str(tmp_path / 'synthetic.pack'))
+
+
+def test_archive_load_questions(benchmark, archive_pack):
+    def load():
+        archive_pack.release()
+        return archive_pack.load_questions()
+
+    benchmark(load)
+
+
+def test_archive_get_pdf(benchmark, archive_pack):
+    benchmark(archive_pack.get_pdf, 1)
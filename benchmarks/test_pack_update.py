@@ -0,0 +1,18 @@
+import glob
+
+import pytest
+
+from pack_update import get_chunk_boundaries, read_file
+
+KNOWLEDGE = b''.join(
+    read_file(filepath) for filepath in sorted(glob.glob('knowledge/*.pdf'))
+    )
+
+
+@pytest.mark.skipif(not KNOWLEDGE, reason='needs knowledge/*.pdf')
+def test_chunk_knowledge(benchmark):
+    benchmark(get_chunk_boundaries, KNOWLEDGE)
+
+
+def test_chunk_question_bank(benchmark, bank_file):
+    benchmark(get_chunk_boundaries, read_file(bank_file))
@@ -0,0 +1,30 @@
+import pytest
+
+from benchmarks.synthetic import make_progress
+from loadgen import start_server
+from progress_client import ProgressClient
+from settings import SERVER_PIPELINE_SIZE, QuestionThreshold as qt
+
+
+@pytest.fixture(scope='module')
+def client():
+    client = ProgressClient(start_server())
+    yield client
+    client.close()
+
+
+def test_load_user_progress(benchmark, user_table, client):
+    benchmark(client.call, 'load_user_progress', user_table[-1])
+
+
+def test_pipelined_update_user_progress(benchmark, user_table, client):
+    progress = make_progress(
+        range(qt.BASIC_FIRST_QUESTION, qt.SQL_LAST_QUESTION + 1)
+        )
+
+    def update_batch():
+        for _ in range(SERVER_PIPELINE_SIZE):
+            client.post('update_user_progress', user_table[-1], progress)
+        client.flush()
+
+    benchmark(update_batch)
@@ -0,0 +1,38 @@
+import pytest
+
+from benchmarks.synthetic import make_difficulty, make_pack, make_progress
+from questions import generate_question_list, load_csv
+from settings import QuestionOrder
+from user_statistics import get_snapshot_statistics
+
+ALL_THEMES = list(range(7))
+
+
+@pytest.fixture(scope='module')
+def question_ids(bank_file):
+    return [row[0] for row in load_csv(bank_file)]
+
+
+def test_load_csv(benchmark, bank_file):
+    benchmark(load_csv, bank_file)
+
+
+def test_get_snapshot_statistics(benchmark, bank_file, question_ids):
+    theme_ranges = make_pack(bank_file, len(question_ids)).theme_ranges
+    progress = make_progress(question_ids)
+    theme_snapshots = {
+        theme: {'right_amount': sum(
+            1 for question_id in range(first_question, last_question + 1)
+            if progress.get(question_id)
+            )}
+        for theme, (first_question, last_question) in theme_ranges.items()
+        }
+    benchmark(get_snapshot_statistics, theme_snapshots, theme_ranges)
+
+
+@pytest.mark.parametrize('order', QuestionOrder,
+                         ids=lambda order: order.name.lower())
+def test_generate_question_list(benchmark, question_ids, order):
+    progress = make_progress(question_ids)
+    difficulty = make_difficulty(question_ids)
+    benchmark(generate_question_list, ALL_THEMES, progress, order, difficulty)
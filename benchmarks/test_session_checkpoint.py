@@ -0,0 +1,29 @@
+from collections import deque
+
+from session_checkpoint import SessionCheckpoint, SessionState
+
+QUESTION_IDS = range(8, 598)
+
+
+def test_checkpoint_answers(benchmark, tmp_path):
+    """Records of an interview where every question is answered
+    wrong once and then right, compactions included.
+    """
+    filepath = str(tmp_path / 'session.ckpt')
+
+    def answer_all():
+        session = SessionCheckpoint(filepath, checkpoint_interval=None)
+        session.start(
+            SessionState('user', 'python', [1] * 9,
+                         questions=deque(QUESTION_IDS))
+            )
+        for question_id in QUESTION_IDS:
+            session.rotate(question_id)
+        for question_id in QUESTION_IDS[:-1]:
+            session.pop(question_id)
+        return session
+
+    session = benchmark(answer_all)
+    state = SessionCheckpoint(filepath).load()
+    assert state.questions == session.state.questions == deque([597])
+    session.finish()
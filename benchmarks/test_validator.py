@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks.synthetic import USER_TABLE_SIZES
+from settings import ValidResponse
+from validator import validate_name, validate_names
+
+
+@pytest.mark.parametrize('amount', USER_TABLE_SIZES,
+                         ids=lambda amount: f'{amount}u')
+def test_validate_roster(benchmark, amount):
+    names = [f'user{number}' for number in range(amount)]
+    existing_names = set(names[::2])
+    results = benchmark(validate_names, names, existing_names)
+    assert sum(bool(violations) for violations in results) == len(
+        existing_names
+        )
+
+
+def test_validate_name(benchmark):
+    violations = benchmark(validate_name, '1#' + 'x' * 30, set())
+    assert violations == [
+        ValidResponse.NAME_TOO_LONG,
+        ValidResponse.WRONG_FIRST_SYMBOL,
+        ValidResponse.WRONG_SYMBOLS,
+        ]
@@ -0,0 +1,217 @@
+"""Question difficulty computed from the answers of every user.
+
+    python difficulty.py
+    python difficulty.py --full
+
+The job is incremental: answer counters are increased only by
+the answer events logged after the previous run. Difficulty is
+estimated by the Rasch model, P(right) = 1 / (1 + exp(b - theta)),
+where theta is the skill of the user and b is the difficulty of
+the question. It is fitted on the question snapshots as a whole:
+one iteration is a few numpy operations over all (user, question)
+pairs, never a loop over users for every question.
+"""
+import argparse
+import datetime
+
+import numpy as np
+from sqlalchemy import func, Integer, select, type_coerce
+from sqlalchemy.dialects.sqlite import insert
+
+from models import (AnswerEvent, create_db, DifficultyState, engine,
+                    QuestionDifficulty, QuestionSnapshot)
+
+FIT_ITERATIONS = 30
+WARM_ITERATIONS = 10
+PRIOR_VARIANCE = 1.0
+STATE_ID = 1
+
+
+def refresh_difficulty(full: bool = False) -> int:
+    """Updates the cached difficulty and returns the amount
+    of answer events processed. Nothing is recomputed when no
+    answers have been logged since the previous run.
+    """
+    with engine.begin() as conn:
+        last_event_id = 0 if full else conn.scalar(
+            select(DifficultyState.last_event_id)
+            .where(DifficultyState.id == STATE_ID)
+            ) or 0
+        new_counts = conn.execute(
+            select(
+                AnswerEvent.question_id,
+                func.count(),
+                func.sum(type_coerce(AnswerEvent.is_right, Integer)),
+                func.max(AnswerEvent.id),
+                )
+            .where(AnswerEvent.id > last_event_id)
+            .group_by(AnswerEvent.question_id)
+            ).all()
+        if not new_counts and not full:
+            return 0
+
+        cached = {
+            row.question_id: row for row in conn.execute(
+                select(QuestionDifficulty)
+                )
+            } if not full else {}
+        counts = {
+            question_id: [row.attempts, row.right_attempts]
+            for question_id, row in cached.items()
+            }
+        events_amount = 0
+        for question_id, attempts, right_attempts, max_id in new_counts:
+            total = counts.setdefault(question_id, [0, 0])
+            total[0] += attempts
+            total[1] += right_attempts
+            events_amount += attempts
+            last_event_id = max(last_event_id, max_id)
+
+        difficulty = fit_question_difficulty(
+            conn,
+            {question_id: row.difficulty
+             for question_id, row in cached.items()},
+            WARM_ITERATIONS if cached else FIT_ITERATIONS,
+            )
+        rows = [
+            {
+                'question_id': question_id,
+                'attempts': attempts,
+                'right_attempts': right_attempts,
+                'success_rate': (
+                    right_attempts / attempts if attempts else None
+                    ),
+                'difficulty': difficulty.pop(question_id, 0.0),
+            }
+            for question_id, (attempts, right_attempts) in counts.items()
+            ]
+        rows += [
+            {
+                'question_id': question_id,
+                'attempts': 0,
+                'right_attempts': 0,
+                'success_rate': None,
+                'difficulty': value,
+            }
+            for question_id, value in difficulty.items()
+            ]
+        if full:
+            conn.execute(QuestionDifficulty.__table__.delete())
+        if rows:
+            statement = insert(QuestionDifficulty)
+            conn.execute(
+                statement.on_conflict_do_update(
+                    index_elements=['question_id'],
+                    set_={
+                        column: statement.excluded[column]
+                        for column in ('attempts', 'right_attempts',
+                                       'success_rate', 'difficulty')
+                        },
+                    ),
+                rows,
+                )
+        statement = insert(DifficultyState).values(
+            id=STATE_ID,
+            last_event_id=last_event_id,
+            updated_at=datetime.datetime.now(),
+            )
+        conn.execute(statement.on_conflict_do_update(
+            index_elements=['id'],
+            set_={
+                'last_event_id': statement.excluded.last_event_id,
+                'updated_at': statement.excluded.updated_at,
+                },
+            ))
+    return events_amount
+
+
+def fit_question_difficulty(conn, initial: dict[int, float],
+                            iterations: int) -> dict[int, float]:
+    """Fits the Rasch model on every question snapshot.
+
+    The previous difficulty is used as the starting point,
+    so a few iterations are enough after new answers.
+    """
+    snapshots = np.array(
+        conn.execute(
+            select(
+                QuestionSnapshot.user_id,
+                QuestionSnapshot.question_id,
+                QuestionSnapshot.attempts,
+                QuestionSnapshot.right_attempts,
+                )
+            ).all(),
+        dtype=np.int64,
+        ).reshape(-1, 4)
+    if not len(snapshots):
+        return {}
+    _, users = np.unique(snapshots[:, 0], return_inverse=True)
+    question_ids, questions = np.unique(snapshots[:, 1], return_inverse=True)
+    difficulty = np.array(
+        [initial.get(question_id, 0.0) for question_id in question_ids.tolist()]
+        )
+    difficulty = fit_rasch(
+        users, questions, snapshots[:, 2], snapshots[:, 3], difficulty,
+        iterations,
+        )
+    return dict(zip(question_ids.tolist(), difficulty.tolist()))
+
+
+def fit_rasch(users: np.ndarray, questions: np.ndarray, attempts: np.ndarray,
+              right_attempts: np.ndarray, difficulty: np.ndarray,
+              iterations: int) -> np.ndarray:
+    """Returns the question difficulty of the binomial Rasch model.
+
+    Skills and difficulties are updated in turn by one Newton step,
+    sums over pairs are done by np.bincount. The normal prior keeps
+    the estimates finite for questions which everyone has answered
+    right (older progress has no wrong answers at all).
+    """
+    users_amount = users.max() + 1
+    questions_amount = len(difficulty)
+    attempts = attempts.astype(float)
+    right_attempts = right_attempts.astype(float)
+    skill = np.zeros(users_amount)
+    difficulty = difficulty.astype(float)
+    for _ in range(iterations):
+        for is_skill in (True, False):
+            probability = 1 / (1 + np.exp(difficulty[questions] - skill[users]))
+            residual = right_attempts - attempts * probability
+            information = attempts * probability * (1 - probability)
+            if is_skill:
+                gradient = (np.bincount(users, residual, users_amount)
+                            - skill / PRIOR_VARIANCE)
+                hessian = (np.bincount(users, information, users_amount)
+                           + 1 / PRIOR_VARIANCE)
+                skill += gradient / hessian
+            else:
+                gradient = (-np.bincount(questions, residual, questions_amount)
+                            - difficulty / PRIOR_VARIANCE)
+                hessian = (np.bincount(questions, information, questions_amount)
+                           + 1 / PRIOR_VARIANCE)
+                difficulty += gradient / hessian
+    return difficulty
+
+
+def get_question_difficulty() -> dict[int, float]:
+    """Returns the cached difficulty of every rated question."""
+    with engine.connect() as conn:
+        return dict(conn.execute(
+            select(QuestionDifficulty.question_id,
+                   QuestionDifficulty.difficulty)
+            ).all())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--full', action='store_true',
+                        help='recount every answer event from scratch')
+    args = parser.parse_args()
+    create_db()
+    events_amount = refresh_difficulty(args.full)
+    print(f'{events_amount} answers have been processed, '
+          f'{len(get_question_difficulty())} questions are rated')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""Export of every user's progress into one columnar file.
+
+    python export_cohort.py cohort.parquet
+    python export_cohort.py cohort.arrow --chunk-size 1000
+    python export_cohort.py cohort.npz
+
+Users are read by chunks, so memory does not depend on the cohort
+size. Besides user columns the file has the difficulty matrix:
+one row of bits per user, one bit per question answered right.
+Columns of the matrix are the questions of every discovered pack.
+Parquet and Arrow IPC need pyarrow, the .npz format needs only numpy.
+"""
+import argparse
+import json
+import os
+import tempfile
+import zipfile
+from typing import Iterator
+
+import numpy as np
+from sqlalchemy import func, select
+
+from manage_db import decode_progress
+from models import engine, User
+from question_packs import get_packs
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pa = None
+
+CHUNK_SIZE = 500
+
+
+def get_question_ranges() -> list[tuple[int, int]]:
+    """Returns question id ranges of the themes of every pack."""
+    return sorted(
+        question_range
+        for pack in get_packs().values()
+        for question_range in pack.theme_ranges.values()
+        )
+
+
+def get_question_ids(question_ranges: list[tuple[int, int]]) -> np.ndarray:
+    """Returns the sorted ids, packs never share a question id."""
+    return np.concatenate([
+        np.arange(first_question, last_question + 1, dtype=np.int32)
+        for first_question, last_question in question_ranges
+        ])
+
+
+def get_bitmap_width(question_ids: np.ndarray) -> int:
+    return (len(question_ids) + 7) // 8
+
+
+def read_chunks(chunk_size: int, question_ids: np.ndarray
+                ) -> Iterator[dict[str, np.ndarray]]:
+    """Yields users as column arrays of at most chunk_size rows."""
+    query = select(
+        User.id, User.user_name, User.last_enter_date,
+        User.interviews_duration, User.progress
+        ).order_by(User.id)
+    with engine.connect() as conn:
+        result = conn.execution_options(yield_per=chunk_size).execute(query)
+        for rows in result.partitions():
+            answers = np.zeros((len(rows), len(question_ids)), dtype=bool)
+            for row_number, row in enumerate(rows):
+                right_questions = np.array(
+                    [question_number for question_number, is_right
+                     in decode_progress(row.progress).items() if is_right],
+                    dtype=np.int64
+                    )
+                # Ids of removed questions match no column and are skipped
+                positions = np.searchsorted(question_ids, right_questions)
+                is_known = question_ids[
+                    np.minimum(positions, len(question_ids) - 1)
+                    ] == right_questions
+                answers[row_number, positions[is_known]] = True
+            yield {
+                'user_id': np.array([row.id for row in rows], dtype=np.int64),
+                'user_name': np.array(
+                    [row.user_name for row in rows], dtype='U25'
+                    ),
+                'last_enter_date': np.array(
+                    [row.last_enter_date or 'NaT' for row in rows],
+                    dtype='datetime64[s]'
+                    ),
+                'interviews_duration': np.array(
+                    [row.interviews_duration for row in rows], dtype=np.int64
+                    ),
+                'right_amount': answers.sum(axis=1, dtype=np.int32),
+                'answers_bitmap': np.packbits(answers, axis=1),
+            }
+
+
+def export_arrow(filepath: str, chunk_size: int, is_parquet: bool) -> None:
+    """Writes every chunk as a row group or a record batch."""
+    question_ranges = get_question_ranges()
+    question_ids = get_question_ids(question_ranges)
+    bitmap_width = get_bitmap_width(question_ids)
+    schema = pa.schema(
+        [
+            ('user_id', pa.int64()),
+            ('user_name', pa.string()),
+            ('last_enter_date', pa.timestamp('s')),
+            ('interviews_duration', pa.int64()),
+            ('right_amount', pa.int32()),
+            ('answers_bitmap', pa.binary(bitmap_width)),
+        ],
+        metadata={
+            'question_ranges': json.dumps(question_ranges),
+            'bit_order': 'big',
+        }
+        )
+    if is_parquet:
+        writer = pa.parquet.ParquetWriter(filepath, schema)
+    else:
+        writer = pa.ipc.new_file(filepath, schema)
+    with writer:
+        for chunk in read_chunks(chunk_size, question_ids):
+            columns = dict(chunk)
+            columns['last_enter_date'] = pa.array(
+                chunk['last_enter_date'], type=pa.timestamp('s')
+                )
+            columns['answers_bitmap'] = pa.FixedSizeBinaryArray.from_buffers(
+                pa.binary(bitmap_width),
+                len(chunk['user_id']),
+                [None, pa.py_buffer(chunk['answers_bitmap'].tobytes())]
+                )
+            batch = pa.record_batch(
+                [columns[name] for name in schema.names], schema=schema
+                )
+            if is_parquet:
+                writer.write_batch(batch)
+            else:
+                writer.write(batch)
+
+
+def export_npz(filepath: str, chunk_size: int) -> None:
+    """Fills memory-mapped .npy files by chunks and stores them
+    uncompressed in the .npz archive, which numpy.load reads.
+    """
+    question_ids = get_question_ids(get_question_ranges())
+    with engine.connect() as conn:
+        users_amount = conn.execute(select(func.count(User.id))).scalar()
+    shapes = {
+        'user_id': ((users_amount, ), np.int64),
+        'user_name': ((users_amount, ), 'U25'),
+        'last_enter_date': ((users_amount, ), 'datetime64[s]'),
+        'interviews_duration': ((users_amount, ), np.int64),
+        'right_amount': ((users_amount, ), np.int32),
+        'answers_bitmap': (
+            (users_amount, get_bitmap_width(question_ids)), np.uint8
+            ),
+    }
+    with tempfile.TemporaryDirectory() as temp_dir:
+        arrays = {
+            name: np.lib.format.open_memmap(
+                os.path.join(temp_dir, f'{name}.npy'),
+                mode='w+', dtype=dtype, shape=shape
+                )
+            for name, (shape, dtype) in shapes.items()
+            }
+        position = 0
+        for chunk in read_chunks(chunk_size, question_ids):
+            size = len(chunk['user_id'])
+            for name, array in arrays.items():
+                array[position:position + size] = chunk[name]
+            position += size
+        for array in arrays.values():
+            array.flush()
+        del arrays
+
+        with zipfile.ZipFile(filepath, mode='w') as archive:
+            for name in shapes:
+                archive.write(os.path.join(temp_dir, f'{name}.npy'),
+                              f'{name}.npy')
+            question_ids_file = os.path.join(temp_dir, 'question_ids.npy')
+            np.save(question_ids_file, question_ids)
+            archive.write(question_ids_file, 'question_ids.npy')
+
+
+def load_cohort(filepath: str) -> dict[str, np.ndarray]:
+    """Loads the exported file, the bitmap is unpacked
+    to a users x questions boolean matrix.
+    """
+    if filepath.endswith('.npz'):
+        with np.load(filepath) as data:
+            columns = {name: data[name] for name in data.files}
+        bitmap = columns.pop('answers_bitmap')
+    else:
+        if filepath.endswith('.parquet'):
+            table = pa.parquet.read_table(filepath)
+        else:
+            with pa.memory_map(filepath) as source:
+                table = pa.ipc.open_file(source).read_all()
+        columns = {
+            name: table.column(name).to_numpy()
+            for name in table.column_names if name != 'answers_bitmap'
+            }
+        columns['question_ids'] = get_question_ids(
+            json.loads(table.schema.metadata[b'question_ranges'])
+            )
+        columns['last_enter_date'] = (
+            columns['last_enter_date'].astype('datetime64[s]')
+            )
+        bitmap = np.frombuffer(
+            b''.join(table.column('answers_bitmap').to_pylist()),
+            dtype=np.uint8
+            ).reshape(-1, get_bitmap_width(columns['question_ids']))
+    columns['answers'] = np.unpackbits(
+        bitmap, axis=1, count=len(columns['question_ids'])
+        ).astype(bool)
+    return columns
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output',
+                        help='file ending with .parquet, .arrow or .npz')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    extension = os.path.splitext(args.output)[1]
+    if extension == '.npz':
+        export_npz(args.output, args.chunk_size)
+    elif pa is None:
+        parser.error('pyarrow is not installed, use the .npz format')
+    elif extension in ('.parquet', '.arrow'):
+        export_arrow(args.output, args.chunk_size, extension == '.parquet')
+    else:
+        parser.error('unknown format, use .parquet, .arrow or .npz')
+    print(f'Progress of every user has been exported to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+from typing import Callable
+
+from my_timers import timers
+from questions import get_question_theme, THEME_RANGES
+from settings import UI_FRAME_INTERVAL
+from user_statistics import get_snapshot_statistics, StatInformation
+
+
+class LiveStatistics:
+    """Right answers of the shown user counted by themes as they come.
+
+    An answer costs one set lookup and one counter increment. Views
+    subscribed to the model get the statistics at most once a frame,
+    however many answers have come during it.
+    """
+
+    def __init__(self, frame_interval: float = UI_FRAME_INTERVAL / 1000,
+                 schedule: Callable = timers.schedule) -> None:
+        self.frame_interval = frame_interval
+        self.schedule = schedule
+        self.user_name: str | None = None
+        self.theme_ranges: dict[int, tuple[int, int]] = THEME_RANGES
+        self.right_ids: set[int] = set()
+        self.right_amounts: dict[int, int] = {}
+        self.views: list[Callable[[StatInformation], None]] = []
+        self.is_publish_pending = False
+
+    def subscribe(self, view: Callable[[StatInformation], None]) -> None:
+        self.views.append(view)
+
+    def reset(self, user_name: str | None, progress: dict[int, bool],
+              theme_snapshots: dict[int, dict],
+              theme_ranges: dict[int, tuple[int, int]]) -> None:
+        """Starts counting from the profile read from DB."""
+        self.user_name = user_name
+        self.theme_ranges = theme_ranges
+        self.right_ids = {
+            question_id for question_id, is_right in progress.items()
+            if is_right
+            }
+        self.right_amounts = {
+            theme: theme_snapshots.get(theme, {}).get('right_amount', 0)
+            for theme in theme_ranges
+            }
+
+    def add_answer(self, user_name: str, question_id: int,
+                   is_right: bool) -> None:
+        """Counts the answer if it is the first right one
+        to the question, answers of other users are skipped.
+        """
+        if (not is_right or user_name != self.user_name
+                or question_id in self.right_ids):
+            return
+        theme = get_question_theme(question_id, self.theme_ranges)
+        if theme is None:
+            return
+        self.right_ids.add(question_id)
+        self.right_amounts[theme] += 1
+        if not self.is_publish_pending:
+            self.is_publish_pending = True
+            self.schedule(self.frame_interval, self.publish)
+
+    def get_statistics(self) -> StatInformation:
+        return get_snapshot_statistics(
+            {
+                theme: {'right_amount': right_amount}
+                for theme, right_amount in self.right_amounts.items()
+                },
+            self.theme_ranges
+            )
+
+    def publish(self) -> None:
+        """Shows the counted statistics in every view."""
+        self.is_publish_pending = False
+        statistics = self.get_statistics()
+        for view in self.views:
+            view(statistics)
@@ -0,0 +1,295 @@
+"""Synthetic load for the progress database.
+
+Creates a cohort of users with realistic progress and replays
+concurrent interview sessions against the manage_db functions:
+    python loadgen.py --db cohort.db generate --users 500
+    python loadgen.py --db cohort.db replay --sessions 50 --workers 16
+    python loadgen.py --db cohort.db replay --workers 50 --server
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from progress_codec import encode_progress
+from questions import THEME_RANGES
+from settings import DATABASE_ENV_VAR, SERVER_ENV_VAR
+
+SECONDS_PER_ANSWER = 45
+LOCKED_MESSAGE = 'database is locked'
+
+
+def make_user(number: int, rng: random.Random) -> dict:
+    """Returns a users table row of a trainee.
+
+    Every trainee has a general skill and a different interest
+    in every theme. Questions are mostly answered in order,
+    so the beginning of a theme is solved more often than its end.
+    """
+    skill = rng.betavariate(2, 3)
+    progress = {}
+    answers_amount = 0
+    for first_question, last_question in THEME_RANGES.values():
+        interest = rng.betavariate(1.5, 1.5)
+        theme_size = last_question - first_question + 1
+        for position, question_number in enumerate(
+                range(first_question, last_question + 1)):
+            fading = 1 - position / theme_size
+            is_right = rng.random() < skill * interest * (0.5 + fading)
+            progress[question_number] = is_right
+            answers_amount += is_right
+    never_entered = answers_amount == 0 or rng.random() < 0.05
+    return {
+        'user_name': f'trainee{number:05}',
+        'last_enter_date': (
+            None if never_entered
+            else datetime.datetime.now() - datetime.timedelta(
+                minutes=rng.randrange(60 * 24 * 60))
+            ),
+        'interviews_duration': int(
+            answers_amount * SECONDS_PER_ANSWER * rng.lognormvariate(0, 0.5)
+            ),
+        'progress': encode_progress(progress),
+    }
+
+
+def generate(users_amount: int, seed: int) -> None:
+    """Creates the cohort in one transaction."""
+    from sqlalchemy import insert
+
+    from models import create_db, engine, User
+
+    create_db()
+    rng = random.Random(seed)
+    users = [make_user(number, rng) for number in range(users_amount)]
+    with engine.connect() as conn:
+        conn.execute(insert(User), users)
+        conn.commit()
+    print(f'{users_amount} users have been created in {engine.url.database}')
+
+
+def run_session(user_name: str, answers_amount: int, think_time: float,
+                seed: int) -> dict[str, list]:
+    """Plays one interview session of the user as the app does it.
+
+    Through a server, a write is timed until the server
+    has acknowledged it, not until it has been queued.
+    """
+    from sqlalchemy.exc import OperationalError
+
+    from progress_backend import (get_user_interview_duration,
+                                  get_user_progress,
+                                  update_interview_duration,
+                                  update_user_progress)
+    from progress_client import get_client, ProgressServerError
+
+    rng = random.Random(seed)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    is_server_used = bool(os.environ.get(SERVER_ENV_VAR))
+    # Acknowledgements are counted by the reader thread of the client
+    acknowledged: list[tuple[str, float, Exception | None]] = []
+    acknowledgements = threading.Semaphore(0)
+    writes_amount = 0
+
+    def count_error(error: Exception) -> None:
+        kind = 'locked' if LOCKED_MESSAGE in str(error) else 'other'
+        errors[kind] += 1
+
+    def call(operation, *args):
+        start = time.perf_counter()
+        try:
+            result = operation(*args)
+        except (OperationalError, ProgressServerError, OSError) as error:
+            count_error(error)
+            return None
+        latencies[operation.__name__].append(time.perf_counter() - start)
+        return result
+
+    def write(operation, *args):
+        nonlocal writes_amount
+        if not is_server_used:
+            call(operation, *args)
+            return
+        start = time.perf_counter()
+
+        def acknowledge(future: Future) -> None:
+            acknowledged.append((operation.__name__,
+                                 time.perf_counter() - start,
+                                 future.exception()))
+            acknowledgements.release()
+
+        get_client().post(operation.__name__, *args).add_done_callback(
+            acknowledge
+            )
+        writes_amount += 1
+
+    progress = call(get_user_progress, user_name) or {}
+    questions = [
+        question_number
+        for first_question, last_question in THEME_RANGES.values()
+        for question_number in range(first_question, last_question + 1)
+        if question_number not in progress
+        ]
+    for question_number in questions[:answers_amount]:
+        if think_time:
+            time.sleep(rng.expovariate(1 / think_time))
+        if rng.random() < 0.6:
+            progress[question_number] = True
+            write(update_user_progress, user_name, progress)
+    duration = call(get_user_interview_duration, user_name) or 0
+    write(update_interview_duration, user_name,
+          duration + answers_amount * SECONDS_PER_ANSWER)
+    # Pool processes exit without atexit, so every write is waited for
+    for _ in range(writes_amount):
+        acknowledgements.acquire()
+    for operation_name, seconds, error in acknowledged:
+        if error is None:
+            latencies[operation_name].append(seconds)
+        else:
+            count_error(error)
+    return {'latencies': dict(latencies), 'errors': dict(errors)}
+
+
+def start_server() -> str:
+    """Starts the progress server in a thread of this process
+    and returns its address.
+    """
+    from progress_server import ProgressServer
+
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(
+        ProgressServer().start('127.0.0.1', 0)
+        )
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    host, port = server.sockets[0].getsockname()[:2]
+    return f'{host}:{port}'
+
+
+def replay(sessions: int, workers: int, use_processes: bool,
+           answers_amount: int, think_time: float, seed: int,
+           use_server: bool = False) -> dict:
+    """Runs concurrent sessions and returns the summary report."""
+    from manage_db import get_user_names
+
+    if use_server:
+        # Workers read the address before progress_backend is imported
+        os.environ[SERVER_ENV_VAR] = start_server()
+    rng = random.Random(seed)
+    user_names = get_user_names()
+    if use_processes:
+        # Spawned workers open their own connections to the database
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')
+            )
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+
+    start = time.perf_counter()
+    with pool:
+        futures = [
+            pool.submit(run_session, rng.choice(user_names),
+                        answers_amount, think_time, seed + session)
+            for session in range(sessions)
+            ]
+        for future in futures:
+            result = future.result()
+            for operation, samples in result['latencies'].items():
+                latencies[operation] += samples
+            for kind, amount in result['errors'].items():
+                errors[kind] += amount
+    elapsed = time.perf_counter() - start
+
+    operations_amount = sum(len(samples) for samples in latencies.values())
+    return {
+        'sessions': sessions,
+        'workers': workers,
+        'mode': 'processes' if use_processes else 'threads',
+        'server': use_server,
+        'seconds': round(elapsed, 3),
+        'throughput_ops': round(operations_amount / elapsed, 1),
+        'operations': {
+            operation: {
+                'count': len(samples),
+                'p50_ms': round(1000 * percentile(samples, 50), 3),
+                'p99_ms': round(1000 * percentile(samples, 99), 3),
+            }
+            for operation, samples in sorted(latencies.items())
+        },
+        'locked_errors': errors['locked'],
+        'other_errors': errors['other'],
+    }
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    """Returns the nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def print_report(report: dict) -> None:
+    print(f"{report['sessions']} sessions, {report['workers']} "
+          f"{report['mode']}{' via server' if report['server'] else ''}, "
+          f"{report['seconds']} s")
+    print(f"Throughput: {report['throughput_ops']} operations/s")
+    for operation, stats in report['operations'].items():
+        print(f"  {operation:<28} n={stats['count']:<7} "
+              f"p50={stats['p50_ms']} ms  p99={stats['p99_ms']} ms")
+    print(f"'{LOCKED_MESSAGE}' errors: {report['locked_errors']}")
+    print(f"Other errors: {report['other_errors']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', required=True,
+                        help='SQLite file to use instead of users.db')
+    parser.add_argument('--seed', type=int, default=717)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate_parser = commands.add_parser('generate')
+    generate_parser.add_argument('--users', type=int, default=100)
+
+    replay_parser = commands.add_parser('replay')
+    replay_parser.add_argument('--sessions', type=int, default=50)
+    replay_parser.add_argument('--workers', type=int, default=8)
+    replay_parser.add_argument('--processes', action='store_true',
+                               help='run sessions in processes, not threads')
+    replay_parser.add_argument('--answers', type=int, default=30,
+                               help='answers in every session')
+    replay_parser.add_argument('--think-time', type=float, default=0.0,
+                               help='mean pause between answers in seconds')
+    replay_parser.add_argument('--server', action='store_true',
+                               help='send calls through a progress server')
+    replay_parser.add_argument('--json', action='store_true',
+                               help='print the report as JSON')
+    args = parser.parse_args()
+
+    # Must be set before models is imported, workers inherit it
+    os.environ[DATABASE_ENV_VAR] = args.db
+
+    if args.command == 'generate':
+        generate(args.users, args.seed)
+    else:
+        report = replay(args.sessions, args.workers, args.processes,
+                        args.answers, args.think_time, args.seed,
+                        args.server)
+        if args.json:
+            print(json.dumps(report, indent=4))
+        else:
+            print_report(report)
+
+
+if __name__ == '__main__':
+    main()
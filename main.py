@@ -1,15 +1,15 @@
+import argparse
 import datetime
 from collections import deque
-import random
-import csv
+from concurrent.futures import Future
 import threading
+import time
 import tkinter as tk
 from tkinter import ttk
 from tkinter import PhotoImage
-from typing import Optional
+from typing import Callable, Optional
 from sys import platform
 
-from PIL import Image
 from CTkMessagebox import CTkMessagebox
 import customtkinter as ctk
 import fitz
@@ -28,23 +28,31 @@ from colors import (YELLOW_BACKGROUND, PINK_BACKGROUND,
                     PROGRESS_COLOR, GREEN,
                     RED, WHITE, ERROR_COLOR, PDF_OUTPUT_COLOR)
 from settings import (CREATE_USER_WINDOW, HINT_WINDOW_TITLE,
-                      Theme, QuestionThreshold as qt,
+                      Theme, QuestionOrder,
                       ValidResponse,
-                      APP_NAME, APP_RESOLUTION)
-from models import create_db
-from manage_db import (create_new_user, get_user_names,
-                       get_user_interview_duration,
-                       get_user_progress, get_last_enter_date,
-                       update_interview_duration, update_last_enter_date,
-                       update_user_progress, delete_this_user)
+                      APP_NAME, APP_RESOLUTION, DEFAULT_PACK,
+                      MAX_PACK_THEMES, PROFILE_FILE)
+from answer_log import AnswerLog
+from live_statistics import LiveStatistics
+from session_checkpoint import SessionCheckpoint, SessionState
+from user_profiles import UserProfileCache
+from background_io import BackgroundIO
+from ui_dispatch import dispatcher
+from assets import get_icon
+from progress_backend import (create_db, create_new_user,
+                              get_question_difficulty, refresh_difficulty,
+                              delete_this_user)
 from user_statistics import (convert_seconds_to_hours,
                              count_interview_duration,
-                             get_right_answers_amount,
-                             get_last_enter_message)
-from validator import (is_name_empty, is_name_too_short,
-                       has_name_first_wrong_symbol, has_name_wrong_symbols,
-                       is_name_too_long, is_user_already_exists)
-from my_timers import CommandTimer, MessageTimer
+                             get_latency_message,
+                             get_last_enter_message,
+                             StatInformation)
+from validator import validate_name
+from my_timers import CommandTimer, MessageTimer, timers
+from questions import generate_question_list, QuestionBank
+from question_packs import get_packs, QuestionPack
+from user_directory import user_directory
+from profiler import measure, profile, timed, write_timing
 
 
 class Main(ctk.CTk):
@@ -64,19 +72,41 @@ class Main(ctk.CTk):
         self.create_user_window: Optional[CreateNewUser] = None
         self.hint_window: Optional[HintWindow] = None
 
-        # Load questions and create question bank
-        self.question_bank = self.load_csv()
-
-        # Themes dictionary
-        self.themes: dict[int, Theme] = {
-            0: Theme.BASICS,
-            1: Theme.OOP,
-            2: Theme.PEP8,
-            3: Theme.STRUCTURES,
-            4: Theme.ALGHORITMS,
-            5: Theme.GIT,
-            6: Theme.SQL
-        }
+        # Workers post UI changes, the main loop executes them
+        dispatcher.bind(self)
+
+        # Blocking I/O runs in workers, results come back by dispatcher
+        self.io = BackgroundIO(self)
+
+        # DB calls of the UI run one by one in order they are made,
+        # so a read sees every write made before it
+        self.db = BackgroundIO(self, workers=1)
+
+        # Profiles of the chosen users, read from DB once
+        self.profiles = UserProfileCache(write=self.write_db)
+
+        # Progress bars follow the answers while the interview goes
+        self.live_statistics = LiveStatistics()
+
+        # The interview is checkpointed to be resumed after a crash
+        self.session = SessionCheckpoint()
+        self.saved_session: Optional[SessionState] = self.session.load()
+
+        # Difficulty is refitted by one background call at a time
+        self.difficulty_refresh: Optional[Future] = None
+        self.is_difficulty_refresh_requested = False
+        self.question_difficulty: dict[int, float] = {}
+        self.load_question_difficulty()
+
+        # Message timers are driven by this main loop
+        timers.bind(self)
+
+        # Question packs, only the chosen one is loaded
+        self.packs: dict[str, QuestionPack] = get_packs()
+        self.pack: QuestionPack = self.packs[DEFAULT_PACK]
+
+        # Questions are loaded in background, the tree is filled then
+        self.question_bank = QuestionBank()
 
         # Interview mode dictionary
         self.interview_mode: dict[Theme | str, int] = {
@@ -117,21 +147,28 @@ class Main(ctk.CTk):
         self.userstats = UserStatisticsTab(
             parent=self.notebook.tab('Профиль пользователей'),
             create_new_user=self.create_new_user,
+            submit_io=self.db.submit,
+            get_pack=self.get_pack,
+            profiles=self.profiles,
+            live_statistics=self.live_statistics,
             set_current_user=self.set_current_user,
             set_user_progress=self.set_user_progress,
-            set_color_for_user_progress=self.set_color_for_user_progress
+            set_color_for_user_progress=self.set_color_for_user_progress,
+            set_interview_available=self.set_interview_available
             )
 
         self.interview_settings = InterviewSettingsTab(
             parent=self.notebook.tab('Настройки собеседования'),
             set_interview_mode=self.set_interview_mode,
             get_volume=self.get_volume,
-            set_volume=self.set_volume
+            set_volume=self.set_volume,
+            packs={name: pack.title for name, pack in self.packs.items()},
+            switch_pack=self.switch_pack
             )
 
         self.interview_pass = InterviewPassTab(
             parent=self.notebook.tab('Пройти собеседование'),
-            themes=self.themes,
+            pack=self.pack,
             database=self.question_bank,
             show_hint_window=self.show_hint_window,
             get_volume=self.get_volume,
@@ -141,17 +178,117 @@ class Main(ctk.CTk):
             get_interview_mode=self.get_interview_mode,
             get_user_progress=self.get_user_progress,
             update_progress=self.update_progress,
+            request_difficulty_refresh=self.request_difficulty_refresh,
+            get_question_difficulty=self.get_question_difficulty,
+            write_db=self.write_db,
+            profiles=self.profiles,
+            session=self.session,
+            )
+        self.interview_pass.answer_log.subscribe(
+            self.live_statistics.add_answer
             )
 
-    def load_csv(self) -> list[tuple[int | str]]:
-        """Converts data.csv to list of tuples."""
-        with open('data.csv', encoding='utf-8', mode='r') as f:
-            reader = csv.reader(f, delimiter=';')
-            data = tuple(reader)
-        return [
-            tuple(
-                [int(item) if item.isdigit() else item for item in row]
-                ) for row in data]
+        saved = self.saved_session
+        if (saved is not None and saved.pack_name != self.pack.name
+                and saved.pack_name in self.packs):
+            self.interview_settings.pack_menu.set(
+                self.packs[saved.pack_name].title
+                )
+            self.switch_pack(saved.pack_name)
+        else:
+            self.load_pack(self.pack)
+
+        self.protocol('WM_DELETE_WINDOW', self.close_app)
+
+    def close_app(self) -> None:
+        """Saves the answers of the interview and closes the app."""
+        self.interview_pass.answer_log.flush()
+        self.session.close()
+        self.io.shutdown()
+        self.db.shutdown(wait=True)
+        dispatcher.stop()
+        write_timing('ui_dispatch', dispatcher.drain_seconds,
+                     **dispatcher.get_metrics())
+        self.destroy()
+
+    @staticmethod
+    @timed('load_csv')
+    def load_csv(pack: QuestionPack) -> QuestionBank:
+        """Converts the questions of the pack to list of tuples."""
+        return pack.load_questions()
+
+    def load_pack(self, pack: QuestionPack) -> None:
+        """Loads the questions of the pack in background."""
+        self.io.submit(
+            self.load_csv,
+            pack,
+            on_done=lambda question_bank: self.set_question_bank(
+                pack, question_bank
+                )
+            )
+
+    def set_question_bank(self, pack: QuestionPack,
+                          question_bank: QuestionBank) -> None:
+        """Shows the loaded questions unless another pack is chosen."""
+        if pack is not self.pack:
+            return
+        self.question_bank = question_bank
+        self.interview_pass.set_pack(pack, question_bank)
+        if self.saved_session is not None:
+            self.after_idle(self.offer_saved_session)
+
+    def offer_saved_session(self) -> None:
+        """Asks whether to continue the interview of the last launch."""
+        saved, self.saved_session = self.saved_session, None
+        if (saved is None or saved.pack_name != self.pack.name
+                or saved.user_name not in user_directory):
+            self.session.finish()
+            return
+        answer = CTkMessagebox(
+            title='Незаконченное собеседование',
+            message=(
+                f'Собеседование пользователя {saved.user_name} '
+                'не было завершено. Продолжить его?'
+                ),
+            icon='question',
+            option_1='Нет',
+            option_2='Да'
+            ).get()
+        if answer != 'Да':
+            self.session.finish()
+            return
+        self.io.submit(
+            self.profiles.load,
+            saved.user_name,
+            on_done=lambda profile: self.resume_saved_session(saved, profile)
+            )
+
+    def resume_saved_session(self, saved: SessionState,
+                             profile: dict) -> None:
+        """Shows the read profile and continues the interview."""
+        self.profiles.put(saved.user_name, profile)
+        self.userstats.select_user(saved.user_name)
+        self.notebook.set('Пройти собеседование')
+        self.interview_pass.resume_interview(saved)
+
+    def switch_pack(self, name: str) -> None:
+        """Replaces the questions, themes and answers at every tab."""
+        pack = self.packs[name]
+        if pack is self.pack:
+            return
+        self.pack.release()
+        self.pack = pack
+        self.question_bank = QuestionBank()
+        self.interview_pass.set_pack(pack, self.question_bank)
+        self.interview_settings.set_theme_titles(pack.get_checkbox_titles())
+        self.userstats.set_theme_titles(list(pack.get_theme_titles().values()))
+        if self.current_user:
+            self.userstats.update_user_progress()
+        self.load_pack(pack)
+
+    def get_pack(self) -> QuestionPack:
+        """Returns the chosen question pack."""
+        return self.pack
 
     def create_new_user(self) -> None:
         """Makes a new window to create a new user."""
@@ -166,13 +303,15 @@ class Main(ctk.CTk):
             self.create_user_window.lift()
             self.create_user_window.focus()
 
+    @timed('hint_open')
     def show_hint_window(self, filepath: str, page_number: int) -> None:
         """Makes a new window to show the answer to the question."""
         if self.hint_window is None or not self.hint_window.winfo_exists():
             self.hint_window = HintWindow(
                 HINT_WINDOW_TITLE,
                 filepath,
-                page_number
+                page_number,
+                self.io.submit
                 )
             self.focus()
             self.hint_window.focus()
@@ -201,12 +340,62 @@ class Main(ctk.CTk):
             f'Громкость: {int(hundred_volume)}%'
             )
 
+    def write_db(self, function: Callable, *args) -> None:
+        """Makes the DB write in the DB worker, errors are reported."""
+        self.db.submit(function, *args, on_done=lambda result: None)
+
+    def load_question_difficulty(self) -> None:
+        """Reads the difficulty of questions in background."""
+        self.io.submit(
+            get_question_difficulty, on_done=self.set_question_difficulty
+            )
+
+    def set_question_difficulty(self, difficulty: dict[int, float]) -> None:
+        self.question_difficulty = difficulty
+
+    def get_question_difficulty(self) -> dict[int, float]:
+        """Returns the difficulty read last, it is empty until then."""
+        return self.question_difficulty
+
+    def request_difficulty_refresh(self) -> None:
+        """Refits the difficulty of questions in background.
+        Requests made while it runs are coalesced into one more refit.
+        """
+        if self.difficulty_refresh is not None:
+            self.is_difficulty_refresh_requested = True
+            return
+        # The refit reads the answers, so it waits for the writes before it
+        self.difficulty_refresh = self.db.submit(
+            lambda: None, on_done=self.start_difficulty_refresh
+            )
+
+    def start_difficulty_refresh(self, result=None) -> None:
+        self.difficulty_refresh = self.io.submit(
+            refresh_difficulty,
+            on_done=self.finish_difficulty_refresh,
+            on_error=self.fail_difficulty_refresh
+            )
+
+    def finish_difficulty_refresh(self, result=None) -> None:
+        self.difficulty_refresh = None
+        self.load_question_difficulty()
+        if self.is_difficulty_refresh_requested:
+            self.is_difficulty_refresh_requested = False
+            self.request_difficulty_refresh()
+
+    def fail_difficulty_refresh(self, error: Exception) -> None:
+        self.report_callback_exception(type(error), error, error.__traceback__)
+        self.finish_difficulty_refresh()
+
     def update_combobox(self) -> None:
         """Updates user list at the user statistics tab."""
         self.userstats.update_user_list()
 
     def update_progress(self) -> None:
-        """Updates users progress bars at the user statistics tab."""
+        """Updates users progress bars at the user statistics tab.
+        Theme snapshots are counted by DB, so the profile is read again.
+        """
+        self.profiles.mark_dirty(self.current_user)
         self.userstats.update_user_progress()
 
     def set_interview_mode(self,
@@ -231,7 +420,7 @@ class Main(ctk.CTk):
     def get_interview_mode(self) -> dict[Theme | str, int]:
         """Returns the interview mode uncluding:
         - chosen themes
-        - is chosen a Random mode
+        - chosen question order
         - is chosen a Free mode.
         """
         return self.interview_mode
@@ -244,6 +433,14 @@ class Main(ctk.CTk):
         """Returns current user progress."""
         return self.user_progress
 
+    def set_interview_available(self, is_available: bool) -> None:
+        """An interview begins only when the user progress is loaded,
+        otherwise its questions would be chosen from empty progress.
+        """
+        self.interview_pass.begin_button.configure(
+            state='normal' if is_available else 'disabled'
+            )
+
     def set_color_for_user_progress(self) -> None:
         """Updates question strings' color
         at the user intervew tab,
@@ -254,9 +451,10 @@ class Main(ctk.CTk):
 
 class UserStatisticsTab(ctk.CTkFrame):
     """Class for showing user statistics tab."""
-    def __init__(self, parent, create_new_user,
-                 set_current_user, set_user_progress,
-                 set_color_for_user_progress):
+    def __init__(self, parent, create_new_user, submit_io, get_pack,
+                 profiles, live_statistics, set_current_user,
+                 set_user_progress,
+                 set_color_for_user_progress, set_interview_available):
         # Setup
         super().__init__(parent)
         self.width = 1000
@@ -266,11 +464,18 @@ class UserStatisticsTab(ctk.CTkFrame):
 
         # Users vars
         self.create_new_user = create_new_user
-        self.users = get_user_names()
+        self.submit_io = submit_io
+        self.get_pack = get_pack
+        self.profiles = profiles
+        self.live_statistics = live_statistics
+        self.live_statistics.subscribe(self.show_statistics)
+        with measure('load_user_directory'):
+            self.users = user_directory.names
         self.current_user = set_current_user
         self.set_user_progress = set_user_progress
         self.chosen_user = None
         self.set_color_for_user_progress = set_color_for_user_progress
+        self.set_interview_available = set_interview_available
 
         # MESSAGE VARS
         # pink screen
@@ -282,6 +487,9 @@ class UserStatisticsTab(ctk.CTkFrame):
         self.rigth_answer_message = tk.StringVar()
         self.percentage_completion_message = tk.StringVar()
 
+        # pink screen, answer speed
+        self.latency_message = tk.StringVar()
+
         self.create_widgets()
         self.author_note()
         self.set_to_zero_progress_bars()
@@ -291,32 +499,84 @@ class UserStatisticsTab(ctk.CTkFrame):
 
     def update_user_list(self) -> None:
         """Updates the list of users in Combobox."""
-        self.combobox1['values'] = get_user_names()
+        user_directory.refresh()
+        self.combobox1['values'] = user_directory.names
 
     def reset_settings(self) -> None:
         """Turns to zero any in statistics."""
         self.chosen_user = None
         self.current_user(self.chosen_user)
+        self.live_statistics.reset(None, {}, {}, self.get_pack().theme_ranges)
         self.user_var.set('Выберите пользователя...')
         self.last_enter_message.set('')
         self.interview_duration_message.set('')
         self.rigth_answer_message.set('')
         self.percentage_completion_message.set('')
+        self.latency_message.set('')
 
     def update_user_progress(self) -> None:
-        """Updates everything in current user statistics."""
-        progress = get_right_answers_amount(
-            get_user_progress(self.chosen_user)
+        """Updates everything in current user statistics.
+        A cached profile is shown at once, otherwise it is read
+        in background and shown when it is ready.
+        """
+        user_name = self.chosen_user
+        requested_at = time.perf_counter()
+        profile = self.profiles.get(user_name)
+        if profile is not None:
+            self.show_user_profile(user_name, profile, requested_at)
+            return
+        self.set_interview_available(False)
+        self.submit_io(
+            self.profiles.load,
+            user_name,
+            on_done=lambda profile: self.cache_user_profile(
+                user_name, profile, requested_at
+                ),
+            on_error=lambda error: self.fail_user_profile(user_name, error)
+            )
+
+    def fail_user_profile(self, user_name: str, error: Exception) -> None:
+        """Reports the failed read of the chosen user. The interview
+        stays closed, choosing the user again reads the profile again.
+        """
+        if user_name != self.chosen_user:
+            return
+        self.winfo_toplevel().report_callback_exception(
+            type(error), error, error.__traceback__
+            )
+
+    def cache_user_profile(self, user_name: str, profile: dict,
+                           requested_at: float) -> None:
+        """Keeps the read profile and shows it."""
+        self.profiles.put(user_name, profile)
+        self.show_user_profile(user_name, profile, requested_at)
+
+    def show_user_profile(self, user_name: str, profile: dict,
+                          requested_at: float) -> None:
+        """Shows the profile unless another user has been chosen."""
+        if user_name != self.chosen_user:
+            return
+        self.set_user_progress(profile['progress'])
+        self.set_interview_available(True)
+        self.set_color_for_user_progress()
+        theme_snapshots = profile['theme_snapshots']
+        pack = self.get_pack()
+        self.live_statistics.reset(
+            user_name, profile['progress'], theme_snapshots, pack.theme_ranges
+            )
+        self.show_statistics(self.live_statistics.get_statistics())
+        self.latency_message.set(
+            get_latency_message(theme_snapshots, pack.get_short_theme_titles())
             )
         self.last_enter_message.set(
-            get_last_enter_message(
-                get_last_enter_date(self.chosen_user)
-                )
-                )
-        self.interview_duration_message.set(
-            f'{convert_seconds_to_hours(
-                get_user_interview_duration(self.chosen_user))} ч.'
+            get_last_enter_message(profile['last_enter_date'])
             )
+        hours = convert_seconds_to_hours(profile['interview_duration'])
+        self.interview_duration_message.set(f'{hours} ч.')
+        write_timing('user_switch', time.perf_counter() - requested_at)
+
+    def show_statistics(self, progress: StatInformation) -> None:
+        """Sets the progress bars and the amount of right answers."""
         self.rigth_answer_message.set(progress['right_answers_amount'])
         self.percentage_completion_message.set(
             progress['percentage_completion']
@@ -329,6 +589,19 @@ class UserStatisticsTab(ctk.CTkFrame):
         self.git_progress_bar.set(progress['git_progress'])
         self.sql_progress_bar.set(progress['sql_progress'])
 
+    def set_theme_titles(self, titles: list[str]) -> None:
+        """Signs the progress bars by themes of the pack."""
+        labels = (
+            self.basic_progress_label, self.oop_progress_label,
+            self.pep_progress_label, self.structures_progress_label,
+            self.alghoritms_progress_label, self.git_progress_label,
+            self.sql_progress_label
+            )
+        titles = titles + [''] * (MAX_PACK_THEMES - len(titles))
+        for label, title in zip(labels, titles):
+            label.configure(text=title)
+        self.set_to_zero_progress_bars()
+
     def set_to_zero_progress_bars(self) -> None:
         """Turns to zero every progress bar."""
         self.basic_progress_bar.set(0)
@@ -341,40 +614,29 @@ class UserStatisticsTab(ctk.CTkFrame):
 
     def delete_user(self) -> None:
         """Deletes the chosen user from DB and screen."""
-        delete_this_user(self.chosen_user)
+        self.profiles.remove(self.chosen_user)
+        self.submit_io(
+            delete_this_user,
+            self.chosen_user,
+            on_done=lambda result: self.update_user_list()
+            )
         self.reset_settings()
-        self.update_user_list()
         self.set_to_zero_progress_bars()
 
     def choose_user(self, event) -> None:
         """Processes event choosing a user.
         It updates everything at the tab.
         """
-        self.chosen_user = self.user_var.get()
+        self.select_user(self.user_var.get())
+
+    def select_user(self, user_name: str) -> None:
+        """Makes the user current and shows their statistics."""
+        self.user_var.set(user_name)
+        self.chosen_user = user_name
         self.current_user(self.chosen_user)
-        self.set_user_progress(get_user_progress(self.chosen_user))
-        self.get_current_user_statistics()
+        # The previous user progress must not be used meanwhile
+        self.set_user_progress({})
         self.update_user_progress()
-        self.set_color_for_user_progress()
-
-    def get_current_user_statistics(self) -> None:
-        """Gets current user statistics."""
-        self.last_enter_message.set(
-            get_last_enter_message(get_last_enter_date(self.chosen_user))
-        )
-
-        self.interview_duration_message.set(
-            f'{convert_seconds_to_hours(
-                get_user_interview_duration(self.chosen_user))} ч.'
-            )
-
-        messages_data = get_right_answers_amount(
-            get_user_progress(self.chosen_user)
-            )
-        self.rigth_answer_message.set(messages_data['right_answers_amount'])
-        self.percentage_completion_message.set(
-            messages_data['percentage_completion']
-            )
 
     def author_note(self) -> None:
         """Shows a title of author."""
@@ -424,19 +686,14 @@ class UserStatisticsTab(ctk.CTkFrame):
         self.combobox1 = ttk.Combobox(
             self.choose_user_frame,
             textvariable=self.user_var,
-            state="readonly")
+            state="readonly",
+            postcommand=self.update_user_list)
         self.combobox1.configure(values=self.users)
         self.combobox1.place(x=30, y=80, width=250, height=35)
 
         # Images at the buttons
-        self.create_user_button_img = ctk.CTkImage(
-            light_image=Image.open('images/add.png').resize((30, 30)),
-            dark_image=Image.open('images/add.png').resize((30, 30))
-        )
-        self.delete_user_button_img = ctk.CTkImage(
-            light_image=Image.open('images/delete.png').resize((30, 30)),
-            dark_image=Image.open('images/delete.png').resize((30, 30))
-        )
+        self.create_user_button_img = get_icon('add')
+        self.delete_user_button_img = get_icon('delete')
 
         # Buttons
         self.create_user_button = ctk.CTkButton(
@@ -463,6 +720,22 @@ class UserStatisticsTab(ctk.CTkFrame):
             command=self.delete_user)
         self.delete_user_button.place(x=320, y=80)
 
+        # Answer speed by themes
+        self.latency_label = ctk.CTkLabel(
+            self.choose_user_frame,
+            text='Время ответа (медиана / 90%)',
+            font=('Calibri', 18)
+            )
+        self.latency_label.place(x=320, y=125)
+        self.latency_message_label = tk.Label(
+            master=self.choose_user_frame,
+            textvariable=self.latency_message,
+            font=('Calibri', 11),
+            justify='left',
+            background=PINK_BACKGROUND
+            )
+        self.latency_message_label.place(x=320, y=155)
+
         # YELLOW SCREEN
         # frame
         self.global_stats_frame = ctk.CTkFrame(
@@ -682,13 +955,17 @@ class UserStatisticsTab(ctk.CTkFrame):
 
 class InterviewSettingsTab(ctk.CTkFrame):
     """Class for choosing interview's settings."""
-    def __init__(self, parent, set_interview_mode, get_volume, set_volume):
+    def __init__(self, parent, set_interview_mode, get_volume, set_volume,
+                 packs, switch_pack):
         super().__init__(parent)
         self.width = 1200
         self.place(x=0, y=0)
         self.columnconfigure((0, ), weight=1)
         self.rowconfigure((0, 1, 2, 3), weight=1)
         self.set_interview_mode = set_interview_mode
+        self.packs = packs
+        self.switch_pack = switch_pack
+        self.themes_amount = MAX_PACK_THEMES
 
         # Flags in Checkboxes
         self.basics_chosen = ctk.IntVar(value=1)
@@ -699,7 +976,7 @@ class InterviewSettingsTab(ctk.CTkFrame):
         self.git_chosen = ctk.IntVar(value=0)
         self.sql_chosen = ctk.IntVar(value=0)
 
-        # Flags in sequence mode
+        # Question order in sequence mode
         self.are_random_questions = ctk.IntVar(value=0)
 
         # Flag in free mode
@@ -752,6 +1029,18 @@ class InterviewSettingsTab(ctk.CTkFrame):
             )
         self.draw_line(self.choose_interview_mode_frame)
 
+        # Question pack
+        self.pack_menu = ctk.CTkOptionMenu(
+            master=self.choose_interview_mode_frame,
+            values=list(self.packs.values()),
+            width=200,
+            height=26,
+            fg_color=CHECKBOX_HOVER_COLOR,
+            button_color=CHECKBOX_HOVER_COLOR,
+            command=self.choose_pack)
+        self.pack_menu.set(self.packs[DEFAULT_PACK])
+        self.pack_menu.place(x=20, y=66)
+
         self.basics = ctk.CTkCheckBox(
             master=self.choose_interview_mode_frame,
             text=Theme.BASICS.value,
@@ -815,32 +1104,52 @@ class InterviewSettingsTab(ctk.CTkFrame):
             command=self.add_chosen_theme)
         self.git.place(x=1100, y=15)
 
+        # Checkboxes in order of themes in the pack
+        self.theme_checkboxes = (
+            self.basics, self.oop, self.pep, self.structures,
+            self.alghoritms, self.git, self.sql
+            )
+        self.theme_vars = (
+            self.basics_chosen, self.oop_chosen, self.pep_chosen,
+            self.structures_chosen, self.alghoritms_chosen,
+            self.git_chosen, self.sql_chosen
+            )
+
+    def choose_pack(self, title: str) -> None:
+        """Switches the question pack chosen by its title."""
+        for name, pack_title in self.packs.items():
+            if pack_title == title:
+                self.switch_pack(name)
+                return
+
+    def set_theme_titles(self, titles: list[str]) -> None:
+        """Signs the checkboxes by themes of the pack,
+        the checkboxes without a theme are turned off.
+        """
+        self.themes_amount = len(titles)
+        titles = titles + [''] * (MAX_PACK_THEMES - len(titles))
+        for checkbox, title in zip(self.theme_checkboxes, titles):
+            checkbox.configure(text=title)
+        for theme_var in self.theme_vars[self.themes_amount:]:
+            theme_var.set(0)
+        self.add_chosen_theme()
+
     def add_chosen_theme(self) -> None:
         """Transfers chosen settings to the main class."""
         # Freemode special behavior
         if self.freemode_var.get():
-            self.basics_chosen.set(1)
-            self.oop_chosen.set(1)
-            self.pep_chosen.set(1)
-            self.structures_chosen.set(1)
-            self.alghoritms_chosen.set(1)
-            self.git_chosen.set(1)
-            self.sql_chosen.set(1)
-            self.basics.configure(state=tk.DISABLED)
-            self.oop.configure(state=tk.DISABLED)
-            self.pep.configure(state=tk.DISABLED)
-            self.structures.configure(state=tk.DISABLED)
-            self.alghoritms.configure(state=tk.DISABLED)
-            self.git.configure(state=tk.DISABLED)
-            self.sql.configure(state=tk.DISABLED)
+            for theme_var in self.theme_vars[:self.themes_amount]:
+                theme_var.set(1)
+            for checkbox in self.theme_checkboxes:
+                checkbox.configure(state=tk.DISABLED)
         else:
-            self.basics.configure(state=tk.NORMAL)
-            self.oop.configure(state=tk.NORMAL)
-            self.pep.configure(state=tk.NORMAL)
-            self.structures.configure(state=tk.NORMAL)
-            self.alghoritms.configure(state=tk.NORMAL)
-            self.git.configure(state=tk.NORMAL)
-            self.sql.configure(state=tk.NORMAL)
+            for slot, checkbox in enumerate(self.theme_checkboxes):
+                checkbox.configure(
+                    state=(
+                        tk.NORMAL if slot < self.themes_amount
+                        else tk.DISABLED
+                        )
+                    )
 
         self.interview_mode = {
             Theme.BASICS: self.basics_chosen.get(),
@@ -878,23 +1187,43 @@ class InterviewSettingsTab(ctk.CTkFrame):
 
         self.random_button_off = ctk.CTkRadioButton(
             self.choose_random_interview_frame,
-            value=0,
+            value=int(QuestionOrder.SEQUENTIAL),
             text='Вопросы задают последовательно',
             variable=self.are_random_questions,
             fg_color=CHECKBOX_HOVER_COLOR,
             hover_color=CHECKBOX_HOVER_COLOR,
             command=self.add_chosen_theme)
-        self.random_button_off.place(x=420, y=40)
+        self.random_button_off.place(x=420, y=20)
 
         self.random_button_on = ctk.CTkRadioButton(
             self.choose_random_interview_frame,
-            value=1,
+            value=int(QuestionOrder.RANDOM),
             text='Вопросы задают случайно',
             variable=self.are_random_questions,
             fg_color=CHECKBOX_HOVER_COLOR,
             hover_color=CHECKBOX_HOVER_COLOR,
             command=self.add_chosen_theme)
-        self.random_button_on.place(x=700, y=40)
+        self.random_button_on.place(x=700, y=20)
+
+        self.easiest_first_button = ctk.CTkRadioButton(
+            self.choose_random_interview_frame,
+            value=int(QuestionOrder.EASIEST_FIRST),
+            text='Сначала лёгкие',
+            variable=self.are_random_questions,
+            fg_color=CHECKBOX_HOVER_COLOR,
+            hover_color=CHECKBOX_HOVER_COLOR,
+            command=self.add_chosen_theme)
+        self.easiest_first_button.place(x=420, y=60)
+
+        self.hardest_first_button = ctk.CTkRadioButton(
+            self.choose_random_interview_frame,
+            value=int(QuestionOrder.HARDEST_FIRST),
+            text='Сначала сложные',
+            variable=self.are_random_questions,
+            fg_color=CHECKBOX_HOVER_COLOR,
+            hover_color=CHECKBOX_HOVER_COLOR,
+            command=self.add_chosen_theme)
+        self.hardest_first_button.place(x=700, y=60)
 
     def choose_free_mode(self) -> None:
         """Creates a freemode setting."""
@@ -985,12 +1314,13 @@ class InterviewSettingsTab(ctk.CTkFrame):
 
 class InterviewPassTab(ctk.CTkFrame):
     """Class for interview passing."""
-    def __init__(self, parent, themes,
+    def __init__(self, parent, pack,
                  database, show_hint_window,
                  get_volume, set_volume,
                  get_current_user, set_notebook_status,
                  get_interview_mode, get_user_progress,
-                 update_progress):
+                 update_progress, request_difficulty_refresh,
+                 get_question_difficulty, write_db, profiles, session):
         # Setup
         super().__init__(parent)
         self.width = 1200
@@ -1000,7 +1330,8 @@ class InterviewPassTab(ctk.CTkFrame):
 
         # The outer functions
         self.question_bank = database
-        self.themes = themes
+        self.pack = pack
+        self.themes = pack.get_theme_titles()
         self.show_hint_window = show_hint_window
         self.get_volume = get_volume
         self.set_volume = set_volume
@@ -1009,6 +1340,10 @@ class InterviewPassTab(ctk.CTkFrame):
         self.get_interview_mode = get_interview_mode
         self.get_user_progress = get_user_progress
         self.update_progress = update_progress
+        self.request_difficulty_refresh = request_difficulty_refresh
+        self.get_question_difficulty = get_question_difficulty
+        self.profiles = profiles
+        self.session = session
 
         # Instance vars
         self.current_user = None
@@ -1021,6 +1356,8 @@ class InterviewPassTab(ctk.CTkFrame):
         self.stop_interview_time = datetime.datetime
         self.button_text = ctk.StringVar(value='Начать собеседование')
         self.question_key = None
+        self.question_shown_at: Optional[float] = None
+        self.answer_log = AnswerLog(write=write_db)
 
         # Flags
         self.is_interview_in_progress = False
@@ -1057,14 +1394,8 @@ class InterviewPassTab(ctk.CTkFrame):
         self.interview_frame.grid(row=0, column=0, padx=30, pady=10)
 
         # first row
-        self.begin_button_start = ctk.CTkImage(
-            light_image=Image.open('images/start.png').resize((30, 30)),
-            dark_image=Image.open('images/start.png').resize((30, 30))
-        )
-        self.begin_button_stop = ctk.CTkImage(
-            light_image=Image.open('images/stop.png').resize((30, 30)),
-            dark_image=Image.open('images/stop.png').resize((30, 30))
-        )
+        self.begin_button_start = get_icon('start')
+        self.begin_button_stop = get_icon('stop')
 
         self.begin_button = ctk.CTkButton(
             master=self.interview_frame,
@@ -1089,14 +1420,8 @@ class InterviewPassTab(ctk.CTkFrame):
             )
         self.replay_button.place(x=400, y=20)
 
-        self.mute_button_img_ON = ctk.CTkImage(
-            light_image=Image.open('images/sound_ON.png').resize((30, 30)),
-            dark_image=Image.open('images/sound_ON.png').resize((30, 30))
-        )
-        self.mute_button_img_OFF = ctk.CTkImage(
-            light_image=Image.open('images/sound_OFF.png').resize((30, 30)),
-            dark_image=Image.open('images/sound_OFF.png').resize((30, 30))
-        )
+        self.mute_button_img_ON = get_icon('sound_ON')
+        self.mute_button_img_OFF = get_icon('sound_OFF')
 
         self.mute_button = ctk.CTkButton(
             master=self.interview_frame,
@@ -1214,41 +1539,7 @@ class InterviewPassTab(ctk.CTkFrame):
             anchor=tk.W
             )
 
-        # adding data
-        for theme_id, theme_title in self.themes.items():
-            self.question_tree.insert(
-                '',
-                tk.END,
-                text=theme_title,
-                iid=theme_id,
-                open=False
-                )
-
-        # adding children of first node
-        for data in self.question_bank:
-            self.question_tree.insert(
-                '',
-                tk.END,
-                text=f'Вопрос {data[0] - 7}. {data[2]}',
-                iid=data[0],
-                open=False
-                )
-            match data[0]:
-                case num if qt.BASIC_FIRST_QUESTION <= num <= qt.BASIC_LAST_QUESTION:
-                    self.question_tree.move(data[0], 0, data[1])
-                case num if qt.OOP_FIRST_QUESTION <= num <= qt.OOP_LAST_QUESTION:
-                    self.question_tree.move(data[0], 1, data[1])
-                case num if qt.PEP8_FIRST_QUESTION <= num <= qt.PEP8_LAST_QUESTION:
-                    self.question_tree.move(data[0], 2, data[1])
-                case num if qt.STRUCTURES_FIRST_QUESTION <= num <= qt.STRUCTURES_LAST_QUESTION:
-                    self.question_tree.move(data[0], 3, data[1])
-                case num if qt.ALGHORITMS_FIRST_QUESTION <= num <= qt.ALGHORITMS_LAST_QUESTION:
-                    self.question_tree.move(data[0], 4, data[1])
-                case num if qt.GIT_FIRST_QUESTION <= num <= qt.GIT_LAST_QUESTION:
-                    self.question_tree.move(data[0], 5, data[1])
-                case num if qt.SQL_FIRST_QUESTION <= num <= qt.SQL_LAST_QUESTION:
-                    self.question_tree.move(data[0], 6, data[1])
-
+        self.fill_question_tree()
         self.question_tree.place(x=20, y=20, width=490, height=580)
 
         self.scroll_question_tree = ctk.CTkScrollbar(
@@ -1264,12 +1555,59 @@ class InterviewPassTab(ctk.CTkFrame):
         self.style.configure('Treeview.Heading', font=('Calibri', 18))
         self.style.configure('Treeview', font=('Calibri', 12))
 
+    def set_pack(self, pack, question_bank):
+        """Refills the question tree with the questions of the pack."""
+        self.pack = pack
+        self.themes = pack.get_theme_titles()
+        self.question_bank = question_bank
+        self.question_key = None
+        self.insert_question_in_textfield(None)
+        self.question_tree.delete(*self.question_tree.get_children())
+        self.fill_question_tree()
+        self.set_color_for_user_progress()
+
+    @timed('treeview_population')
+    def fill_question_tree(self):
+        """Adds themes and questions to the question tree."""
+        # adding data
+        for theme_id, theme_title in self.themes.items():
+            self.question_tree.insert(
+                '',
+                tk.END,
+                text=theme_title,
+                iid=f'theme_{theme_id}',
+                open=False
+                )
+
+        # adding questions to their themes, items are named by ids
+        for number, data in enumerate(self.question_bank, start=1):
+            theme = self.pack.get_question_theme(data[0])
+            if theme is None:
+                continue
+            self.question_tree.insert(
+                f'theme_{theme}',
+                data[1],
+                text=f'Вопрос {number}. {data[2]}',
+                iid=data[0],
+                open=False
+                )
+
     def begin_interview(self):
         """Manages interview passing.
         - Loads essential information
         - Check user's existance
         - Updates DB data.
         """
+        if not self.question_bank:
+            CTkMessagebox(
+                title='Подождите',
+                message='Вопросы набора ещё загружаются, '
+                        'начните собеседование через несколько секунд',
+                icon='info',
+                option_1='Хорошо'
+                )
+            return
+
         # Turn ON answers buttons
         self.positive_button.configure(state='normal')
         self.negative_button.configure(state='normal')
@@ -1279,39 +1617,91 @@ class InterviewPassTab(ctk.CTkFrame):
         self.interview_mode = self.get_interview_mode()
 
         if not self.is_interview_in_progress:
-            self.start_interview_time = self.start_interview_time.today()
-            update_last_enter_date(
-                self.current_user,
-                self.start_interview_time
-                )
-            self.begin_button.configure(
-                image=self.begin_button_stop
+            with measure('interview_start'):
+                self.start_interview()
+        else:
+            self.stop_interview()
+
+    def start_interview(self):
+        """Starts the interview according the chosen mode."""
+        self.start_interview_time = self.start_interview_time.today()
+        self.answer_log.start(self.current_user)
+        self.profiles.set_last_enter_date(
+            self.current_user,
+            self.start_interview_time
+            )
+        self.begin_button.configure(
+            image=self.begin_button_stop
+            )
+        self.button_text.set('Закончить собеседование')
+        self.is_interview_in_progress = True
+        self.set_notebook_status('disabled')
+        if not self.current_user:
+            CTkMessagebox(
+                title='Предупреждение',
+                message='Вы не выбрали пользователя. Статистика не ведется'
                 )
-            self.button_text.set('Закончить собеседование')
-            self.is_interview_in_progress = True
-            self.set_notebook_status('disabled')
-            if not self.current_user:
-                CTkMessagebox(
-                    title='Предупреждение',
-                    message='Вы не выбрали пользователя. Статистика не ведется'
-                    )
+            self.question_tree.configure(selectmode='browse')
+            self.open_chosen_themes()
+            self.set_pointer_at_first_question()
+        else:
+            if self.interview_mode['Freemode']:
                 self.question_tree.configure(selectmode='browse')
-                self.open_chosen_themes()
-                self.set_pointer_at_first_question()
             else:
-                if self.interview_mode['Freemode']:
-                    self.question_tree.configure(selectmode='browse')
-                else:
-                    self.question_tree.configure(selectmode='none')
-                self.open_chosen_themes()
-                self.set_pointer_at_first_question()
-        else:
-            self.stop_interview()
+                self.question_tree.configure(selectmode='none')
+            self.open_chosen_themes()
+            self.set_pointer_at_first_question()
+            if self.is_interview_in_progress:
+                self.session.start(
+                    SessionState(
+                        self.current_user,
+                        self.pack.name,
+                        list(self.interview_mode.values()),
+                        questions=deque(self.questions_while_interviewing)
+                        )
+                    )
+
+    def resume_interview(self, state: SessionState) -> None:
+        """Continues the interview saved by the checkpoint,
+        its time before the crash is counted.
+        """
+        self.current_user = state.user_name
+        self.interview_mode = dict(zip(self.get_interview_mode(), state.mode))
+        self.user_progress = self.get_user_progress()
+        elapsed = datetime.timedelta(seconds=state.elapsed)
+        self.start_interview_time = datetime.datetime.today() - elapsed
+        self.answer_log.start(self.current_user)
+        self.positive_button.configure(state='normal')
+        self.negative_button.configure(state='normal')
+        self.begin_button.configure(image=self.begin_button_stop)
+        self.button_text.set('Закончить собеседование')
+        self.is_interview_in_progress = True
+        self.set_notebook_status('disabled')
+        self.question_tree.configure(
+            selectmode='browse' if self.interview_mode['Freemode'] else 'none'
+            )
+        themes_status = state.mode[:MAX_PACK_THEMES]
+        for theme, is_chosen in zip(self.themes, themes_status):
+            self.question_tree.item(f'theme_{theme}', open=bool(is_chosen))
+        # Questions removed by an update of the pack are skipped
+        state.questions = deque(
+            question_id for question_id in state.questions
+            if question_id in self.question_bank
+            )
+        self.questions_while_interviewing.clear()
+        self.questions_while_interviewing.extend(state.questions)
+        self.session.start(state)
+        if self.questions_while_interviewing:
+            self.show_question(self.questions_while_interviewing[0])
 
     def stop_interview(self):
         """Stops the interview updating user progress."""
+        self.session.finish()
         self.stop_interview_time = self.stop_interview_time.today()
         self.update_interview_duration()
+        self.answer_log.flush()
+        # New answers change the difficulty for the next sessions
+        self.request_difficulty_refresh()
         self.is_interview_in_progress = False
         self.set_notebook_status('normal')
         self.begin_button.configure(image=self.begin_button_start)
@@ -1319,6 +1709,7 @@ class InterviewPassTab(ctk.CTkFrame):
         self.question_tree.configure(selectmode='none')
         self.question_list.clear()
         self.questions_while_interviewing.clear()
+        self.question_shown_at = None
         self.positive_button.configure(state='disabled')
         self.negative_button.configure(state='disabled')
         if self.current_user:
@@ -1327,22 +1718,24 @@ class InterviewPassTab(ctk.CTkFrame):
     def update_interview_duration(self):
         """Updates an interview duration on DB."""
         if self.current_user:
-            initial_duration = get_user_interview_duration(self.current_user)
             seconds_left = count_interview_duration(
                 self.start_interview_time,
                 self.stop_interview_time
                 )
-            result_duration = initial_duration + seconds_left
-            update_interview_duration(self.current_user, result_duration)
+            self.profiles.add_interview_duration(
+                self.current_user, seconds_left
+                )
 
     def open_chosen_themes(self):
         """Opens the themes in the question tree which were chosen."""
         for theme in self.question_tree.get_children():
             self.question_tree.item(theme, open=False)
-        themes_status = tuple(self.interview_mode.values())[:7]
+        themes_status = tuple(self.interview_mode.values())[:MAX_PACK_THEMES]
+        # Checkboxes go in order of the pack themes
         open_themes = [
-            theme_index
-            for theme_index, is_chosen in enumerate(themes_status) if is_chosen
+            theme_id
+            for theme_id, is_chosen in zip(self.themes, themes_status)
+            if is_chosen
             ]
         if not open_themes:
             CTkMessagebox(
@@ -1353,99 +1746,50 @@ class InterviewPassTab(ctk.CTkFrame):
                 )
             self.stop_interview()
         for theme in open_themes:
-            self.question_tree.item(theme, open=True)
+            self.question_tree.item(f'theme_{theme}', open=True)
         self.generate_question_list(open_themes)
 
     def generate_question_list(self, open_themes):
         """Generares a question list for this session."""
         self.user_progress = self.get_user_progress()
-        user_right_answer = {
-            question_number
-            for question_number, is_right
-            in self.user_progress.items() if is_right
-            }
-
-        for theme in open_themes:
-            match theme:
-                case 0:
-                    self.question_list += [
-                        question_number
-                        for question_number
-                        in range(qt.BASIC_FIRST_QUESTION,
-                                 qt.BASIC_LAST_QUESTION + 1)
-                        ]
-                case 1:
-                    self.question_list += [
-                        question_number
-                        for question_number
-                        in range(qt.OOP_FIRST_QUESTION,
-                                 qt.OOP_LAST_QUESTION + 1)
-                        ]
-                case 2:
-                    self.question_list += [
-                        question_number
-                        for question_number
-                        in range(qt.PEP8_FIRST_QUESTION,
-                                 qt.PEP8_LAST_QUESTION + 1)
-                        ]
-                case 3:
-                    self.question_list += [
-                        question_number
-                        for question_number
-                        in range(qt.STRUCTURES_FIRST_QUESTION,
-                                 qt.STRUCTURES_LAST_QUESTION + 1)
-                        ]
-                case 4:
-                    self.question_list += [
-                        question_number
-                        for question_number
-                        in range(qt.ALGHORITMS_FIRST_QUESTION,
-                                 qt.ALGHORITMS_LAST_QUESTION + 1)
-                        ]
-                case 5:
-                    self.question_list += [
-                        question_number
-                        for question_number
-                        in range(qt.GIT_FIRST_QUESTION,
-                                 qt.GIT_LAST_QUESTION + 1)
-                        ]
-                case 6:
-                    self.question_list += [
-                        question_number
-                        for question_number
-                        in range(qt.SQL_FIRST_QUESTION,
-                                 qt.SQL_LAST_QUESTION + 1)
-                        ]
-        self.question_list = [
-            question_number
-            for question_number
-            in self.question_list if question_number not in user_right_answer
-            ]
-        if self.interview_mode['Random']:
-            random.shuffle(self.question_list)
+        order = self.interview_mode['Random']
+        self.question_list = generate_question_list(
+            open_themes,
+            self.user_progress,
+            order,
+            self.get_question_difficulty() if order in (
+                QuestionOrder.EASIEST_FIRST, QuestionOrder.HARDEST_FIRST
+                ) else None,
+            self.pack.theme_ranges,
+            self.question_bank
+            )
 
     # CORRECT OR WRONG ANSWER SECTION
     def answer_correctly(self):
         """Manages user progress when
         user has answered correctrly.
         """
+        response_time = self.get_response_time()
         try:
             if not self.interview_mode['Freemode']:
                 self.turn_to_green()
                 index = self.questions_while_interviewing.popleft()
-                self.question_tree.selection_set(
-                    (str(self.questions_while_interviewing[0]), )
-                    )
-                self.question_tree.see(
-                    (str(self.questions_while_interviewing[0]), )
-                    )
+                self.session.pop(index)
+                self.show_question(self.questions_while_interviewing[0])
                 self.speak_theory_question()
                 self.user_progress[index] = True
-                update_user_progress(self.current_user, self.user_progress)
+                self.answer_log.add(index, True, response_time)
+                self.profiles.set_progress(
+                    self.current_user, self.user_progress
+                    )
             else:
                 self.turn_to_green()
-                self.user_progress[self.question_key + 8] = True
-                update_user_progress(self.current_user, self.user_progress)
+                if isinstance(self.question_key, int):
+                    self.answer_log.add(self.question_key, True, response_time)
+                    self.user_progress[self.question_key] = True
+                    self.profiles.set_progress(
+                        self.current_user, self.user_progress
+                        )
         except IndexError:
             self.stop_interview()
             CTkMessagebox(
@@ -1459,41 +1803,53 @@ class InterviewPassTab(ctk.CTkFrame):
         """Manages user progress when
         user has answered wrong.
         """
+        response_time = self.get_response_time()
         if not self.interview_mode['Freemode']:
             self.turn_to_red()
-            self.questions_while_interviewing.rotate(-1)
-            self.question_tree.selection_set(
-                (str(self.questions_while_interviewing[0]), )
-                )
-            self.question_tree.see(
-                (str(self.questions_while_interviewing[0]), )
+            self.answer_log.add(
+                self.questions_while_interviewing[0], False, response_time
                 )
+            self.session.rotate(self.questions_while_interviewing[0])
+            self.questions_while_interviewing.rotate(-1)
+            self.show_question(self.questions_while_interviewing[0])
             self.speak_theory_question()
         else:
             self.turn_to_red()
+            if isinstance(self.question_key, int):
+                self.answer_log.add(self.question_key, False, response_time)
 
     def set_pointer_at_first_question(self):
         """Shows the first question when interview has started."""
         for question_number in self.question_list:
             self.questions_while_interviewing.append(question_number)
         try:
-            self.question_tree.selection_set(
-                (str(self.questions_while_interviewing[0]), )
-                )
-            self.question_tree.see(
-                (str(self.questions_while_interviewing[0]), )
-                )
+            self.show_question(self.questions_while_interviewing[0])
             self.speak_theory_question()
         except IndexError:
             pass
 
+    def show_question(self, question_number):
+        """Selects the question in the tree and starts its timing."""
+        self.question_tree.selection_set((str(question_number), ))
+        self.question_tree.see((str(question_number), ))
+        self.question_shown_at = time.perf_counter()
+
+    def get_response_time(self) -> Optional[int]:
+        """Returns milliseconds passed since the question was shown."""
+        if self.question_shown_at is None:
+            return None
+        return round(1000 * (time.perf_counter() - self.question_shown_at))
+
     def set_color_for_user_progress(self):
         """Turns to green or red user's answer."""
+        # The tree is empty until the questions are loaded
+        if not self.question_bank:
+            return
+
         # Set zero (white) color in everywhere
-        for question_number in range(qt.BASIC_FIRST_QUESTION,
-                                     qt.SQL_LAST_QUESTION + 1):
+        for data in self.question_bank:
             self.question_tree.item(
-                question_number,
+                data[0],
                 tags=(WHITE, ),
                 values=(WHITE, )
                 )
@@ -1504,7 +1860,7 @@ class InterviewPassTab(ctk.CTkFrame):
 
         # Get color of questions according user progress
         for question_number, is_right in self.user_progress.items():
-            if is_right:
+            if is_right and question_number in self.question_bank:
                 self.question_tree.item(
                     question_number,
                     tags=(GREEN, ), values=(GREEN, )
@@ -1515,7 +1871,7 @@ class InterviewPassTab(ctk.CTkFrame):
         """Turns user's answer to green."""
         if isinstance(self.question_key, int):
             self.question_tree.item(
-                self.question_key + 8,
+                self.question_key,
                 tags=(GREEN, ),
                 values=(GREEN, )
                 )
@@ -1525,18 +1881,17 @@ class InterviewPassTab(ctk.CTkFrame):
         """Turns user's answer to red."""
         if isinstance(self.question_key, int):
             self.question_tree.item(
-                self.question_key + 8, tags=(RED, ), values=(RED, )
+                self.question_key, tags=(RED, ), values=(RED, )
                 )
             self.question_tree.tag_configure(RED, background=RED)
 
     def push_hint_button(self):
         """Shows the PDF-file with correct answer."""
         if isinstance(self.question_key, int):
+            question = self.question_bank.get(self.question_key)
             self.show_hint_window(
-                filepath=(
-                    f'knowledge/{self.question_bank[self.question_key][5]}.pdf'
-                    ),
-                page_number=self.question_bank[self.question_key][6]
+                filepath=self.pack.get_pdf(question[5]),
+                page_number=question[6]
                 )
 
     # SOUNDS AND VOLUME SECTION
@@ -1547,37 +1902,38 @@ class InterviewPassTab(ctk.CTkFrame):
         else:
             self.set_volume(0.5)
 
-    def prepare_livecoding(self):
-        """Prepares the text from livecoding textbox to speech (TTS)."""
+    @staticmethod
+    def speak_text(text, volume):
+        """Plays the text (TTS), it runs in a separate thread
+        and gets copies of everything it needs from the main one.
+        """
         try:
-            if self.get_volume():
+            with measure('tts_start'):
                 engine = pyttsx3.init()
-                engine.setProperty('volume', self.get_volume())
-                engine.say(self.question_bank[
-                    self.questions_while_interviewing[0] - 8][4])
-                engine.runAndWait()
+                engine.setProperty('volume', volume)
+                engine.say(text)
+            engine.runAndWait()
         except RuntimeError:
             pass
 
-    def prepare_theory_question(self):
-        """Prepares the text from theory textbox to speech (TTS)."""
-        try:
-            if self.get_volume():
-                engine = pyttsx3.init()
-                engine.setProperty('volume', self.get_volume())
-                engine.say(self.question_bank[
-                    self.questions_while_interviewing[0] - 8][3])
-                engine.runAndWait()
-        except RuntimeError:
-            pass
+    def start_speaking(self, column):
+        """Plays the column of the current question if sound is on."""
+        volume = self.get_volume()
+        if not volume or not self.questions_while_interviewing:
+            return
+        question_number = self.questions_while_interviewing[0]
+        text = self.question_bank.get(question_number)[column]
+        threading.Thread(
+            target=self.speak_text, args=(text, volume), daemon=True
+            ).start()
 
     def speak_theory_question(self):
         """Plays theory question."""
-        threading.Thread(target=self.prepare_theory_question).start()
+        self.start_speaking(3)
 
     def speak_livecoding(self):
         """Plays livecoding question."""
-        threading.Thread(target=self.prepare_livecoding).start()
+        self.start_speaking(4)
 
     # EVENTS SECTION
     def context_menu_event_loop(self, text_box):
@@ -1598,27 +1954,20 @@ class InterviewPassTab(ctk.CTkFrame):
     def insert_question_in_textfield(self, question_key):
         """Inserts the questions to the textboxes."""
         if question_key is not None:
+            question = self.question_bank.get(question_key)
             self.theory_textbox.delete('1.0', 'end')
             self.coding_textbox.delete('1.0', 'end')
-            self.theory_textbox.insert('1.0',
-                                       self.question_bank[question_key][3])
-            self.coding_textbox.insert('1.0',
-                                       self.question_bank[question_key][4])
+            self.theory_textbox.insert('1.0', question[3])
+            self.coding_textbox.insert('1.0', question[4])
         else:
             self.theory_textbox.delete('1.0', 'end')
             self.coding_textbox.delete('1.0', 'end')
 
     def item_select(self, event):
         """Allows to select items from question tree."""
-        for i in self.question_tree.selection():
-            self.question_key = (
-                self.question_tree.item(i)['text'].split(
-                    '. ')[0].strip('Вопрос ')
-                )
-            self.question_key = (
-                int(self.question_key) - 1
-                if self.question_key.isdigit() else None
-                )
+        for item in self.question_tree.selection():
+            self.question_key = self.question_bank.get_id(item)
+            self.question_shown_at = time.perf_counter()
             self.insert_question_in_textfield(self.question_key)
 
     def copy_text(event):
@@ -1643,6 +1992,7 @@ class CreateNewUser(ctk.CTkToplevel):
         if platform.startswith("win"):
             self.after(200, lambda: self.iconbitmap("images/icon.ico"))
         self.update_combobox = update_combobox
+        user_directory.refresh()
 
         # Vars
         self.user_name = ctk.StringVar()
@@ -1697,37 +2047,24 @@ class CreateNewUser(ctk.CTkToplevel):
 
     def close_the_window(self):
         """Destroys the window."""
+        timers.cancel(self.error_label)
         self.destroy()
 
     def add_to_db(self):
         """Adds a new user to DB provided he passes a validation."""
         current_user = self.user_name.get()
-        if is_name_empty(current_user):
-            self.error_label.config(background='red')
-            self.error_message.set(ValidResponse.EMPTY_NAME)
-            self.set_timer(3)
-        elif is_name_too_short(current_user):
-            self.error_label.config(background='red')
-            self.error_message.set(ValidResponse.SHORT_NAME)
-            self.set_timer(3)
-        elif is_name_too_long(current_user):
-            self.error_label.config(background='red')
-            self.error_message.set(ValidResponse.NAME_TOO_LONG)
-            self.set_timer(3)
-        elif has_name_first_wrong_symbol(current_user):
-            self.error_label.config(background='red')
-            self.error_message.set(ValidResponse.WRONG_FIRST_SYMBOL)
-            self.set_timer(3)
-        elif has_name_wrong_symbols(current_user):
+        violations = validate_name(current_user)
+        if violations:
+            # The first violation is shown, the label fits one line
             self.error_label.config(background='red')
-            self.error_message.set(ValidResponse.WRONG_SYMBOLS)
+            self.error_message.set(violations[0])
             self.set_timer(3)
-        elif is_user_already_exists(current_user):
+        elif not create_new_user(current_user):
             self.error_label.config(background='red')
             self.error_message.set(ValidResponse.USER_ALREADY_EXISTS)
             self.set_timer(3)
+            self.update_combobox()
         else:
-            create_new_user(self.user_name.get())
             self.update_combobox()
             CommandTimer(1, self.destroy, self.error_label, self.error_message)
 
@@ -1738,7 +2075,7 @@ class CreateNewUser(ctk.CTkToplevel):
 
 class HintWindow(ctk.CTkToplevel):
     """Class for a new window showing a right answer."""
-    def __init__(self, title, filepath, current_page):
+    def __init__(self, title, filepath, current_page, submit_io):
         # Setup
         super().__init__()
         self.title(title)
@@ -1753,6 +2090,7 @@ class HintWindow(ctk.CTkToplevel):
         # The outer functions
         self.file = filepath
         self.current_page = current_page
+        self.submit_io = submit_io
 
         # Vars
         self.numPages = None
@@ -1810,28 +2148,46 @@ class HintWindow(ctk.CTkToplevel):
             )
         self.page_label.grid(row=0, column=2, padx=5)
 
+        # The file is opened and pages are rendered in background
         if self.file:
-            self.miner = PDFMiner(self.file)
-            data, numPages = self.miner.get_metadata()
-            if numPages:
-                self.numPages = numPages
-                self.display_page()
+            self.submit_io(PDFMiner, self.file, on_done=self.show_pdf)
+
+    def show_pdf(self, miner):
+        """Shows the opened PDF-file unless the window is closed."""
+        if not self.winfo_exists():
+            return
+        self.miner = miner
+        data, numPages = self.miner.get_metadata()
+        if numPages:
+            self.numPages = numPages
+            self.display_page()
 
     def display_page(self):
-        """Shows a particular page."""
-        if 0 <= self.current_page < self.numPages:
-            self.img_file = self.miner.get_page(self.current_page)
-            self.output.create_image(0, 0, anchor='nw', image=self.img_file)
-            self.stringified_current_page = self.current_page + 1
-            self.pages_amount.set(
-                f'Страница: {self.stringified_current_page} из {self.numPages}'
+        """Renders a particular page."""
+        if self.numPages and 0 <= self.current_page < self.numPages:
+            self.submit_io(
+                self.miner.get_page_data,
+                self.current_page,
+                on_done=lambda image_data, page_number=self.current_page:
+                    self.show_page(page_number, image_data)
                 )
-            region = self.output.bbox(tk.ALL)
-            self.output.configure(scrollregion=region)
+
+    def show_page(self, page_number, image_data):
+        """Shows the rendered page unless another one is chosen."""
+        if not self.winfo_exists() or page_number != self.current_page:
+            return
+        self.img_file = PhotoImage(data=image_data)
+        self.output.create_image(0, 0, anchor='nw', image=self.img_file)
+        self.stringified_current_page = self.current_page + 1
+        self.pages_amount.set(
+            f'Страница: {self.stringified_current_page} из {self.numPages}'
+            )
+        region = self.output.bbox(tk.ALL)
+        self.output.configure(scrollregion=region)
 
     def next_page(self):
         """Turns to the next page."""
-        if self.current_page <= self.numPages - 1:
+        if self.numPages and self.current_page <= self.numPages - 1:
             self.current_page += 1
             self.display_page()
 
@@ -1843,10 +2199,18 @@ class HintWindow(ctk.CTkToplevel):
 
 
 class PDFMiner:
-    """Class for rendering PDF-files."""
+    """Class for rendering PDF-files.
+    The document is used by one thread at a time.
+    It is opened by its path or from its content in a pack archive.
+    """
     def __init__(self, filepath):
+        self.lock = threading.Lock()
         self.filepath = filepath
-        self.pdf = fitz.open(self.filepath)
+        if isinstance(filepath, str):
+            self.pdf = fitz.open(self.filepath)
+        else:
+            # fitz copies the stream, only this PDF is read from the archive
+            self.pdf = fitz.open(stream=bytes(filepath), filetype='pdf')
         self.first_page = self.pdf.load_page(0)
         self.width, self.height = (
             self.first_page.rect.width,
@@ -1860,15 +2224,19 @@ class PDFMiner:
         return metadata, numPages
 
     def get_page(self, page_num):
-        page = self.pdf.load_page(page_num)
-        if self.zoom:
-            mat = fitz.Matrix(self.zoom, self.zoom)
-            pix = page.get_pixmap(matrix=mat)
-        else:
-            pix = page.get_pixmap()
-        px1 = fitz.Pixmap(pix, 0) if pix.alpha else pix
-        imgdata = px1.tobytes("ppm")
-        return PhotoImage(data=imgdata)
+        return PhotoImage(data=self.get_page_data(page_num))
+
+    def get_page_data(self, page_num):
+        """Renders the page to PPM, it does not need Tk."""
+        with self.lock:
+            page = self.pdf.load_page(page_num)
+            if self.zoom:
+                mat = fitz.Matrix(self.zoom, self.zoom)
+                pix = page.get_pixmap(matrix=mat)
+            else:
+                pix = page.get_pixmap()
+            px1 = fitz.Pixmap(pix, 0) if pix.alpha else pix
+            return px1.tobytes("ppm")
 
     def get_text(self, page_num):
         page = self.pdf.load_page(page_num)
@@ -1877,7 +2245,22 @@ class PDFMiner:
 
 
 if __name__ == '__main__':
-    create_db()
-    ctk.set_appearance_mode("Light")
-    main_window = Main(APP_NAME, APP_RESOLUTION)
-    main_window.mainloop()
+    parser = argparse.ArgumentParser(description=APP_NAME)
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help=f'dump cProfile statistics to {PROFILE_FILE}'
+        )
+    args = parser.parse_args()
+
+    with profile(args.profile):
+        launch_time = time.perf_counter()
+        with measure('create_db'):
+            create_db()
+        ctk.set_appearance_mode("Light")
+        with measure('main_window'):
+            main_window = Main(APP_NAME, APP_RESOLUTION)
+        main_window.after_idle(
+            lambda: write_timing('startup', time.perf_counter() - launch_time)
+            )
+        main_window.mainloop()
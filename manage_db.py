@@ -1,22 +1,67 @@
 import datetime
-import json
 
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import bindparam, case, delete, func, select, update
+from sqlalchemy.dialects.sqlite import insert
 
-from models import engine, User
-from settings import QuestionThreshold as qt
+from models import (AnswerEvent, engine, PackVersion, QuestionDifficulty,
+                    QuestionSnapshot, ThemeSnapshot, User)
+from progress_codec import decode_progress, EMPTY_PROGRESS, encode_progress
+from quantile_sketch import QuantileSketch
+from question_packs import get_question_theme
+from user_directory import user_directory
 
 
 # user_name column
-def create_new_user(user_name: str) -> None:
+def create_new_user(user_name: str) -> bool:
+    """Returns False if the user already exists."""
     with engine.connect() as conn:
-        conn.execute(insert(User).values(
+        result = conn.execute(insert(User).values(
             user_name=user_name,
             interviews_duration=0,
-            progress=_get_zero_progress()
+            progress=EMPTY_PROGRESS
+            ).on_conflict_do_nothing(index_elements=[User.user_name])
             )
+        conn.commit()
+    user_directory.add(user_name)
+    return result.rowcount == 1
+
+
+def create_new_users(user_names: list[str]) -> int:
+    """Adds the users in one transaction, existing ones are skipped.
+    Returns the number of created users.
+    """
+    if not user_names:
+        return 0
+    with engine.connect() as conn:
+        result = conn.execute(
+            insert(User).on_conflict_do_nothing(
+                index_elements=[User.user_name]
+                ),
+            [
+                {
+                    'user_name': user_name,
+                    'interviews_duration': 0,
+                    'progress': EMPTY_PROGRESS,
+                    }
+                for user_name in user_names
+                ]
             )
         conn.commit()
+    user_directory.add_many(user_names)
+    return result.rowcount
+
+
+def get_roster() -> list[dict]:
+    """Returns every user with the enter date and interviews time."""
+    with engine.connect() as conn:
+        result = conn.execute(
+            select(
+                User.user_name,
+                User.last_enter_date,
+                User.interviews_duration
+                ).order_by(User.id)
+            )
+        return [row._asdict() for row in result]
 
 
 def get_user_names() -> list[str]:
@@ -32,9 +77,13 @@ def get_users_list() -> list[tuple[str]]:
 
 
 def delete_this_user(user_name: str) -> None:
+    user_id = select(User.id).where(User.user_name == user_name)
     with engine.connect() as conn:
+        for table in (AnswerEvent, QuestionSnapshot, ThemeSnapshot):
+            conn.execute(delete(table).where(table.user_id.in_(user_id)))
         conn.execute(delete(User).where(User.user_name == user_name))
         conn.commit()
+    user_directory.remove(user_name)
 
 
 # last_enter_date Column
@@ -80,11 +129,7 @@ def update_interview_duration(user_name: str, duration) -> None:
 # progress Column
 def get_user_progress(
         user_name: str) -> dict[int, bool]:
-    progress = json.loads(load_user_progress(user_name))
-    return {
-        int(question_number): is_rigth
-        for question_number, is_rigth in progress.items()
-        }
+    return decode_progress(load_user_progress(user_name))
 
 
 def load_user_progress(user_name: str) -> str:
@@ -100,17 +145,280 @@ def update_user_progress(user_name: str, progress: dict) -> None:
         conn.execute(
             update(User).where(
                 User.user_name == user_name).values(
-                    progress=json.dumps(progress)))
+                    progress=encode_progress(progress)))
         conn.commit()
 
 
-# Support functions
-def _get_zero_progress() -> str:
-    return json.dumps(_create_zero_progress())
+# everything shown about the user
+def get_user_profile(user_name: str) -> dict:
+    """Returns progress, dates and theme statistics of the user."""
+    profile = load_user_profile(user_name)
+    profile['progress'] = decode_progress(profile['progress'])
+    return profile
 
 
-def _create_zero_progress() -> dict[int, bool]:
+def load_user_profile(user_name: str) -> dict:
+    """Reads the user row with the theme snapshots in one query,
+    progress is left encoded.
+    """
+    snapshot_columns = ThemeSnapshot.__table__.columns
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(
+                User.progress,
+                User.last_enter_date,
+                User.interviews_duration,
+                *snapshot_columns
+                ).outerjoin(
+                    ThemeSnapshot, ThemeSnapshot.user_id == User.id
+                    ).where(User.user_name == user_name)
+            ).all()
+    if not rows:
+        raise KeyError(user_name)
     return {
-        question_number: False for question_number
-        in range(qt.BASIC_FIRST_QUESTION, qt.SQL_LAST_QUESTION + 1)
-    }
+        'progress': rows[0].progress,
+        'last_enter_date': rows[0].last_enter_date,
+        'interview_duration': rows[0].interviews_duration,
+        'theme_snapshots': {
+            row.theme: {
+                column.name: getattr(row, column.name)
+                for column in snapshot_columns
+                }
+            for row in rows if row.theme is not None
+            },
+        }
+
+
+# answer_events table and snapshots
+def add_answer_events(user_name: str, answers: list[dict]) -> None:
+    """Appends the answers to the log and updates the snapshots
+    incrementally in the same transaction.
+    """
+    with engine.connect() as conn:
+        user_id = conn.execute(
+            select(User.id).where(User.user_name == user_name)
+            ).scalar()
+        if user_id is None:
+            return
+        conn.execute(
+            insert(AnswerEvent),
+            [{'user_id': user_id, **answer} for answer in answers]
+            )
+        last_event_id = conn.execute(select(func.max(AnswerEvent.id))).scalar()
+
+        question_ids = {answer['question_id'] for answer in answers}
+        questions = {
+            row.question_id: row._asdict()
+            for row in conn.execute(
+                select(QuestionSnapshot.__table__).where(
+                    QuestionSnapshot.user_id == user_id,
+                    QuestionSnapshot.question_id.in_(question_ids)))
+            }
+        themes = {
+            row.theme: row._asdict()
+            for row in conn.execute(
+                select(ThemeSnapshot.__table__).where(
+                    ThemeSnapshot.user_id == user_id))
+            }
+        sketches = {}
+        for answer in answers:
+            _apply_answer(user_id, answer, questions, themes, sketches)
+        for theme, sketch in sketches.items():
+            themes[theme]['latency_sketch'] = sketch.to_bytes()
+        for theme_snapshot in themes.values():
+            theme_snapshot['last_event_id'] = last_event_id
+
+        _upsert(conn, QuestionSnapshot, list(questions.values()),
+                ('user_id', 'question_id'))
+        _upsert(conn, ThemeSnapshot, list(themes.values()),
+                ('user_id', 'theme'))
+        conn.commit()
+
+
+def get_theme_snapshots(user_name: str) -> dict[int, dict]:
+    """Returns precomputed statistics of the user by themes."""
+    with engine.connect() as conn:
+        result = conn.execute(
+            select(ThemeSnapshot.__table__).join(User).where(
+                User.user_name == user_name))
+    return {row.theme: row._asdict() for row in result}
+
+
+# question ids
+def remap_question_ids(pack_name: str, from_version: int, version: int,
+                       id_map: dict[int, int | None],
+                       theme_ranges: dict[int, tuple[int, int]]) -> bool:
+    """Moves the answers to the new ids of the questions
+    after a content update, None drops the removed question.
+    Returns False if DB has been remapped to the version already.
+
+    Everything runs in one transaction with the new version
+    of the pack, so the answers are moved exactly once.
+    Theme snapshots are recounted for their right answers only,
+    the attempts and streaks stay where they have been.
+    Raises ValueError if DB is keyed by another version of the pack.
+    """
+    moved = {
+        old_id: new_id for old_id, new_id in id_map.items()
+        if new_id is not None and new_id != old_id
+        }
+    removed = {old_id for old_id, new_id in id_map.items() if new_id is None}
+    with engine.connect() as conn:
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+        try:
+            is_remapped = _remap_question_ids(
+                conn, pack_name, from_version, version,
+                moved, removed, theme_ranges
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return is_remapped
+
+
+# Support functions
+def _remap_question_ids(conn, pack_name: str, from_version: int,
+                        version: int, moved: dict[int, int],
+                        removed: set[int],
+                        theme_ranges: dict[int, tuple[int, int]]) -> bool:
+    db_version = conn.execute(
+        select(PackVersion.version).where(PackVersion.pack == pack_name)
+        ).scalar()
+    if db_version == version:
+        return False
+    if db_version not in (None, from_version):
+        raise ValueError(
+            f'Progress is kept for version {db_version} of {pack_name}, '
+            f'the update is for version {from_version}'
+            )
+    conn.execute(
+        insert(PackVersion).values(pack=pack_name, version=version)
+        .on_conflict_do_update(
+            index_elements=['pack'], set_={'version': version}
+            )
+        )
+
+    users = conn.execute(select(User.id, User.progress)).all()
+    progress_rows = []
+    for user_id, progress in users:
+        progress = {
+            moved.get(question_number, question_number): is_right
+            for question_number, is_right
+            in decode_progress(progress).items()
+            if question_number not in removed
+            }
+        progress_rows.append(
+            {'row_id': user_id, 'row_progress': encode_progress(progress)}
+            )
+    if progress_rows:
+        conn.execute(
+            update(User).where(User.id == bindparam('row_id')).values(
+                progress=bindparam('row_progress')),
+            progress_rows
+            )
+
+    for table in (AnswerEvent, QuestionSnapshot, QuestionDifficulty):
+        conn.execute(
+            delete(table).where(table.question_id.in_(list(removed)))
+            )
+    if moved:
+        # Negative ids first, so swapped ids never meet in the key
+        for table in (AnswerEvent, QuestionSnapshot, QuestionDifficulty):
+            conn.execute(
+                update(table).where(
+                    table.question_id.in_(list(moved))).values(
+                        question_id=-case(
+                            moved, value=table.question_id
+                            )
+                        )
+                )
+            conn.execute(
+                update(table).where(table.question_id < 0).values(
+                    question_id=-table.question_id
+                    )
+                )
+
+    for theme, (first_question, last_question) in theme_ranges.items():
+        conn.execute(
+            update(ThemeSnapshot).where(
+                ThemeSnapshot.theme == theme).values(
+                    right_amount=select(func.count()).where(
+                        QuestionSnapshot.user_id == ThemeSnapshot.user_id,
+                        QuestionSnapshot.is_right,
+                        QuestionSnapshot.question_id.between(
+                            first_question, last_question
+                            )
+                        ).scalar_subquery()
+                    )
+            )
+    return True
+
+
+def _apply_answer(user_id: int, answer: dict,
+                  questions: dict[int, dict], themes: dict[int, dict],
+                  sketches: dict[int, QuantileSketch]) -> None:
+    """Adds one answer to the question and theme snapshots."""
+    question_id = answer['question_id']
+    is_right = answer['is_right']
+    question = questions.setdefault(question_id, {
+        'user_id': user_id,
+        'question_id': question_id,
+        'is_right': False,
+        'attempts': 0,
+        'right_attempts': 0,
+        'last_answered_at': None,
+        })
+    is_first_right = is_right and not question['is_right']
+    question['is_right'] = question['is_right'] or is_right
+    question['attempts'] += 1
+    question['right_attempts'] += is_right
+    question['last_answered_at'] = answer['answered_at']
+
+    theme = get_question_theme(question_id)
+    if theme is None:
+        return
+    theme_snapshot = themes.setdefault(theme, {
+        'user_id': user_id,
+        'theme': theme,
+        'right_amount': 0,
+        'attempts': 0,
+        'right_attempts': 0,
+        'current_streak': 0,
+        'best_streak': 0,
+        'last_event_id': 0,
+        'latency_sketch': None,
+        })
+    theme_snapshot['right_amount'] += is_first_right
+    theme_snapshot['attempts'] += 1
+    theme_snapshot['right_attempts'] += is_right
+    theme_snapshot['current_streak'] = (
+        theme_snapshot['current_streak'] + 1 if is_right else 0
+        )
+    theme_snapshot['best_streak'] = max(
+        theme_snapshot['best_streak'], theme_snapshot['current_streak']
+        )
+    if answer['response_time'] is not None:
+        if theme not in sketches:
+            sketches[theme] = QuantileSketch.from_bytes(
+                theme_snapshot['latency_sketch']
+                )
+        sketches[theme].add(answer['response_time'])
+
+
+def _upsert(conn, table, rows: list[dict], keys: tuple[str, ...]) -> None:
+    """Inserts the rows or replaces them by the primary key."""
+    if not rows:
+        return
+    statement = insert(table)
+    conn.execute(
+        statement.on_conflict_do_update(
+            index_elements=keys,
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0] if column not in keys
+                }
+            ),
+        rows
+        )
+
@@ -0,0 +1,115 @@
+"""Versioned migrations of the users database.
+
+Every migration is a module mNNNN_<name>.py with upgrade(conn).
+Append new modules to MIGRATIONS, never edit the applied ones.
+"""
+import datetime
+import re
+from types import ModuleType
+
+from sqlalchemy import Connection, Engine
+
+from migrations import (m0001_unique_user_name_index, m0002_answer_events,
+                        m0003_latency_sketches, m0004_question_difficulty,
+                        m0005_sparse_progress, m0006_pack_versions,
+                        m0007_users_version)
+
+MIGRATIONS: tuple[ModuleType, ...] = (
+    m0001_unique_user_name_index,
+    m0002_answer_events,
+    m0003_latency_sketches,
+    m0004_question_difficulty,
+    m0005_sparse_progress,
+    m0006_pack_versions,
+    m0007_users_version,
+)
+
+
+def get_schema_version(conn: Connection) -> int:
+    """Returns the number of the last applied migration."""
+    return conn.exec_driver_sql(
+        'SELECT COALESCE(MAX(version), 0) FROM schema_version'
+        ).scalar()
+
+
+def migrate(engine: Engine) -> None:
+    """Applies every migration which DB does not have yet.
+
+    Each migration runs in its own transaction, which takes
+    the write lock at once, so a failed migration leaves DB
+    at the previous version and two app instances never
+    apply the same migration twice.
+    """
+    with engine.connect() as conn:
+        _create_version_table(conn)
+        for version, migration in _get_numbered_migrations():
+            if version <= get_schema_version(conn):
+                continue
+            conn.exec_driver_sql('BEGIN IMMEDIATE')
+            try:
+                if version > get_schema_version(conn):
+                    migration.upgrade(conn)
+                    _add_version(conn, version, migration)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+
+def stamp(engine: Engine) -> None:
+    """Marks a DB created from the models as fully migrated."""
+    with engine.connect() as conn:
+        _create_version_table(conn)
+        for version, migration in _get_numbered_migrations():
+            _add_version(conn, version, migration)
+        conn.commit()
+
+
+def _get_numbered_migrations() -> list[tuple[int, ModuleType]]:
+    numbered = [
+        (int(re.match(r'm(\d+)_', migration.__name__.split('.')[-1])[1]),
+         migration)
+        for migration in MIGRATIONS
+        ]
+    versions = [version for version, _ in numbered]
+    if versions != list(range(1, len(MIGRATIONS) + 1)):
+        raise RuntimeError(f'Migrations are not consecutive: {versions}')
+    return numbered
+
+
+def _create_version_table(conn: Connection) -> None:
+    """Creates the version table, DBs made before it
+    keep their version in PRAGMA user_version.
+    """
+    conn.exec_driver_sql('BEGIN IMMEDIATE')
+    try:
+        table = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master "
+            "WHERE type = 'table' AND name = 'schema_version'"
+            ).first()
+        if table is None:
+            conn.exec_driver_sql(
+                'CREATE TABLE schema_version ('
+                'version INTEGER NOT NULL PRIMARY KEY, '
+                'name VARCHAR(100) NOT NULL, '
+                'applied_at DATETIME NOT NULL)'
+                )
+            legacy_version = conn.exec_driver_sql(
+                'PRAGMA user_version').scalar()
+            for version, migration in _get_numbered_migrations():
+                if version <= legacy_version:
+                    _add_version(conn, version, migration)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _add_version(conn: Connection, version: int,
+                 migration: ModuleType) -> None:
+    conn.exec_driver_sql(
+        'INSERT OR IGNORE INTO schema_version (version, name, applied_at) '
+        'VALUES (?, ?, ?)',
+        (version, migration.__name__.split('.')[-1],
+         datetime.datetime.now().isoformat(sep=' '))
+        )
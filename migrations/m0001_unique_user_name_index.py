@@ -0,0 +1,37 @@
+"""Makes user names unique and searchable by the index.
+
+Duplicates could only appear before the index existed. The app has
+always shown the first of them, so it keeps its name and the others
+are renamed to "name (2)", "name (3)"... with their progress intact.
+"""
+import logging
+
+from sqlalchemy import Connection
+
+from migrations.operations import create_index
+
+logger = logging.getLogger(__name__)
+
+
+def upgrade(conn: Connection) -> None:
+    rows = conn.exec_driver_sql(
+        'SELECT id, user_name FROM users ORDER BY id'
+        ).all()
+    taken = {user_name for _, user_name in rows}
+    seen = set()
+    for user_id, user_name in rows:
+        if user_name not in seen:
+            seen.add(user_name)
+            continue
+        number = 2
+        while f'{user_name} ({number})' in taken:
+            number += 1
+        new_name = f'{user_name} ({number})'
+        taken.add(new_name)
+        conn.exec_driver_sql(
+            'UPDATE users SET user_name = ? WHERE id = ?', (new_name, user_id)
+            )
+        logger.warning('User %r has the same name as another one, '
+                       'it is renamed to %r', user_name, new_name)
+    create_index(conn, 'ix_users_user_name', 'users', ('user_name', ),
+                 unique=True)
@@ -0,0 +1,84 @@
+"""Adds the append-only answer log and the snapshots materialized
+from it, the snapshots are filled from the users progress.
+"""
+from sqlalchemy import Connection
+
+from migrations.operations import create_index
+
+# Themes of the questions when the migration was written, the app
+# ranges may change later and must not change what it backfills
+THEME_RANGES: dict[int, tuple[int, int]] = {
+    0: (8, 224),
+    1: (225, 335),
+    2: (336, 363),
+    3: (364, 433),
+    4: (434, 473),
+    5: (474, 538),
+    6: (539, 597),
+}
+
+# Progress is a JSON document saved as a JSON string
+PROGRESS_DOCUMENT = (
+    "CASE WHEN json_type(users.progress) = 'text' "
+    "THEN json_extract(users.progress, '$') ELSE users.progress END"
+    )
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        'CREATE TABLE answer_events ('
+        'id INTEGER NOT NULL PRIMARY KEY, '
+        'user_id INTEGER NOT NULL REFERENCES users (id), '
+        'question_id INTEGER NOT NULL, '
+        'is_right BOOLEAN NOT NULL, '
+        'answered_at DATETIME NOT NULL, '
+        'response_time INTEGER)'
+        )
+    create_index(conn, 'ix_answer_events_user_id', 'answer_events',
+                 ('user_id', ))
+    conn.exec_driver_sql(
+        'CREATE TABLE question_snapshots ('
+        'user_id INTEGER NOT NULL REFERENCES users (id), '
+        'question_id INTEGER NOT NULL, '
+        'is_right BOOLEAN NOT NULL, '
+        'attempts INTEGER NOT NULL, '
+        'right_attempts INTEGER NOT NULL, '
+        'last_answered_at DATETIME, '
+        'PRIMARY KEY (user_id, question_id))'
+        )
+    conn.exec_driver_sql(
+        'CREATE TABLE theme_snapshots ('
+        'user_id INTEGER NOT NULL REFERENCES users (id), '
+        'theme INTEGER NOT NULL, '
+        'right_amount INTEGER NOT NULL, '
+        'attempts INTEGER NOT NULL, '
+        'right_attempts INTEGER NOT NULL, '
+        'current_streak INTEGER NOT NULL, '
+        'best_streak INTEGER NOT NULL, '
+        'last_event_id INTEGER NOT NULL, '
+        'PRIMARY KEY (user_id, theme))'
+        )
+
+    # Answers given before the log are known only as right questions
+    conn.exec_driver_sql(
+        'INSERT INTO question_snapshots '
+        '(user_id, question_id, is_right, attempts, right_attempts) '
+        'SELECT users.id, CAST(progress.key AS INTEGER), 1, 1, 1 '
+        f'FROM users, json_each({PROGRESS_DOCUMENT}) AS progress '
+        "WHERE progress.type = 'true'"
+        )
+    theme_case = ' '.join(
+        f'WHEN question_id BETWEEN {int(first_question)} '
+        f'AND {int(last_question)} '
+        f'THEN {theme}'
+        for theme, (first_question, last_question) in THEME_RANGES.items()
+        )
+    conn.exec_driver_sql(
+        'INSERT INTO theme_snapshots '
+        '(user_id, theme, right_amount, attempts, right_attempts, '
+        'current_streak, best_streak, last_event_id) '
+        'SELECT user_id, theme, COUNT(*), COUNT(*), COUNT(*), 0, 0, 0 '
+        f'FROM (SELECT user_id, CASE {theme_case} END AS theme '
+        'FROM question_snapshots) '
+        'WHERE theme IS NOT NULL GROUP BY user_id, theme'
+        )
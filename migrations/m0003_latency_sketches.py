@@ -0,0 +1,10 @@
+"""Adds answer time quantile sketches to the theme snapshots.
+The column is added in place, the table is not rewritten.
+"""
+from sqlalchemy import Connection
+
+from migrations.operations import add_column
+
+
+def upgrade(conn: Connection) -> None:
+    add_column(conn, 'theme_snapshots', 'latency_sketch', 'BLOB')
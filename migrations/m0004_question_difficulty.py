@@ -0,0 +1,19 @@
+"""Adds the cache of question difficulty computed from all users."""
+from sqlalchemy import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        'CREATE TABLE question_difficulty ('
+        'question_id INTEGER NOT NULL PRIMARY KEY, '
+        'attempts INTEGER NOT NULL, '
+        'right_attempts INTEGER NOT NULL, '
+        'success_rate FLOAT, '
+        'difficulty FLOAT NOT NULL)'
+        )
+    conn.exec_driver_sql(
+        'CREATE TABLE difficulty_state ('
+        'id INTEGER NOT NULL PRIMARY KEY, '
+        'last_event_id INTEGER NOT NULL, '
+        'updated_at DATETIME)'
+        )
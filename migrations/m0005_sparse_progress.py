@@ -0,0 +1,50 @@
+"""Rewrites dense progress maps of every question to the sparse
+list of questions answered right. Users are converted by batches
+in the order of their ids, so memory does not depend on their number.
+
+The format is written here as it was, the app codec may change later.
+"""
+import json
+
+from sqlalchemy import Connection
+
+BATCH_SIZE = 1000
+
+
+def upgrade(conn: Connection) -> None:
+    last_id = 0
+    while True:
+        rows = conn.exec_driver_sql(
+            'SELECT id, progress FROM users WHERE id > ? ORDER BY id LIMIT ?',
+            (last_id, BATCH_SIZE)
+            ).all()
+        if not rows:
+            return
+        conn.exec_driver_sql(
+            'UPDATE users SET progress = ? WHERE id = ?',
+            [
+                (json.dumps(_encode_progress(_load_progress(progress))),
+                 user_id)
+                for user_id, progress in rows
+                ]
+            )
+        last_id = rows[-1][0]
+
+
+def _load_progress(progress: str) -> list[int]:
+    """Returns the ids answered right. The column keeps progress
+    as a JSON string, the oldest rows keep it as a JSON document.
+    """
+    document = json.loads(progress)
+    if isinstance(document, str):
+        document = json.loads(document)
+    if document.get('v') == 2:
+        return document['right']
+    return [
+        int(question_number)
+        for question_number, is_right in document.items() if is_right
+        ]
+
+
+def _encode_progress(right: list[int]) -> str:
+    return json.dumps({'v': 2, 'right': sorted(right)}, separators=(',', ':'))
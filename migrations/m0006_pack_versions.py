@@ -0,0 +1,10 @@
+"""Adds the versions of question packs the progress is keyed by."""
+from sqlalchemy import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        'CREATE TABLE pack_versions ('
+        'pack VARCHAR(100) NOT NULL PRIMARY KEY, '
+        'version INTEGER NOT NULL)'
+        )
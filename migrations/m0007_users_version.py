@@ -0,0 +1,23 @@
+"""Adds the counter of added and deleted users.
+
+The user directory compares it instead of PRAGMA data_version,
+which changes on every progress write too.
+"""
+from sqlalchemy import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.exec_driver_sql(
+        'CREATE TABLE users_version ('
+        'id INTEGER NOT NULL PRIMARY KEY, '
+        'version INTEGER NOT NULL)'
+        )
+    conn.exec_driver_sql(
+        'INSERT INTO users_version (id, version) VALUES (1, 0)'
+        )
+    for action in ('INSERT', 'DELETE'):
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER users_version_{action.lower()} '
+            f'AFTER {action} ON users BEGIN '
+            'UPDATE users_version SET version = version + 1; END'
+            )
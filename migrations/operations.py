@@ -0,0 +1,59 @@
+"""Schema operations for migrations.
+
+SQLite can add columns, tables and indexes without touching
+the existing rows, so prefer those operations on large databases.
+rebuild_table copies the whole table and is the last resort
+for changes SQLite cannot do in place (column types, constraints).
+"""
+from sqlalchemy import Connection
+
+
+def has_table(conn: Connection, table: str) -> bool:
+    return conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (table, )
+        ).first() is not None
+
+
+def has_column(conn: Connection, table: str, column: str) -> bool:
+    columns = conn.exec_driver_sql(f'PRAGMA table_info("{table}")')
+    return any(row[1] == column for row in columns)
+
+
+def add_column(conn: Connection, table: str, column: str,
+               definition: str) -> None:
+    """Adds a column in place, SQLite changes only the table schema."""
+    if not has_column(conn, table, column):
+        conn.exec_driver_sql(
+            f'ALTER TABLE "{table}" ADD COLUMN "{column}" {definition}'
+            )
+
+
+def create_index(conn: Connection, index: str, table: str,
+                 columns: tuple[str, ...], unique: bool = False) -> None:
+    """Builds an index in one pass over the table."""
+    columns_list = ', '.join(f'"{column}"' for column in columns)
+    conn.exec_driver_sql(
+        f'CREATE {"UNIQUE " if unique else ""}INDEX IF NOT EXISTS '
+        f'"{index}" ON "{table}" ({columns_list})'
+        )
+
+
+def rebuild_table(conn: Connection, table: str, create_sql: str,
+                  columns: tuple[str, ...],
+                  indexes: tuple[str, ...] = ()) -> None:
+    """Recreates the table with a new schema keeping its rows.
+
+    create_sql must create a table named "{table}_new",
+    indexes are CREATE INDEX statements for the new table.
+    """
+    columns_list = ', '.join(f'"{column}"' for column in columns)
+    conn.exec_driver_sql(create_sql)
+    conn.exec_driver_sql(
+        f'INSERT INTO "{table}_new" ({columns_list}) '
+        f'SELECT {columns_list} FROM "{table}"'
+        )
+    conn.exec_driver_sql(f'DROP TABLE "{table}"')
+    conn.exec_driver_sql(f'ALTER TABLE "{table}_new" RENAME TO "{table}"')
+    for index_sql in indexes:
+        conn.exec_driver_sql(index_sql)
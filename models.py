@@ -1,16 +1,19 @@
 import os
 from typing import Type
 
-from sqlalchemy import create_engine
-from sqlalchemy import DateTime, Integer, JSON, String
+from sqlalchemy import create_engine, DDL, event
+from sqlalchemy import (Boolean, DateTime, Float, ForeignKey, Integer, JSON,
+                        LargeBinary, String)
 from sqlalchemy import MetaData
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 
-from settings import DATABASE_NAME
+from migrations import migrate, stamp
+from settings import DATABASE_ENV_VAR, DATABASE_NAME
 
-engine = create_engine(f'sqlite:///{DATABASE_NAME}', echo=False)
+DATABASE_PATH = os.environ.get(DATABASE_ENV_VAR, DATABASE_NAME)
+engine = create_engine(f'sqlite:///{DATABASE_PATH}', echo=False)
 metadata = MetaData()
 
 
@@ -33,18 +36,172 @@ class User(Base):
     __tablename__ = 'users'
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_name: Mapped[str] = mapped_column(String(25))
+    user_name: Mapped[str] = mapped_column(
+        String(25), unique=True, index=True
+        )
     last_enter_date: Mapped[Type] = mapped_column(DateTime, nullable=True)
     interviews_duration: Mapped[int] = mapped_column(Integer)
     progress: Mapped[Type] = mapped_column(JSON)
 
 
+class AnswerEvent(Base):
+    """A class representing one answer of the user.
+    The table is append-only, snapshots are built from it.
+
+    Attributes:
+        id: The order of the answer.
+        user_id: The user who has answered.
+        question_id: The number of the question.
+        is_right: Whether the answer was right.
+        answered_at: The date and time of the answer.
+        response_time: Time from showing the question to the answer in ms.
+    """
+    __tablename__ = 'answer_events'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), index=True)
+    question_id: Mapped[int] = mapped_column(Integer)
+    is_right: Mapped[bool] = mapped_column(Boolean)
+    answered_at: Mapped[Type] = mapped_column(DateTime)
+    response_time: Mapped[int] = mapped_column(Integer, nullable=True)
+
+
+class QuestionSnapshot(Base):
+    """A class representing the user's state of one question
+    materialized from the answer events.
+
+    Attributes:
+        is_right: Whether the question has ever been answered right.
+        attempts: The amount of answers.
+        right_attempts: The amount of right answers.
+        last_answered_at: The date and time of the last answer.
+    """
+    __tablename__ = 'question_snapshots'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id'), primary_key=True
+        )
+    question_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    is_right: Mapped[bool] = mapped_column(Boolean)
+    attempts: Mapped[int] = mapped_column(Integer)
+    right_attempts: Mapped[int] = mapped_column(Integer)
+    last_answered_at: Mapped[Type] = mapped_column(DateTime, nullable=True)
+
+
+class ThemeSnapshot(Base):
+    """A class representing the user's statistics of one theme
+    materialized from the answer events.
+
+    Attributes:
+        theme: The index of the theme.
+        right_amount: The amount of questions answered right.
+        attempts: The amount of answers.
+        right_attempts: The amount of right answers.
+        current_streak: Right answers in a row up to the last one.
+        best_streak: The longest series of right answers.
+        last_event_id: The last answer event taken into account.
+        latency_sketch: Quantile sketch of answer times in ms.
+    """
+    __tablename__ = 'theme_snapshots'
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id'), primary_key=True
+        )
+    theme: Mapped[int] = mapped_column(Integer, primary_key=True)
+    right_amount: Mapped[int] = mapped_column(Integer)
+    attempts: Mapped[int] = mapped_column(Integer)
+    right_attempts: Mapped[int] = mapped_column(Integer)
+    current_streak: Mapped[int] = mapped_column(Integer)
+    best_streak: Mapped[int] = mapped_column(Integer)
+    last_event_id: Mapped[int] = mapped_column(Integer)
+    latency_sketch: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+
+
+class QuestionDifficulty(Base):
+    """A class representing how hard the question is for all users.
+
+    Attributes:
+        attempts: The amount of logged answers.
+        right_attempts: The amount of logged right answers.
+        success_rate: The share of right answers, None without answers.
+        difficulty: The Rasch model difficulty, 0 is the average one.
+    """
+    __tablename__ = 'question_difficulty'
+
+    question_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    attempts: Mapped[int] = mapped_column(Integer)
+    right_attempts: Mapped[int] = mapped_column(Integer)
+    success_rate: Mapped[float] = mapped_column(Float, nullable=True)
+    difficulty: Mapped[float] = mapped_column(Float)
+
+
+class DifficultyState(Base):
+    """A class representing the progress of the difficulty job.
+
+    Attributes:
+        last_event_id: The last answer event counted in the cache.
+        updated_at: The date and time of the last refresh.
+    """
+    __tablename__ = 'difficulty_state'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    last_event_id: Mapped[int] = mapped_column(Integer)
+    updated_at: Mapped[Type] = mapped_column(DateTime, nullable=True)
+
+
+class PackVersion(Base):
+    """A class representing the version of the question pack
+    whose question ids the progress is keyed by.
+
+    Attributes:
+        pack: The name of the pack.
+        version: The version of the pack.
+    """
+    __tablename__ = 'pack_versions'
+
+    pack: Mapped[str] = mapped_column(String(100), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer)
+
+
+class UsersVersion(Base):
+    """A class representing the counter of added and deleted users,
+    triggers of the users table increment it.
+
+    Attributes:
+        id: The only row of the table.
+        version: The number of changes of the user list.
+    """
+    __tablename__ = 'users_version'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(Integer)
+
+
+# Progress writes do not touch the counter, only the user list does
+USERS_VERSION_DDL = (
+    'INSERT OR IGNORE INTO users_version (id, version) VALUES (1, 0)',
+    *(
+        f'CREATE TRIGGER IF NOT EXISTS users_version_{action.lower()} '
+        f'AFTER {action} ON users BEGIN '
+        'UPDATE users_version SET version = version + 1; END'
+        for action in ('INSERT', 'DELETE')
+        ),
+    )
+for statement in USERS_VERSION_DDL:
+    event.listen(Base.metadata, 'after_create', DDL(statement))
+
+
 def create_db() -> None:
-    """Creates database as a SQLite-file"""
-    if not _is_db_created():
+    """Creates database as a SQLite-file
+    or brings the existing one up to date.
+    """
+    if _is_db_created():
+        migrate(engine)
+    else:
         Base.metadata.create_all(engine)
+        stamp(engine)
 
 
 def _is_db_created() -> bool:
     """Checks DB existence in the root folder."""
-    return os.path.exists(f'./{DATABASE_NAME}')
+    return os.path.exists(DATABASE_PATH)
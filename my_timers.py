@@ -1,10 +1,101 @@
+import heapq
+import itertools
+import time
 from abc import ABC, abstractmethod
-from threading import Timer
+from typing import Callable, Hashable, Optional
+
 from colors import ERROR_COLOR, SUCCESS_COLOR
 
 from settings import ValidResponse
 
 
+class TimerService:
+    """Calls functions after a delay from the Tk main loop.
+
+    Deadlines are kept in a heap and only one after() is waiting,
+    for the nearest of them, so timers cost no threads and their
+    functions may touch widgets. A timer scheduled with the key of
+    a waiting one replaces it: repeated messages are coalesced.
+    """
+
+    def __init__(self) -> None:
+        self.widget = None
+        self.heap: list[tuple[float, int, Hashable]] = []
+        self.timers: dict[Hashable, tuple[float, int, Callable]] = {}
+        self.counter = itertools.count()
+        self.after_id: Optional[str] = None
+        self.after_deadline: Optional[float] = None
+
+    def bind(self, widget) -> None:
+        """Sets the widget whose main loop drives the timers."""
+        self.widget = widget
+
+    def schedule(self, delay: float, function: Callable,
+                 key: Optional[Hashable] = None) -> Hashable:
+        """Calls the function in delay seconds and returns the key
+        to cancel it. A waiting timer with the same key is dropped.
+        """
+        if self.widget is None:
+            raise RuntimeError('TimerService is not bound to a widget')
+        number = next(self.counter)
+        if key is None:
+            key = ('timer', number)
+        deadline = time.monotonic() + delay
+        self.timers[key] = (deadline, number, function)
+        heapq.heappush(self.heap, (deadline, number, key))
+        self._arm()
+        return key
+
+    def cancel(self, key: Hashable) -> None:
+        """Drops the timer, its heap entry is skipped when it is due."""
+        self.timers.pop(key, None)
+
+    def tick(self) -> None:
+        """Calls every function which is due and arms the next tick.
+        A function which raises is reported, the others still run.
+        """
+        self.after_id = None
+        self.after_deadline = None
+        now = time.monotonic()
+        try:
+            while self.heap and self.heap[0][0] <= now:
+                _, number, key = heapq.heappop(self.heap)
+                timer = self.timers.get(key)
+                # The entry of a cancelled or replaced timer
+                if timer is None or timer[1] != number:
+                    continue
+                del self.timers[key]
+                try:
+                    timer[2]()
+                except Exception as error:
+                    self.widget.report_callback_exception(
+                        type(error), error, error.__traceback__
+                        )
+        finally:
+            self._arm()
+
+    def _arm(self) -> None:
+        while self.heap and self._is_stale(self.heap[0]):
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return
+        deadline = self.heap[0][0]
+        if self.after_deadline is not None and self.after_deadline <= deadline:
+            return
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+        delay = max(0, round(1000 * (deadline - time.monotonic())))
+        self.after_id = self.widget.after(delay, self.tick)
+        self.after_deadline = deadline
+
+    def _is_stale(self, entry: tuple[float, int, Hashable]) -> bool:
+        timer = self.timers.get(entry[2])
+        return timer is None or timer[1] != entry[1]
+
+
+timers = TimerService()
+
+
 class MyTimerInterface(ABC):
     """Abstract class for custom timers."""
 
@@ -15,28 +106,29 @@ class MyTimerInterface(ABC):
 
 
 class MessageTimer(MyTimerInterface):
-    """Class for changing an error message when time has ended."""
+    """Class for changing an error message when time has ended.
+    A new message at the same label restarts the timer.
+    """
 
     def __init__(self, delay, condition, label):
-        self.delay = Timer(delay, self.timeout)
         self.condition = condition
         self.label = label
-        self.delay.start()
+        self.key = timers.schedule(delay, self.timeout, key=label)
 
     def timeout(self):
-        self.condition.set('')
-        self.label.config(background=ERROR_COLOR)
+        if self.label.winfo_exists():
+            self.condition.set('')
+            self.label.config(background=ERROR_COLOR)
 
 
 class CommandTimer(MyTimerInterface):
     """Class for performing of command when time has ended."""
 
     def __init__(self, delay, command, label, message):
-        self.delay = Timer(delay, self.timeout)
         self.command = command
         self.label = label
         self.message = message
-        self.delay.start()
+        self.key = timers.schedule(delay, self.timeout, key=label)
         self.message.set(ValidResponse.SUCCESS)
         self.label.config(background=SUCCESS_COLOR)
 
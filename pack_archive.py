@@ -0,0 +1,150 @@
+"""Question packs in one file.
+
+    python pack_archive.py packs/python packs/python.pack
+
+The archive is a zip file which unpack tools can open, but the app
+reads it without extracting anything:
+    pack.json            the manifest
+    questions.csv        deflated questions
+    knowledge/<n>.pdf    PDF-files stored as they are
+The archive is mapped to memory, questions are decompressed once
+when the pack is chosen, and a PDF-file is a slice of the mapping.
+"""
+import argparse
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+import zipfile
+import zlib
+
+from question_packs import load_pack_directory, QuestionPack
+from questions import parse_csv, QuestionBank
+from settings import PACK_MANIFEST
+
+QUESTIONS_MEMBER = 'questions.csv'
+
+LOCAL_HEADER = struct.Struct('<4s22xHH')
+LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+
+class PackArchive:
+    """Random access to members of a pack archive."""
+
+    def __init__(self, filepath: str) -> None:
+        self.filepath = filepath
+        with zipfile.ZipFile(filepath) as archive:
+            members = archive.infolist()
+        with open(filepath, 'rb') as f:
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.members: dict[str, tuple[int, int, int]] = {
+            member.filename: (
+                self._get_data_offset(member),
+                member.compress_size,
+                member.compress_type
+                )
+            for member in members
+            }
+
+    def _get_data_offset(self, member: zipfile.ZipInfo) -> int:
+        """The central directory has no length of the extra field
+        of the local header, so the header itself is read.
+        """
+        signature, name_length, extra_length = LOCAL_HEADER.unpack_from(
+            self.mapping, member.header_offset
+            )
+        if signature != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f'Bad local header of {member.filename}')
+        return (
+            member.header_offset + LOCAL_HEADER.size
+            + name_length + extra_length
+            )
+
+    def get_view(self, name: str) -> memoryview:
+        """Returns the stored member without copying it."""
+        offset, size, compress_type = self.members[name]
+        if compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f'{name} is compressed')
+        return memoryview(self.mapping)[offset:offset + size]
+
+    def read(self, name: str) -> bytes:
+        """Returns the member, it is decompressed if needed."""
+        offset, size, compress_type = self.members[name]
+        data = self.mapping[offset:offset + size]
+        if compress_type == zipfile.ZIP_DEFLATED:
+            return zlib.decompress(data, -zlib.MAX_WBITS)
+        if compress_type != zipfile.ZIP_STORED:
+            raise ValueError(f'{name} has unsupported compression')
+        return data
+
+
+class ArchivePack(QuestionPack):
+    """A pack read from its archive."""
+
+    def __init__(self, name: str, filepath: str) -> None:
+        self.archive = PackArchive(filepath)
+        manifest = json.loads(self.archive.read(PACK_MANIFEST))
+        super().__init__(name, os.path.dirname(filepath), manifest)
+
+    def __repr__(self) -> str:
+        return f'ArchivePack({self.name!r})'
+
+    def load_questions(self) -> QuestionBank:
+        with self._lock:
+            if self._questions is None:
+                data = self.archive.read(QUESTIONS_MEMBER)
+                self._questions = QuestionBank(
+                    parse_csv(io.StringIO(data.decode('utf-8'), newline=''))
+                    )
+            return self._questions
+
+    def get_pdf(self, file_name: int | str) -> memoryview:
+        return self.archive.get_view(f'knowledge/{file_name}.pdf')
+
+
+def build_pack_archive(pack: QuestionPack, filepath: str) -> None:
+    """Writes the pack to the archive."""
+    questions = pack.load_questions().rows
+    manifest = {
+        'title': pack.title,
+        'version': pack.version,
+        'themes': pack.themes,
+        }
+    text = io.StringIO(newline='')
+    csv.writer(text, delimiter=';').writerows(questions)
+    with zipfile.ZipFile(filepath, 'w') as archive:
+        archive.writestr(
+            PACK_MANIFEST,
+            json.dumps(manifest, ensure_ascii=False, indent=4),
+            compress_type=zipfile.ZIP_DEFLATED,
+            compresslevel=9
+            )
+        archive.writestr(
+            QUESTIONS_MEMBER,
+            text.getvalue(),
+            compress_type=zipfile.ZIP_DEFLATED,
+            compresslevel=9
+            )
+        for file_name in sorted({str(row[5]) for row in questions}):
+            # PDF-files are compressed inside, deflate saves nothing
+            archive.write(
+                pack.get_pdf(file_name),
+                f'knowledge/{file_name}.pdf',
+                compress_type=zipfile.ZIP_STORED
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Builds a pack archive')
+    parser.add_argument('pack', help='directory of the pack')
+    parser.add_argument('archive', help='file of the archive to write')
+    args = parser.parse_args()
+    pack = load_pack_directory(args.pack)
+    build_pack_archive(pack, args.archive)
+    print(f'{args.archive}: {os.path.getsize(args.archive)} bytes')
+
+
+if __name__ == '__main__':
+    main()
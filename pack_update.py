@@ -0,0 +1,362 @@
+"""Delta updates of question packs.
+
+    python pack_update.py make packs/python new/python update
+    python pack_update.py apply packs/python update
+
+Files of a pack are cut into chunks by their content, so an edit
+changes only the chunks around it and the rest keep their hashes.
+An update is a directory with
+    update.json          new manifest, changed files as chunk lists
+    chunks/<hash>        deflated chunks the previous version does not have
+Applying it assembles the changed files from the chunks which are
+already on disk and the ones from the update, nothing is downloaded.
+The files replace the old ones only after the progress is moved,
+an interrupted update is finished by applying it again.
+
+Question ids may move between versions, the update carries the map
+of old ids to new ones and the progress in users.db is moved with it.
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+
+import numpy as np
+
+from question_packs import get_packs, load_pack_directory, QuestionPack
+from settings import (CHUNK_AVERAGE_BITS, CHUNK_MAX_SIZE, CHUNK_MIN_SIZE,
+                      CHUNK_WINDOW, PACK_MANIFEST)
+
+UPDATE_MANIFEST = 'update.json'
+CHUNKS_DIRECTORY = 'chunks'
+STAGED_EXTENSION = '.update'
+QUESTIONS_NAME = 'questions.csv'
+
+# Random values of bytes, they must be the same for every version
+GEAR = np.array(
+    [
+        int.from_bytes(hashlib.blake2b(bytes([byte]), digest_size=4).digest(),
+                       'little')
+        for byte in range(256)
+        ],
+    dtype=np.uint64
+    )
+MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def get_chunk_boundaries(data: bytes) -> list[int]:
+    """Returns the ends of the chunks of the data.
+
+    A chunk ends where the hash of the last CHUNK_WINDOW bytes has
+    CHUNK_AVERAGE_BITS zero high bits. The hash is a sum of random
+    values of the bytes, so all of them are computed by numpy at once.
+    """
+    if len(data) <= CHUNK_MIN_SIZE:
+        return [len(data)] if data else []
+    values = GEAR[np.frombuffer(data, dtype=np.uint8)]
+    sums = np.concatenate(([np.uint64(0)], np.cumsum(values)))
+    hashes = (sums[CHUNK_WINDOW:] - sums[:-CHUNK_WINDOW]) * MULTIPLIER
+    candidates = np.flatnonzero(
+        hashes >> np.uint64(64 - CHUNK_AVERAGE_BITS) == 0
+        ) + CHUNK_WINDOW
+
+    boundaries = []
+    start = 0
+    for candidate in candidates.tolist():
+        while candidate - start > CHUNK_MAX_SIZE:
+            start += CHUNK_MAX_SIZE
+            boundaries.append(start)
+        if candidate - start >= CHUNK_MIN_SIZE:
+            boundaries.append(candidate)
+            start = candidate
+    while len(data) - start > CHUNK_MAX_SIZE:
+        start += CHUNK_MAX_SIZE
+        boundaries.append(start)
+    if start < len(data):
+        boundaries.append(len(data))
+    return boundaries
+
+
+def get_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def split_chunks(data: bytes) -> list[tuple[str, bytes]]:
+    """Returns hashes of the chunks of the data with the chunks."""
+    chunks = []
+    start = 0
+    for end in get_chunk_boundaries(data):
+        chunk = data[start:end]
+        chunks.append((get_hash(chunk), chunk))
+        start = end
+    return chunks
+
+
+def get_content_files(pack: QuestionPack) -> dict[str, str]:
+    """Returns paths of the files of the pack by their names in updates."""
+    files = {QUESTIONS_NAME: pack.questions_file}
+    if os.path.isdir(pack.knowledge_directory):
+        for file_name in sorted(os.listdir(pack.knowledge_directory)):
+            if file_name.endswith('.pdf'):
+                files[f'knowledge/{file_name}'] = os.path.join(
+                    pack.knowledge_directory, file_name
+                    )
+    return files
+
+
+def get_content_path(pack: QuestionPack, name: str) -> str:
+    if name == QUESTIONS_NAME:
+        return pack.questions_file
+    return os.path.join(pack.knowledge_directory, name.split('/', 1)[1])
+
+
+def read_file(filepath: str) -> bytes:
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+
+def make_id_map(old_pack: QuestionPack,
+                new_pack: QuestionPack) -> dict[int, int | None]:
+    """Finds the new ids of the questions by their text.
+
+    A question whose text is not found keeps its id if the new
+    version has it, so an edited question keeps its answers,
+    otherwise it has been removed.
+    """
+    new_ids_by_text: dict[str, list[int]] = {}
+    for row in reversed(new_pack.load_questions().rows):
+        new_ids_by_text.setdefault(row[2], []).append(row[0])
+    new_ids = {row[0] for row in new_pack.load_questions()}
+
+    id_map = {}
+    unmatched = []
+    for row in old_pack.load_questions():
+        same_text = new_ids_by_text.get(row[2])
+        if same_text:
+            id_map[row[0]] = same_text.pop()
+        else:
+            unmatched.append(row[0])
+    taken = set(id_map.values())
+    for old_id in unmatched:
+        id_map[old_id] = (
+            old_id if old_id in new_ids and old_id not in taken else None
+            )
+    return {
+        old_id: new_id for old_id, new_id in id_map.items()
+        if new_id != old_id
+        }
+
+
+def make_update(old_pack: QuestionPack, new_pack: QuestionPack,
+                update_directory: str) -> dict:
+    """Writes the update from the old version of the pack to the new one
+    and returns its manifest.
+    """
+    old_files = {
+        name: read_file(filepath)
+        for name, filepath in get_content_files(old_pack).items()
+        }
+    old_chunks = {
+        chunk_hash
+        for data in old_files.values()
+        for chunk_hash, _ in split_chunks(data)
+        }
+    new_files = get_content_files(new_pack)
+
+    os.makedirs(os.path.join(update_directory, CHUNKS_DIRECTORY),
+                exist_ok=True)
+    files = {}
+    for name, filepath in new_files.items():
+        data = read_file(filepath)
+        if old_files.get(name) == data:
+            continue
+        chunks = split_chunks(data)
+        files[name] = {
+            'hash': get_hash(data),
+            'chunks': [[chunk_hash, len(chunk)] for chunk_hash, chunk in chunks],
+            }
+        for chunk_hash, chunk in chunks:
+            if chunk_hash in old_chunks:
+                continue
+            chunk_path = os.path.join(
+                update_directory, CHUNKS_DIRECTORY, chunk_hash
+                )
+            with open(chunk_path, 'wb') as f:
+                f.write(zlib.compress(chunk, 9))
+
+    manifest = {
+        'from_version': old_pack.version,
+        'version': new_pack.version,
+        'title': new_pack.title,
+        'themes': new_pack.themes,
+        'files': files,
+        'removed': sorted(set(old_files) - set(new_files)),
+        'id_map': make_id_map(old_pack, new_pack),
+        }
+    with open(os.path.join(update_directory, UPDATE_MANIFEST),
+              encoding='utf-8', mode='w') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=4)
+    return manifest
+
+
+def apply_update(pack: QuestionPack, update_directory: str) -> None:
+    """Updates the files of the pack directory, its manifest and
+    the progress of every user.
+
+    The new files are assembled next to the old ones and checked by
+    their hashes, then the progress is moved in one transaction of DB
+    and only after it the files replace the old ones, the manifest
+    is the last. An interrupted update is finished by running it again.
+    Raises ValueError if the update is made for another version.
+    """
+    with open(os.path.join(update_directory, UPDATE_MANIFEST),
+              encoding='utf-8', mode='r') as f:
+        manifest = json.load(f)
+    if manifest['from_version'] != pack.version:
+        raise ValueError(
+            f'Update is for version {manifest["from_version"]} '
+            f'of {pack.name}, it has version {pack.version}'
+            )
+
+    staged = _stage_files(pack, manifest, update_directory)
+
+    from manage_db import remap_question_ids
+
+    remap_question_ids(
+        pack.name,
+        manifest['from_version'],
+        manifest['version'],
+        {int(old_id): new_id for old_id, new_id in manifest['id_map'].items()},
+        {
+            theme['id']: (theme['first_question'], theme['last_question'])
+            for theme in manifest['themes']
+            }
+        )
+
+    for staged_path, filepath in staged:
+        os.replace(staged_path, filepath)
+    for name in manifest['removed']:
+        filepath = get_content_path(pack, name)
+        if os.path.isfile(filepath):
+            os.remove(filepath)
+
+    manifest_path = os.path.join(pack.directory, PACK_MANIFEST)
+    with open(manifest_path, encoding='utf-8', mode='r') as f:
+        pack_manifest = json.load(f)
+    pack_manifest.update(
+        title=manifest['title'],
+        version=manifest['version'],
+        themes=manifest['themes']
+        )
+    _replace_file(
+        manifest_path,
+        json.dumps(pack_manifest, ensure_ascii=False, indent=4).encode('utf-8')
+        )
+    get_packs.cache_clear()
+
+
+def _stage_files(pack: QuestionPack, manifest: dict,
+                 update_directory: str) -> list[tuple[str, str]]:
+    """Writes every changed file to <file>.update and returns
+    the pairs of staged and replaced paths.
+
+    Files which an interrupted update has replaced or staged
+    already are kept as they are.
+    """
+    local_chunks = {}
+    for filepath in get_content_files(pack).values():
+        data = read_file(filepath)
+        start = 0
+        for end in get_chunk_boundaries(data):
+            local_chunks.setdefault(
+                get_hash(data[start:end]), (filepath, start, end)
+                )
+            start = end
+
+    staged = []
+    for name, file_manifest in manifest['files'].items():
+        filepath = get_content_path(pack, name)
+        staged_path = f'{filepath}{STAGED_EXTENSION}'
+        if _has_hash(staged_path, file_manifest['hash']):
+            staged.append((staged_path, filepath))
+            continue
+        if _has_hash(filepath, file_manifest['hash']):
+            continue
+        data = b''.join(
+            _get_chunk(chunk_hash, local_chunks, update_directory)
+            for chunk_hash, _ in file_manifest['chunks']
+            )
+        if get_hash(data) != file_manifest['hash']:
+            raise ValueError(f'{name} does not match its hash')
+        _replace_file(staged_path, data)
+        staged.append((staged_path, filepath))
+    return staged
+
+
+def _has_hash(filepath: str, file_hash: str) -> bool:
+    return (
+        os.path.isfile(filepath) and get_hash(read_file(filepath)) == file_hash
+        )
+
+
+def _get_chunk(chunk_hash: str, local_chunks: dict[str, tuple[str, int, int]],
+               update_directory: str) -> bytes:
+    if chunk_hash in local_chunks:
+        filepath, start, end = local_chunks[chunk_hash]
+        with open(filepath, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+    return zlib.decompress(read_file(
+        os.path.join(update_directory, CHUNKS_DIRECTORY, chunk_hash)
+        ))
+
+
+def _replace_file(filepath: str, data: bytes) -> None:
+    """Writes the file next to the old one and swaps them at once."""
+    directory = os.path.dirname(os.path.abspath(filepath))
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(descriptor, 'wb') as f:
+            f.write(data)
+        os.replace(temporary_path, filepath)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Delta updates of packs')
+    commands = parser.add_subparsers(dest='command', required=True)
+    make = commands.add_parser('make', help='make an update')
+    make.add_argument('old_pack', help='directory of the previous version')
+    make.add_argument('new_pack', help='directory of the new version')
+    make.add_argument('update', help='directory to write the update to')
+    apply = commands.add_parser('apply', help='apply an update')
+    apply.add_argument('pack', help='directory of the pack to update')
+    apply.add_argument('update', help='directory of the update')
+    args = parser.parse_args()
+
+    if args.command == 'make':
+        manifest = make_update(
+            load_pack_directory(args.old_pack),
+            load_pack_directory(args.new_pack),
+            args.update
+            )
+        size = sum(
+            entry.stat().st_size
+            for entry in os.scandir(os.path.join(args.update, CHUNKS_DIRECTORY))
+            )
+        print(f'{len(manifest["files"])} files changed, '
+              f'{size} bytes of new chunks')
+    else:
+        from models import create_db
+
+        create_db()
+        apply_update(load_pack_directory(args.pack), args.update)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+import cProfile
+import datetime
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from settings import PROFILE_FILE, TIMINGS_ENV_VAR
+
+TIMINGS_PATH = os.environ.get(TIMINGS_ENV_VAR)
+SESSION = datetime.datetime.now().isoformat(timespec='seconds')
+
+
+def write_timing(phase: str, seconds: float, **details) -> None:
+    """Appends one timing record to the JSON lines log, if it is on."""
+    if not TIMINGS_PATH:
+        return
+    record = {
+        'session': SESSION,
+        'pid': os.getpid(),
+        'phase': phase,
+        'ms': round(1000 * seconds, 3),
+        **details
+    }
+    with open(TIMINGS_PATH, encoding='utf-8', mode='a') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+@contextmanager
+def measure(phase: str, **details) -> Iterator[None]:
+    """Measures the time of the code inside the with-block."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        write_timing(phase, time.perf_counter() - start, **details)
+
+
+def timed(phase: str) -> Callable:
+    """Decorator measuring every call of the function."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(phase):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def profile(enabled: bool) -> Iterator[None]:
+    """Dumps cProfile statistics of the with-block to the pstats file."""
+    if not enabled:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(PROFILE_FILE)
@@ -0,0 +1,42 @@
+"""The progress API used by the app.
+
+Functions work with users.db directly or, when the
+INTERVIEW_ASSISTANT_SERVER variable is set, with the progress
+server at that address.
+"""
+import os
+
+from settings import SERVER_ENV_VAR
+
+if os.environ.get(SERVER_ENV_VAR):
+    from progress_client import (add_answer_events, create_db,
+                                 create_new_user, create_new_users,
+                                 delete_this_user, get_last_enter_date,
+                                 get_question_difficulty, get_roster,
+                                 get_theme_snapshots,
+                                 get_user_interview_duration,
+                                 get_user_names, get_user_profile,
+                                 get_user_progress,
+                                 refresh_difficulty,
+                                 update_interview_duration,
+                                 update_last_enter_date, update_user_progress)
+else:
+    from difficulty import get_question_difficulty, refresh_difficulty
+    from manage_db import (add_answer_events, create_new_user,
+                           create_new_users, delete_this_user,
+                           get_last_enter_date, get_roster,
+                           get_theme_snapshots, get_user_interview_duration,
+                           get_user_names, get_user_profile,
+                           get_user_progress,
+                           update_interview_duration, update_last_enter_date,
+                           update_user_progress)
+    from models import create_db
+
+__all__ = (
+    'add_answer_events', 'create_db', 'create_new_user', 'create_new_users',
+    'delete_this_user', 'get_last_enter_date', 'get_question_difficulty',
+    'get_roster', 'get_theme_snapshots', 'get_user_interview_duration',
+    'get_user_names', 'get_user_profile', 'get_user_progress',
+    'refresh_difficulty', 'update_interview_duration',
+    'update_last_enter_date', 'update_user_progress',
+)
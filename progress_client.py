@@ -0,0 +1,264 @@
+"""The manage_db API served by a progress server.
+
+Every call is sent at once, writes do not wait for their responses:
+a thread reads the responses in order they come. A write which has
+failed on the server is logged as soon as its response is read.
+The server executes the calls of a connection in order, so a read
+always sees what has been written before it. Once the connection
+is lost every waiting and new call fails at once.
+"""
+import atexit
+import datetime
+import logging
+import os
+import socket
+import threading
+from collections import deque
+from concurrent.futures import Future, wait
+
+from manage_db import decode_progress
+from progress_protocol import dump_message, load_message, parse_address
+from settings import (SERVER_CALL_TIMEOUT, SERVER_ENV_VAR,
+                      SERVER_PIPELINE_SIZE, SERVER_PORT, SERVER_TOKEN_ENV_VAR)
+from user_directory import user_directory
+
+CLOSE_TIMEOUT = 5
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressServerError(Exception):
+    """The call has failed on the server."""
+
+
+class ProgressClient:
+    """One connection to the progress server.
+
+    At most pipeline_size calls wait for their responses,
+    a write beyond them waits for the oldest one. A read raises
+    TimeoutError if the server has not answered it in timeout seconds.
+    """
+
+    def __init__(self, address: str,
+                 pipeline_size: int = SERVER_PIPELINE_SIZE,
+                 token: str | None = None,
+                 timeout: float = SERVER_CALL_TIMEOUT) -> None:
+        self.pipeline_size = pipeline_size
+        self.timeout = timeout
+        self.socket = socket.create_connection(
+            parse_address(address, SERVER_PORT)
+            )
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.responses = self.socket.makefile('rb')
+        self.lock = threading.Lock()
+        self.waiting: deque[tuple[str, Future]] = deque()
+        self.is_closed = False
+        self.failed_writes: list[Exception] = []
+        self.reader = threading.Thread(target=self._read_responses,
+                                       daemon=True)
+        self.reader.start()
+        if token is not None:
+            self.call('authenticate', token)
+
+    def call(self, name: str, *args):
+        """Sends the call and returns its value."""
+        return self._send(name, args).result(self.timeout)
+
+    def post(self, name: str, *args) -> Future:
+        """Sends the write call without waiting for its response."""
+        if len(self.waiting) >= self.pipeline_size:
+            try:
+                wait([self.waiting[0][1]], self.timeout)
+            except IndexError:
+                pass
+        future = self._send(name, args)
+        future.add_done_callback(
+            lambda future: self._check_write(name, future)
+            )
+        return future
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Waits until every write has been executed and raises
+        the first error of the writes since the previous flush.
+        """
+        with self.lock:
+            futures = [future for _, future in self.waiting]
+        wait(futures, timeout)
+        if self.failed_writes:
+            error, *_ = self.failed_writes
+            self.failed_writes = []
+            raise error
+
+    def close(self) -> None:
+        try:
+            self.flush(CLOSE_TIMEOUT)
+        finally:
+            self.socket.close()
+
+    def _send(self, name: str, args: tuple) -> Future:
+        future = Future()
+        message = dump_message({'calls': [[name, args]]})
+        # Responses come in order of the requests, so both go together
+        with self.lock:
+            if self.is_closed:
+                future.set_exception(get_closed_error())
+                return future
+            self.waiting.append((name, future))
+            try:
+                self.socket.sendall(message)
+            except OSError as error:
+                self.waiting.pop()
+                future.set_exception(error)
+        return future
+
+    def _check_write(self, name: str, future: Future) -> None:
+        error = future.exception()
+        if error is not None:
+            logger.error('%s has failed on the progress server: %s',
+                         name, error)
+            self.failed_writes.append(error)
+
+    def _read_responses(self) -> None:
+        """Gives every response to the call waiting for it."""
+        try:
+            while line := self.responses.readline():
+                # The call has been queued before it was sent
+                _, future = self.waiting.popleft()
+                result, = load_message(line)['results']
+                if 'error' in result:
+                    future.set_exception(ProgressServerError(result['error']))
+                else:
+                    future.set_result(result.get('value'))
+        except (OSError, ValueError):
+            pass
+        with self.lock:
+            self.is_closed = True
+            while self.waiting:
+                _, future = self.waiting.popleft()
+                future.set_exception(get_closed_error())
+
+
+def get_closed_error() -> ConnectionError:
+    return ConnectionError('Progress server has closed connection')
+
+
+_clients: dict[int, ProgressClient] = {}
+
+
+def get_client() -> ProgressClient:
+    """Returns the connection of this process.
+
+    Threads share it, so a read made by a worker sees the writes
+    which the main thread has not sent yet. A lost connection
+    is opened again by the next call.
+    """
+    client = _clients.get(os.getpid())
+    if client is None or client.is_closed:
+        client = ProgressClient(
+            os.environ[SERVER_ENV_VAR],
+            token=os.environ.get(SERVER_TOKEN_ENV_VAR) or None
+            )
+        _clients[os.getpid()] = client
+    return client
+
+
+@atexit.register
+def close_clients() -> None:
+    client = _clients.pop(os.getpid(), None)
+    if client is not None:
+        try:
+            client.close()
+        except OSError:
+            pass
+
+
+def create_db() -> None:
+    """Connects to the server, which keeps the database itself."""
+    get_client()
+    user_directory.set_source(get_user_names, get_users_version)
+
+
+# users
+def create_new_user(user_name: str) -> bool:
+    is_created = get_client().call('create_new_user', user_name)
+    user_directory.add(user_name)
+    return is_created
+
+
+def create_new_users(user_names: list[str]) -> int:
+    created = get_client().call('create_new_users', user_names)
+    user_directory.add_many(user_names)
+    return created
+
+
+def get_roster() -> list[dict]:
+    return get_client().call('get_roster')
+
+
+def get_user_names() -> list[str]:
+    return get_client().call('get_user_names')
+
+
+def get_users_version() -> str:
+    return get_client().call('get_users_version')
+
+
+def delete_this_user(user_name: str) -> None:
+    get_client().call('delete_this_user', user_name)
+    user_directory.remove(user_name)
+
+
+def get_last_enter_date(user_name: str) -> datetime.datetime:
+    return get_client().call('get_last_enter_date', user_name)
+
+
+def update_last_enter_date(user_name: str, date) -> None:
+    get_client().post('update_last_enter_date', user_name, date)
+
+
+def get_user_interview_duration(user_name: str) -> int:
+    return get_client().call('get_user_interview_duration', user_name)
+
+
+def update_interview_duration(user_name: str, duration) -> None:
+    get_client().post('update_interview_duration', user_name, duration)
+
+
+# progress
+def get_user_progress(user_name: str) -> dict[int, bool]:
+    return decode_progress(get_client().call('load_user_progress', user_name))
+
+
+def get_user_profile(user_name: str) -> dict:
+    profile = get_client().call('load_user_profile', user_name)
+    profile['progress'] = decode_progress(profile['progress'])
+    profile['theme_snapshots'] = {
+        int(theme): snapshot
+        for theme, snapshot in profile['theme_snapshots'].items()
+        }
+    return profile
+
+
+def update_user_progress(user_name: str, progress: dict) -> None:
+    get_client().post('update_user_progress', user_name, progress)
+
+
+def add_answer_events(user_name: str, answers: list[dict]) -> None:
+    get_client().post('add_answer_events', user_name, answers)
+
+
+def get_theme_snapshots(user_name: str) -> dict[int, dict]:
+    snapshots = get_client().call('get_theme_snapshots', user_name)
+    return {int(theme): snapshot for theme, snapshot in snapshots.items()}
+
+
+# difficulty
+def refresh_difficulty(full: bool = False) -> None:
+    get_client().post('refresh_difficulty', full)
+
+
+def get_question_difficulty() -> dict[int, float]:
+    difficulty = get_client().call('get_question_difficulty')
+    return {
+        int(question_id): value for question_id, value in difficulty.items()
+        }
@@ -0,0 +1,44 @@
+"""Encoding of the progress column.
+
+Progress is kept sparse, only ids of the questions answered right:
+    {"v": 2, "right": [8, 15, 16]}
+so a row grows with answers, not with the question bank. Rows
+written before it are dense maps of every question id to a bool,
+they are still decoded.
+"""
+import json
+
+PROGRESS_VERSION = 2
+
+
+def encode_progress(progress: dict[int, bool]) -> str:
+    """Converts progress to the column value, ids may come
+    as strings from JSON, as they do from the progress server.
+    """
+    return json.dumps(
+        {
+            'v': PROGRESS_VERSION,
+            'right': sorted(
+                int(question_number)
+                for question_number, is_right in progress.items() if is_right
+                ),
+            },
+        separators=(',', ':')
+        )
+
+
+def decode_progress(progress: str) -> dict[int, bool]:
+    """Converts the column value of any version to a dict
+    with the questions answered right.
+    """
+    document = json.loads(progress)
+    if document.get('v') == PROGRESS_VERSION:
+        return dict.fromkeys(document['right'], True)
+    return {
+        int(question_number): True
+        for question_number, is_right in document.items() if is_right
+        }
+
+
+# Progress of every new user, one string shared by all of them
+EMPTY_PROGRESS = encode_progress({})
@@ -0,0 +1,46 @@
+"""Messages between the progress server and its clients.
+
+Every message is one line of JSON. A request is
+    {"calls": [["update_user_progress", ["ivan", {...}]], ...]}
+and the response has one result for every call, in the same order:
+    {"results": [{"value": ...}, {"error": "..."}]}
+Dates and bytes, which JSON does not have, are wrapped in objects
+with the "$datetime" and "$bytes" keys.
+"""
+import base64
+import datetime
+import json
+
+READ_LIMIT = 16 * 1024 * 1024
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'$bytes': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f'{type(value).__name__} is not serializable')
+
+
+def _decode(value: dict):
+    if '$datetime' in value:
+        return datetime.datetime.fromisoformat(value['$datetime'])
+    if '$bytes' in value:
+        return base64.b64decode(value['$bytes'])
+    return value
+
+
+def dump_message(message: dict) -> bytes:
+    return json.dumps(message, default=_encode).encode('utf-8') + b'\n'
+
+
+def load_message(line: bytes) -> dict:
+    return json.loads(line, object_hook=_decode)
+
+
+def parse_address(address: str, default_port: int) -> tuple[str, int]:
+    """Splits 'host:port', the port may be omitted."""
+    host, _, port = address.rpartition(':')
+    if not host:
+        return port, default_port
+    return host, int(port)
@@ -0,0 +1,227 @@
+"""Progress server owning users.db for a classroom.
+
+    INTERVIEW_ASSISTANT_TOKEN=<secret> python progress_server.py --host 0.0.0.0
+
+Apps find it by the INTERVIEW_ASSISTANT_SERVER variable and send
+the same token, it is the only protection: anyone who has it may
+create and delete users. Without a token the server listens
+on this computer only.
+    INTERVIEW_ASSISTANT_SERVER=teacher-pc:5717 \
+    INTERVIEW_ASSISTANT_TOKEN=<secret> python main.py
+
+Only this process opens the database. Calls of every client are
+put in one queue and executed by one thread, so SQLite never waits
+for a file lock, however many trainees write at the same time.
+The difficulty refit is the exception: it is long, so it runs
+in a thread of its own and the queue does not wait for it.
+"""
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import logging
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from progress_protocol import dump_message, load_message, READ_LIMIT
+from settings import DATABASE_ENV_VAR, SERVER_PORT, SERVER_TOKEN_ENV_VAR
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressServer:
+    """Executes manage_db calls received from the clients."""
+
+    def __init__(self, token: str | None = None) -> None:
+        import difficulty
+        import manage_db
+
+        self.functions = {
+            function.__name__: function for function in (
+                manage_db.create_new_user,
+                manage_db.create_new_users,
+                manage_db.get_roster,
+                manage_db.get_user_names,
+                manage_db.delete_this_user,
+                manage_db.get_last_enter_date,
+                manage_db.update_last_enter_date,
+                manage_db.get_user_interview_duration,
+                manage_db.update_interview_duration,
+                manage_db.load_user_progress,
+                manage_db.load_user_profile,
+                manage_db.update_user_progress,
+                manage_db.add_answer_events,
+                manage_db.get_theme_snapshots,
+                self.refresh_difficulty,
+                difficulty.get_question_difficulty,
+                self.get_users_version,
+                self.authenticate,
+                )
+            }
+        self.token = token
+        self.users_changes = {
+            'create_new_user', 'create_new_users', 'delete_this_user'
+            }
+        # Clients compare versions, a restarted server has a new one
+        self.started_at = time.time_ns()
+        self.users_version = 0
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.refit = difficulty.refresh_difficulty
+        self.refit_executor = ThreadPoolExecutor(max_workers=1)
+        self.difficulty_refresh: Future | None = None
+
+    def get_users_version(self) -> str:
+        return f'{self.started_at}:{self.users_version}'
+
+    def refresh_difficulty(self, full: bool = False) -> None:
+        """Starts the refit in its thread and returns at once.
+        A refit which has not started yet covers the new request too.
+        """
+        refresh = self.difficulty_refresh
+        if (not full and refresh is not None
+                and not refresh.running() and not refresh.done()):
+            return
+        self.difficulty_refresh = self.refit_executor.submit(self.refit, full)
+        self.difficulty_refresh.add_done_callback(self.check_refit)
+
+    def check_refit(self, future: Future) -> None:
+        error = future.exception()
+        if error is not None:
+            logger.error('Difficulty refit has failed: %s', error)
+
+    def authenticate(self, token: str) -> bool:
+        """The token is checked before any call, see is_authenticated."""
+        return True
+
+    async def is_authenticated(self, reader: asyncio.StreamReader,
+                               writer: asyncio.StreamWriter) -> bool:
+        """A server with a token expects it in the first call."""
+        if self.token is None:
+            return True
+        try:
+            (name, args), = load_message(await reader.readline())['calls']
+            is_valid = name == 'authenticate' and hmac.compare_digest(
+                str(args[0]), self.token
+                )
+        except (ValueError, TypeError, KeyError, IndexError):
+            is_valid = False
+        result = {'value': True} if is_valid else {'error': 'Wrong token'}
+        writer.write(dump_message({'results': [result]}))
+        await writer.drain()
+        return is_valid
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        self.executing = asyncio.create_task(self.execute_queue())
+        return await asyncio.start_server(
+            self.handle_client, host, port, limit=READ_LIMIT
+            )
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        """Answers the requests of one client in order they came.
+
+        Pipelined requests are put to the queue at once, so a client
+        sending many batches does not wait for each of them.
+        """
+        if not await self.is_authenticated(reader, writer):
+            writer.close()
+            return
+        loop = asyncio.get_running_loop()
+        responses: asyncio.Queue = asyncio.Queue()
+
+        async def write_responses():
+            while (future := await responses.get()) is not None:
+                results = await future
+                if not writer.is_closing():
+                    writer.write(dump_message({'results': results}))
+                    await writer.drain()
+
+        writing = asyncio.create_task(write_responses())
+        try:
+            while line := await reader.readline():
+                future = loop.create_future()
+                await self.queue.put((load_message(line)['calls'], future))
+                await responses.put(future)
+        except ConnectionError:
+            pass
+        finally:
+            await responses.put(None)
+            try:
+                await writing
+            except ConnectionError:
+                pass
+            writer.close()
+
+    async def execute_queue(self) -> None:
+        """Executes every queued request by one pass of the thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            requests = [await self.queue.get()]
+            while not self.queue.empty():
+                requests.append(self.queue.get_nowait())
+            results = await loop.run_in_executor(
+                self.executor, self.execute_requests,
+                [calls for calls, _ in requests]
+                )
+            for (_, future), result in zip(requests, results):
+                future.set_result(result)
+
+    def execute_requests(self, requests: list[list]) -> list[list[dict]]:
+        return [
+            [self.execute(name, args) for name, args in calls]
+            for calls in requests
+            ]
+
+    def execute(self, name: str, args: list) -> dict:
+        function = self.functions.get(name)
+        if function is None:
+            return {'error': f'Unknown call {name}'}
+        try:
+            value = function(*args)
+        except Exception as error:
+            return {'error': f'{type(error).__name__}: {error}'}
+        if name in self.users_changes:
+            self.users_version += 1
+        return {'value': value}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--db', help='SQLite file to use instead of users.db')
+    args = parser.parse_args()
+    token = os.environ.get(SERVER_TOKEN_ENV_VAR) or None
+    if token is None and not _is_loopback(args.host):
+        parser.error(
+            f'set {SERVER_TOKEN_ENV_VAR} to listen on {args.host}, '
+            'anyone in the network could change the progress otherwise'
+            )
+    if args.db:
+        os.environ[DATABASE_ENV_VAR] = args.db
+
+    from models import create_db
+
+    create_db()
+    print(f'Progress server is listening on {args.host}:{args.port}')
+    asyncio.run(ProgressServer(token).serve(args.host, args.port))
+
+
+def _is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+if __name__ == '__main__':
+    main()
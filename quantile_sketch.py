@@ -0,0 +1,60 @@
+import math
+import struct
+from typing import Optional
+
+HEADER = struct.Struct('<fI')
+
+
+class QuantileSketch:
+    """Streaming quantiles of positive values (DDSketch).
+
+    Values fall into buckets growing by the factor gamma, so any
+    quantile is known with the relative accuracy whatever the amount
+    of samples is. Only bucket counters are stored, a few hundred
+    bytes cover answers from a second to hours.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.02) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: dict[int, int] = {}
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        """Adds one sample, values less than 1 are counted as 1."""
+        index = math.ceil(math.log(max(value, 1)) / self.log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Returns the value which q share of samples does not exceed."""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        passed = 0
+        for index in sorted(self.buckets):
+            passed += self.buckets[index]
+            if passed > rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return None
+
+    def to_bytes(self) -> bytes:
+        indexes = sorted(self.buckets)
+        return HEADER.pack(self.relative_accuracy, len(indexes)) + struct.pack(
+            f'<{len(indexes)}h{len(indexes)}I',
+            *indexes,
+            *(self.buckets[index] for index in indexes)
+            )
+
+    @classmethod
+    def from_bytes(cls, data: Optional[bytes]) -> 'QuantileSketch':
+        """Restores the sketch, an empty one is made from None."""
+        if not data:
+            return cls()
+        relative_accuracy, size = HEADER.unpack_from(data)
+        sketch = cls(round(relative_accuracy, 6))
+        values = struct.unpack_from(f'<{size}h{size}I', data, HEADER.size)
+        sketch.buckets = dict(zip(values[:size], values[size:]))
+        sketch.count = sum(sketch.buckets.values())
+        return sketch
@@ -0,0 +1,187 @@
+"""Question packs: bundles of questions, their themes and PDF-files.
+
+Every pack is a directory in packs/ with the pack.json manifest:
+    {
+        "title": "Go",
+        "version": 1,
+        "questions": "questions.csv",
+        "knowledge": "knowledge",
+        "themes": [{"id": 7, "title": "...", "short_title": "...",
+                    "first_question": 1000, "last_question": 1150}, ...]
+    }
+"questions" and "knowledge" are paths relative to the pack directory,
+the values above are the defaults. Question and theme ids of all packs
+must not intersect, so progress of every pack is kept in one database.
+
+A pack may be shipped as one <name>.pack file instead of the directory,
+see pack_archive.py.
+"""
+import json
+import os
+import threading
+from functools import cache
+from typing import NotRequired, TypedDict
+
+from questions import (get_question_theme as get_range_theme, load_csv,
+                       QuestionBank)
+from settings import (MAX_PACK_THEMES, PACK_ARCHIVE_EXTENSION,
+                      PACK_MANIFEST, PACKS_DIRECTORY)
+
+
+class PackTheme(TypedDict):
+    id: int
+    title: str
+    short_title: str
+    checkbox_title: NotRequired[str]
+    first_question: int
+    last_question: int
+
+
+class QuestionPack:
+    """A pack described by its manifest.
+
+    Only the manifest is read when packs are discovered. Questions
+    are loaded by the first call of load_questions() and kept until
+    release(), so packs nobody has chosen cost nothing.
+    """
+
+    def __init__(self, name: str, directory: str, manifest: dict) -> None:
+        self.name = name
+        self.directory = directory
+        self.title: str = manifest.get('title', name)
+        self.version: int = manifest.get('version', 0)
+        self.themes: list[PackTheme] = manifest['themes']
+        self.theme_ranges: dict[int, tuple[int, int]] = {
+            theme['id']: (theme['first_question'], theme['last_question'])
+            for theme in self.themes
+            }
+        self.first_question = min(
+            first_question for first_question, _ in self.theme_ranges.values()
+            )
+        self.last_question = max(
+            last_question for _, last_question in self.theme_ranges.values()
+            )
+        self.questions_file = os.path.join(
+            directory, manifest.get('questions', 'questions.csv')
+            )
+        self.knowledge_directory = os.path.join(
+            directory, manifest.get('knowledge', 'knowledge')
+            )
+        self._questions: QuestionBank | None = None
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f'QuestionPack({self.name!r})'
+
+    def load_questions(self) -> QuestionBank:
+        """Returns the questions, they are read once."""
+        with self._lock:
+            if self._questions is None:
+                self._questions = QuestionBank(load_csv(self.questions_file))
+            return self._questions
+
+    def release(self) -> None:
+        """Drops the loaded questions."""
+        with self._lock:
+            self._questions = None
+
+    def get_question(self, question_number: int) -> tuple[int | str]:
+        """Returns the row of the question."""
+        return self.load_questions().get(question_number)
+
+    def get_pdf(self, file_name: int | str) -> str | memoryview:
+        """Returns the PDF-file with answers: its path or its content."""
+        return os.path.join(self.knowledge_directory, f'{file_name}.pdf')
+
+    def get_theme_titles(self) -> dict[int, str]:
+        return {theme['id']: theme['title'] for theme in self.themes}
+
+    def get_short_theme_titles(self) -> dict[int, str]:
+        return {theme['id']: theme['short_title'] for theme in self.themes}
+
+    def get_checkbox_titles(self) -> list[str]:
+        return [
+            theme.get('checkbox_title', theme['title'])
+            for theme in self.themes
+            ]
+
+    def has_question(self, question_number: int) -> bool:
+        return self.first_question <= question_number <= self.last_question
+
+    def get_question_theme(self, question_number: int) -> int | None:
+        return get_range_theme(question_number, self.theme_ranges)
+
+
+def discover_packs(directory: str = PACKS_DIRECTORY
+                   ) -> dict[str, QuestionPack]:
+    """Reads the manifests of every pack in the directory.
+
+    Raises ValueError if packs have too many themes or their
+    question or theme ids intersect.
+    """
+    from pack_archive import ArchivePack
+
+    packs = {}
+    for file_name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, file_name)
+        name, extension = os.path.splitext(file_name)
+        if extension == PACK_ARCHIVE_EXTENSION and os.path.isfile(path):
+            pack = ArchivePack(name, path)
+        elif os.path.isfile(os.path.join(path, PACK_MANIFEST)):
+            pack = load_pack_directory(path)
+        else:
+            continue
+        if pack.name in packs:
+            raise ValueError(f'Pack {pack.name} is found twice')
+        if not 0 < len(pack.themes) <= MAX_PACK_THEMES:
+            raise ValueError(
+                f'Pack {name} must have from 1 to {MAX_PACK_THEMES} themes'
+                )
+        packs[pack.name] = pack
+    _check_disjoint_ids(packs)
+    return packs
+
+
+def load_pack_directory(directory: str) -> QuestionPack:
+    """Reads the manifest of the pack directory."""
+    manifest_path = os.path.join(directory, PACK_MANIFEST)
+    with open(manifest_path, encoding='utf-8', mode='r') as f:
+        manifest = json.load(f)
+    return QuestionPack(
+        os.path.basename(os.path.normpath(directory)), directory, manifest
+        )
+
+
+def _check_disjoint_ids(packs: dict[str, QuestionPack]) -> None:
+    theme_owners = {}
+    ranges = []
+    for pack in packs.values():
+        for theme_id, question_range in pack.theme_ranges.items():
+            if theme_id in theme_owners:
+                raise ValueError(
+                    f'Theme {theme_id} is in packs '
+                    f'{theme_owners[theme_id]} and {pack.name}'
+                    )
+            theme_owners[theme_id] = pack.name
+            ranges.append((*question_range, pack.name))
+    ranges.sort()
+    for (_, last_question, name), (first_question, _, next_name) in zip(
+            ranges, ranges[1:]):
+        if first_question <= last_question:
+            raise ValueError(
+                f'Question ids of packs {name} and {next_name} intersect'
+                )
+
+
+@cache
+def get_packs() -> dict[str, QuestionPack]:
+    """Returns the packs of the packs directory, discovered once."""
+    return discover_packs()
+
+
+def get_question_theme(question_number: int) -> int | None:
+    """Returns the theme of the question in whatever pack it is."""
+    for pack in get_packs().values():
+        if pack.has_question(question_number):
+            return pack.get_question_theme(question_number)
+    return None
@@ -0,0 +1,120 @@
+import csv
+import random
+from typing import Container, Iterable, Iterator
+
+from settings import QuestionOrder, QuestionThreshold as qt
+
+THEME_RANGES: dict[int, tuple[int, int]] = {
+    0: (qt.BASIC_FIRST_QUESTION, qt.BASIC_LAST_QUESTION),
+    1: (qt.OOP_FIRST_QUESTION, qt.OOP_LAST_QUESTION),
+    2: (qt.PEP8_FIRST_QUESTION, qt.PEP8_LAST_QUESTION),
+    3: (qt.STRUCTURES_FIRST_QUESTION, qt.STRUCTURES_LAST_QUESTION),
+    4: (qt.ALGHORITMS_FIRST_QUESTION, qt.ALGHORITMS_LAST_QUESTION),
+    5: (qt.GIT_FIRST_QUESTION, qt.GIT_LAST_QUESTION),
+    6: (qt.SQL_FIRST_QUESTION, qt.SQL_LAST_QUESTION),
+}
+
+
+def get_question_theme(
+        question_number: int,
+        theme_ranges: dict[int, tuple[int, int]] = THEME_RANGES
+        ) -> int | None:
+    """Returns the index of the theme the question belongs to."""
+    for theme, (first_question, last_question) in theme_ranges.items():
+        if first_question <= question_number <= last_question:
+            return theme
+    return None
+
+
+def load_csv(filepath: str) -> list[tuple[int | str]]:
+    """Converts the question CSV-file to list of tuples."""
+    with open(filepath, encoding='utf-8', mode='r', newline='') as f:
+        return parse_csv(f)
+
+
+def parse_csv(lines: Iterable[str]) -> list[tuple[int | str]]:
+    """Converts lines of question CSV to list of tuples."""
+    data = tuple(csv.reader(lines, delimiter=';'))
+    return [
+        tuple(
+            [int(item) if item.isdigit() else item for item in row]
+            ) for row in data]
+
+
+class QuestionBank:
+    """Questions of a pack found by their ids.
+
+    Ids are taken from the first column and are never derived from
+    positions of rows, so inserted or removed rows do not shift them.
+    """
+
+    def __init__(self, rows: Iterable[tuple[int | str]] = ()) -> None:
+        self.rows: list[tuple[int | str]] = list(rows)
+        self.index: dict[int, int] = {}
+        for position, row in enumerate(self.rows):
+            if row[0] in self.index:
+                raise ValueError(f'Question id {row[0]} is repeated')
+            self.index[row[0]] = position
+        # Tree items are named by ids, selection gets them back at once
+        self.iids: dict[str, int] = {
+            str(question_id): question_id for question_id in self.index
+            }
+
+    def __iter__(self) -> Iterator[tuple[int | str]]:
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, question_id: int) -> bool:
+        return question_id in self.index
+
+    def get(self, question_id: int) -> tuple[int | str]:
+        """Returns the row of the question, raises KeyError if none."""
+        return self.rows[self.index[question_id]]
+
+    def get_position(self, question_id: int) -> int:
+        return self.index[question_id]
+
+    def get_id(self, iid: str) -> int | None:
+        """Returns the id of the question tree item, None for themes."""
+        return self.iids.get(iid)
+
+
+def generate_question_list(
+        open_themes: list[int],
+        user_progress: dict[int, bool],
+        order: int = QuestionOrder.SEQUENTIAL,
+        difficulty: dict[int, float] | None = None,
+        theme_ranges: dict[int, tuple[int, int]] = THEME_RANGES,
+        question_bank: Container[int] | None = None) -> list[int]:
+    """Generares a question list for the session
+    without questions which user has answered right.
+    Ids the question bank does not have are skipped.
+
+    Questions without known difficulty are taken as average ones,
+    the sort is stable so they keep their order among equals.
+    """
+    user_right_answer = {
+        question_number
+        for question_number, is_right
+        in user_progress.items() if is_right
+        }
+    question_list = []
+    for theme in open_themes:
+        first_question, last_question = theme_ranges[theme]
+        question_list += [
+            question_number
+            for question_number in range(first_question, last_question + 1)
+            if question_number not in user_right_answer
+            and (question_bank is None or question_number in question_bank)
+            ]
+    if order == QuestionOrder.RANDOM:
+        random.shuffle(question_list)
+    elif order in (QuestionOrder.EASIEST_FIRST, QuestionOrder.HARDEST_FIRST):
+        difficulty = difficulty or {}
+        question_list.sort(
+            key=lambda question_number: difficulty.get(question_number, 0.0),
+            reverse=order == QuestionOrder.HARDEST_FIRST
+            )
+    return question_list
@@ -0,0 +1,117 @@
+"""Import and export of the users of a group.
+
+    python roster.py import trainees.csv
+    python roster.py export roster.json
+
+A CSV roster has a user_name column, or names in its first column
+if there is no header. A JSON roster is a list of names or of objects
+with the user_name key. Names are validated together, the valid ones
+are added in one transaction and the rest are reported.
+"""
+import argparse
+import csv
+import json
+import os
+
+from progress_backend import create_db, create_new_users, get_roster
+from validator import validate_names
+
+ROSTER_COLUMNS = ('user_name', 'last_enter_date', 'interviews_duration')
+
+
+def read_roster(filepath: str) -> tuple[list[str], list[str]]:
+    """Returns user names of the CSV or JSON roster
+    and the JSON rows which have no name string.
+    """
+    if os.path.splitext(filepath)[1].lower() == '.json':
+        with open(filepath, encoding='utf-8', mode='r') as f:
+            users = json.load(f)
+        user_names = []
+        invalid_rows = []
+        for number, user in enumerate(users, start=1):
+            user_name = (
+                user.get('user_name') if isinstance(user, dict) else user
+                )
+            if isinstance(user_name, str):
+                user_names.append(user_name.strip())
+            else:
+                invalid_rows.append(f'row {number}: {user!r}')
+        return user_names, invalid_rows
+    with open(filepath, encoding='utf-8-sig', mode='r', newline='') as f:
+        rows = list(csv.reader(f, delimiter=_get_delimiter(f)))
+    if rows and 'user_name' in rows[0]:
+        column = rows[0].index('user_name')
+        rows = rows[1:]
+    else:
+        column = 0
+    return [row[column].strip() for row in rows if row], []
+
+
+def import_roster(user_names: list[str]) -> tuple[int, dict[str, list[str]]]:
+    """Adds the valid users and returns how many of them have been
+    created with the violations of the invalid names.
+    """
+    rejected = {}
+    valid_names = []
+    for user_name, violations in zip(user_names,
+                                     validate_names(user_names)):
+        if violations:
+            rejected[user_name] = [
+                violation.lstrip('*') for violation in violations
+                ]
+        else:
+            valid_names.append(user_name)
+    return create_new_users(valid_names), rejected
+
+
+def write_roster(filepath: str) -> int:
+    """Writes every user to the CSV or JSON file and returns their number."""
+    roster = get_roster()
+    for user in roster:
+        if user['last_enter_date'] is not None:
+            user['last_enter_date'] = user['last_enter_date'].isoformat(
+                sep=' ', timespec='seconds'
+                )
+    if os.path.splitext(filepath)[1].lower() == '.json':
+        with open(filepath, encoding='utf-8', mode='w') as f:
+            json.dump(roster, f, ensure_ascii=False, indent=4)
+    else:
+        with open(filepath, encoding='utf-8', mode='w', newline='') as f:
+            writer = csv.DictWriter(f, ROSTER_COLUMNS, delimiter=';')
+            writer.writeheader()
+            writer.writerows(roster)
+    return len(roster)
+
+
+def _get_delimiter(f) -> str:
+    """Both ; of Excel with Russian locale and , are accepted."""
+    first_line = f.readline()
+    f.seek(0)
+    return ';' if ';' in first_line else ','
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    import_command = commands.add_parser('import', help='add users')
+    import_command.add_argument('roster', help='CSV or JSON file')
+    export_command = commands.add_parser('export', help='write users')
+    export_command.add_argument('roster', help='CSV or JSON file')
+    args = parser.parse_args()
+
+    create_db()
+    if args.command == 'import':
+        user_names, invalid_rows = read_roster(args.roster)
+        created, rejected = import_roster(user_names)
+        for row in invalid_rows:
+            print(f'{row}: not a user name')
+        for user_name, violations in rejected.items():
+            print(f'{user_name!r}: {"; ".join(violations)}')
+        print(f'{created} users added, '
+              f'{len(rejected) + len(invalid_rows)} names rejected')
+    else:
+        print(f'{write_roster(args.roster)} users written to {args.roster}')
+
+
+if __name__ == '__main__':
+    main()
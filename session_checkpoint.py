@@ -0,0 +1,198 @@
+"""Checkpoints of the interview in progress.
+
+The file starts with a snapshot of the session, every change is appended
+as one record of five bytes:
+    MAGIC
+    SNAPSHOT <length> <JSON: user, pack, mode, elapsed seconds>
+    QUEUE <amount> <question ids, 4 bytes each>
+    POP <question id>          the first question is answered right
+    ROTATE <question id>       the first question is answered wrong
+    ELAPSED <seconds>          time of the interview so far
+The file is not synced, a record costs a write() call only, it survives
+the crash of the app but not of the system. After SESSION_COMPACT_RECORDS
+records the file is replaced by a fresh snapshot. A finished interview
+removes the file, one left on disk is offered to be resumed on launch.
+"""
+import json
+import os
+import struct
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from my_timers import timers
+from settings import (SESSION_CHECKPOINT_INTERVAL, SESSION_COMPACT_RECORDS,
+                      SESSION_ENV_VAR, SESSION_FILE)
+
+SESSION_PATH = os.environ.get(SESSION_ENV_VAR, SESSION_FILE)
+
+MAGIC = b'IAS\x01'
+RECORD = struct.Struct('<BI')
+SNAPSHOT, QUEUE, POP, ROTATE, ELAPSED = range(1, 6)
+
+
+@dataclass
+class SessionState:
+    user_name: str
+    pack_name: str
+    mode: list[int]
+    elapsed: int = 0
+    questions: deque[int] = field(default_factory=deque)
+
+
+class SessionCheckpoint:
+    """Appends the changes of the interview to the checkpoint file."""
+
+    def __init__(self, filepath: str = SESSION_PATH,
+                 checkpoint_interval: Optional[float] =
+                 SESSION_CHECKPOINT_INTERVAL,
+                 compact_records: int = SESSION_COMPACT_RECORDS) -> None:
+        self.filepath = filepath
+        self.checkpoint_interval = checkpoint_interval
+        self.compact_records = compact_records
+        self.state: Optional[SessionState] = None
+        self.descriptor: Optional[int] = None
+        self.records = 0
+        self.started_at = 0.0
+
+    def load(self) -> Optional[SessionState]:
+        """Returns the session left by the previous launch, if any.
+
+        A record cut by the crash is dropped, a file which does not
+        replay is ignored.
+        """
+        if not self.filepath or not os.path.isfile(self.filepath):
+            return None
+        with open(self.filepath, 'rb') as f:
+            data = f.read()
+        try:
+            return read_session(data)
+        except (ValueError, KeyError, IndexError, struct.error):
+            return None
+
+    def start(self, state: SessionState) -> None:
+        """Begins a new session or continues the loaded one."""
+        self.close()
+        if not self.filepath:
+            return
+        self.state = state
+        self.started_at = time.monotonic() - state.elapsed
+        self.compact()
+        if self.checkpoint_interval is not None:
+            timers.schedule(self.checkpoint_interval, self.tick, key=self)
+
+    def pop(self, question_id: int) -> None:
+        if self.state is not None:
+            self.state.questions.popleft()
+            self.append(POP, question_id)
+
+    def rotate(self, question_id: int) -> None:
+        if self.state is not None:
+            self.state.questions.rotate(-1)
+            self.append(ROTATE, question_id)
+
+    def get_elapsed(self) -> int:
+        return int(time.monotonic() - self.started_at)
+
+    def tick(self) -> None:
+        """Records the elapsed time, it repeats while the session goes."""
+        if self.state is None:
+            return
+        self.state.elapsed = self.get_elapsed()
+        self.append(ELAPSED, self.state.elapsed)
+        timers.schedule(self.checkpoint_interval, self.tick, key=self)
+
+    def append(self, kind: int, value: int) -> None:
+        os.write(self.descriptor, RECORD.pack(kind, value))
+        self.records += 1
+        if self.records >= self.compact_records:
+            self.compact()
+
+    def compact(self) -> None:
+        """Replaces the records with the snapshot of the session."""
+        self.state.elapsed = self.get_elapsed()
+        temporary_path = f'{self.filepath}.tmp'
+        with open(temporary_path, 'wb') as f:
+            f.write(write_session(self.state))
+        if self.descriptor is not None:
+            os.close(self.descriptor)
+        os.replace(temporary_path, self.filepath)
+        self.descriptor = os.open(self.filepath, os.O_WRONLY | os.O_APPEND)
+        self.records = 0
+
+    def close(self) -> None:
+        """Stops recording, the file is kept to be resumed."""
+        if self.state is not None and self.descriptor is not None:
+            self.append(ELAPSED, self.get_elapsed())
+        timers.cancel(self)
+        if self.descriptor is not None:
+            os.close(self.descriptor)
+        self.descriptor = None
+        self.state = None
+
+    def finish(self) -> None:
+        """Ends the session and removes its file."""
+        self.close()
+        if self.filepath and os.path.isfile(self.filepath):
+            os.remove(self.filepath)
+
+
+def write_session(state: SessionState) -> bytes:
+    meta = json.dumps(
+        {
+            'user_name': state.user_name,
+            'pack_name': state.pack_name,
+            'mode': state.mode,
+            'elapsed': state.elapsed,
+            },
+        ensure_ascii=False
+        ).encode('utf-8')
+    questions = array('I', state.questions)
+    return b''.join((
+        MAGIC,
+        RECORD.pack(SNAPSHOT, len(meta)), meta,
+        RECORD.pack(QUEUE, len(questions)), questions.tobytes()
+        ))
+
+
+def read_session(data: bytes) -> SessionState:
+    """Replays the snapshot and the records after it.
+    Raises ValueError if the file is not a checkpoint or is inconsistent.
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError('Not a session checkpoint')
+    offset = len(MAGIC)
+    kind, length = RECORD.unpack_from(data, offset)
+    offset += RECORD.size
+    if kind != SNAPSHOT:
+        raise ValueError('Checkpoint has no snapshot')
+    meta = json.loads(data[offset:offset + length])
+    offset += length
+    kind, amount = RECORD.unpack_from(data, offset)
+    offset += RECORD.size
+    if kind != QUEUE:
+        raise ValueError('Checkpoint has no question queue')
+    questions = array('I')
+    questions.frombytes(data[offset:offset + 4 * amount])
+    offset += 4 * amount
+    state = SessionState(
+        meta['user_name'], meta['pack_name'], meta['mode'], meta['elapsed'],
+        deque(questions)
+        )
+
+    end = len(data) - (len(data) - offset) % RECORD.size
+    for kind, value in RECORD.iter_unpack(data[offset:end]):
+        if kind == ELAPSED:
+            state.elapsed = value
+        elif kind in (POP, ROTATE):
+            if state.questions[0] != value:
+                raise ValueError(f'Question {value} is not the first one')
+            if kind == POP:
+                state.questions.popleft()
+            else:
+                state.questions.rotate(-1)
+        else:
+            raise ValueError(f'Unknown record {kind}')
+    return state
@@ -4,16 +4,73 @@ from enum import Enum
 APP_NAME = 'Python Interview Assistant'
 APP_RESOLUTION = (1280, 720)
 CREATE_USER_WINDOW = 'Добавить пользователя'
+SHORT_THEME_NAMES = (
+    'Базовый синтаксис', 'ООП', 'PEP8, PEP257', 'Структуры данных',
+    'Алгоритмы', 'Git', 'SQL'
+    )
 HINT_WINDOW_TITLE = 'Подсказка'
+QUESTIONS_FILE = 'data.csv'
+
+# Question packs, the UI has places for MAX_PACK_THEMES themes
+PACKS_DIRECTORY = 'packs'
+PACK_MANIFEST = 'pack.json'
+DEFAULT_PACK = 'python'
+MAX_PACK_THEMES = 7
+PACK_ARCHIVE_EXTENSION = '.pack'
+
+# Content-defined chunks of pack updates, 8 KB on average
+CHUNK_WINDOW = 48
+CHUNK_AVERAGE_BITS = 13
+CHUNK_MIN_SIZE = 2 * 1024
+CHUNK_MAX_SIZE = 64 * 1024
+
+# Icons section
+ICON_SIZE = (30, 30)
+ICONS = ('add', 'delete', 'start', 'stop', 'sound_ON', 'sound_OFF')
+ATLAS_IMAGE = 'images/atlas.png'
+ATLAS_INDEX = 'images/atlas.json'
 
 # Validator section
 WRONG_SYMBOLS = (
     '#', '@', '!', '?', '<', '>', '/',
     '|', '$', '^', '*', '(', ')', '+', '-', '='
     )
+WRONG_FIRST_SYMBOLS = (' ', *WRONG_SYMBOLS, *'0123456789')
+MIN_NAME_LENGTH = 2
+MAX_NAME_LENGTH = 25
+
+# Profiler section, timings are logged only to the file named by the variable
+TIMINGS_ENV_VAR = 'INTERVIEW_ASSISTANT_TIMINGS'
+PROFILE_FILE = 'startup.prof'
+
+# Background I/O and UI dispatch, the queue is drained once a frame
+IO_WORKERS = 4
+UI_FRAME_INTERVAL = 16
+UI_DRAIN_BATCH = 100
+UI_DRAIN_BUDGET = 0.008
 
-# Database name
+# Answers are written to the log by batches of this size
+ANSWER_BATCH_SIZE = 20
+
+# Interview checkpoints: the file, the variable replaces it and an empty
+# value turns them off, seconds between elapsed time records and records
+# after which the file is compacted
+SESSION_FILE = 'session.ckpt'
+SESSION_ENV_VAR = 'INTERVIEW_ASSISTANT_SESSION'
+SESSION_CHECKPOINT_INTERVAL = 15
+SESSION_COMPACT_RECORDS = 256
+
+# Database name, the variable replaces it for benchmarks and load tests
 DATABASE_NAME = 'users.db'
+DATABASE_ENV_VAR = 'INTERVIEW_ASSISTANT_DB'
+
+# Progress server, the app uses it instead of DB when the variable is set,
+# clients send the token of the other variable to a server with a token
+SERVER_ENV_VAR = 'INTERVIEW_ASSISTANT_SERVER'
+SERVER_TOKEN_ENV_VAR = 'INTERVIEW_ASSISTANT_TOKEN'
+SERVER_PORT = 5717
+SERVER_PIPELINE_SIZE = 50
+SERVER_CALL_TIMEOUT = 10
 
 class ValidResponse(str, Enum):
     SUCCESS = '*Пользователь успешно создан'
@@ -35,6 +92,13 @@ class Theme(str, Enum):
     SQL = 'Базы данных и SQL запросы'
 
 
+class QuestionOrder(int, Enum):
+    SEQUENTIAL = 0
+    RANDOM = 1
+    EASIEST_FIRST = 2
+    HARDEST_FIRST = 3
+
+
 class QuestionThreshold(int, Enum):
     BASIC_FIRST_QUESTION = 8
     BASIC_LAST_QUESTION = 224
@@ -0,0 +1,79 @@
+"""Posting UI changes from background threads to the Tk main loop."""
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from settings import UI_DRAIN_BATCH, UI_DRAIN_BUDGET, UI_FRAME_INTERVAL
+
+
+class UIDispatcher:
+    """A queue of calls which only the main thread executes.
+
+    Workers append to a deque, which needs no lock: append and
+    popleft are atomic. The main loop drains it once a frame by
+    after(), at most UI_DRAIN_BATCH calls or UI_DRAIN_BUDGET seconds
+    at a time, the rest wait for the next frame. Queue depth and
+    drain time are counted for the timings log.
+    """
+
+    def __init__(self) -> None:
+        self.widget = None
+        self.calls: deque[tuple[Callable, tuple]] = deque()
+        self.after_id: Optional[str] = None
+        self.executed = 0
+        self.max_depth = 0
+        self.drains = 0
+        self.drain_seconds = 0.0
+        self.max_drain_seconds = 0.0
+
+    def bind(self, widget) -> None:
+        """Starts draining on the main loop of the widget."""
+        self.widget = widget
+        self.after_id = widget.after(UI_FRAME_INTERVAL, self.drain)
+
+    def post(self, function: Callable, *args) -> None:
+        """Calls the function in the main thread, any thread may post."""
+        self.calls.append((function, args))
+
+    def drain(self) -> None:
+        """Executes a bounded batch of the posted calls."""
+        depth = len(self.calls)
+        self.max_depth = max(self.max_depth, depth)
+        if depth:
+            start = time.perf_counter()
+            deadline = start + UI_DRAIN_BUDGET
+            for _ in range(min(depth, UI_DRAIN_BATCH)):
+                function, args = self.calls.popleft()
+                try:
+                    function(*args)
+                except Exception as error:
+                    self.widget.report_callback_exception(
+                        type(error), error, error.__traceback__
+                        )
+                self.executed += 1
+                if time.perf_counter() > deadline:
+                    break
+            elapsed = time.perf_counter() - start
+            self.drains += 1
+            self.drain_seconds += elapsed
+            self.max_drain_seconds = max(self.max_drain_seconds, elapsed)
+        self.after_id = self.widget.after(UI_FRAME_INTERVAL, self.drain)
+
+    def stop(self) -> None:
+        if self.after_id is not None:
+            self.widget.after_cancel(self.after_id)
+            self.after_id = None
+
+    def get_metrics(self) -> dict[str, int | float]:
+        return {
+            # Workers do not count, a shared counter would need a lock
+            'posted': self.executed + len(self.calls),
+            'executed': self.executed,
+            'depth': len(self.calls),
+            'max_depth': self.max_depth,
+            'drains': self.drains,
+            'max_drain_ms': round(1000 * self.max_drain_seconds, 3),
+        }
+
+
+dispatcher = UIDispatcher()
@@ -0,0 +1,102 @@
+from typing import Callable, Hashable, Iterable
+
+from sqlalchemy import select
+
+from models import engine, User, UsersVersion
+
+
+class UserDirectory:
+    """In-memory index of user names.
+
+    The dict works both as a hash set and as a list ordered
+    like the users table. It is loaded once, kept in sync by
+    the functions in manage_db and reloaded only when someone else
+    has added or deleted a user. The names and the version
+    are read from another source, such as a progress server, after
+    set_source() has been called.
+    """
+
+    def __init__(self) -> None:
+        self._names: dict[str, None] = {}
+        self._names_view: tuple[str, ...] = ()
+        self._data_version: Hashable | None = None
+        self._load_names: Callable[[], list[str]] | None = None
+        self._load_data_version: Callable[[], Hashable] | None = None
+
+    def __contains__(self, user_name: str) -> bool:
+        self._load_once()
+        return user_name in self._names
+
+    @property
+    def names(self) -> tuple[str, ...]:
+        """Returns user names in order of their creation."""
+        self._load_once()
+        return self._names_view
+
+    def add(self, user_name: str) -> None:
+        """Adds a name which has been saved to DB."""
+        self._load_once()
+        self._names[user_name] = None
+        self._names_view = tuple(self._names)
+        self._data_version = self._get_data_version()
+
+    def add_many(self, user_names: Iterable[str]) -> None:
+        """Adds names which have been saved to DB at once."""
+        self._load_once()
+        self._names.update(dict.fromkeys(user_names))
+        self._names_view = tuple(self._names)
+        self._data_version = self._get_data_version()
+
+    def remove(self, user_name: str) -> None:
+        """Removes a name which has been deleted from DB."""
+        self._load_once()
+        self._names.pop(user_name, None)
+        self._names_view = tuple(self._names)
+        self._data_version = self._get_data_version()
+
+    def refresh(self) -> bool:
+        """Reloads the names if someone else has changed the users."""
+        if self._data_version is None:
+            self.reload()
+            return True
+        if self._get_data_version() == self._data_version:
+            return False
+        self.reload()
+        return True
+
+    def set_source(self, load_names: Callable[[], list[str]],
+                   load_data_version: Callable[[], Hashable]) -> None:
+        """Replaces DB with the functions returning names in order
+        of their creation and a value changed along with them.
+        """
+        self._load_names = load_names
+        self._load_data_version = load_data_version
+        self._data_version = None
+
+    def reload(self) -> None:
+        """Loads every user name from DB."""
+        self._data_version = self._get_data_version()
+        if self._load_names is not None:
+            self._names = dict.fromkeys(self._load_names())
+            self._names_view = tuple(self._names)
+            return
+        with engine.connect() as conn:
+            result = conn.execute(select(User.user_name).order_by(User.id))
+            self._names = dict.fromkeys(result.scalars())
+        self._names_view = tuple(self._names)
+
+    def _load_once(self) -> None:
+        if self._data_version is None:
+            self.reload()
+
+    def _get_data_version(self) -> Hashable:
+        """Returns the counter which triggers of the users table
+        increment on every added or deleted user.
+        """
+        if self._load_data_version is not None:
+            return self._load_data_version()
+        with engine.connect() as conn:
+            return conn.execute(select(UsersVersion.version)).scalar_one()
+
+
+user_directory = UserDirectory()
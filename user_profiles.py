@@ -0,0 +1,88 @@
+import datetime
+from typing import Callable, Optional, TypedDict
+
+from background_io import call_now
+from progress_backend import (get_user_interview_duration, get_user_profile,
+                              update_interview_duration,
+                              update_last_enter_date, update_user_progress)
+
+
+class UserProfile(TypedDict):
+    progress: dict[int, bool]
+    last_enter_date: Optional[datetime.datetime]
+    interview_duration: int
+    theme_snapshots: dict[int, dict]
+
+
+class UserProfileCache:
+    """Profiles of the users chosen in this session.
+
+    A profile is read by one query when its user is chosen first,
+    choosing the user again reads nothing. Changes are kept in the
+    profile at once and written to DB by write(function, *args),
+    which may run them in a worker. Theme snapshots are counted
+    by DB from the answers, so a profile whose user has answered
+    is marked dirty and read again when it is shown next time.
+    Progress is copied in and out: the interview changes its own
+    dict, the cache changes only by the write-through methods.
+    The cache is used from the main thread only.
+    """
+
+    def __init__(self, write: Callable[..., None] = call_now) -> None:
+        self.write = write
+        self.profiles: dict[str, UserProfile] = {}
+        self.dirty: set[str] = set()
+
+    def get(self, user_name: str) -> Optional[UserProfile]:
+        """Returns the profile or None if it has to be read."""
+        profile = self.profiles.get(user_name)
+        if profile is None or user_name in self.dirty:
+            return None
+        return UserProfile(profile, progress=dict(profile['progress']))
+
+    @staticmethod
+    def load(user_name: str) -> UserProfile:
+        """Reads the profile from DB, it may run in a worker."""
+        return get_user_profile(user_name)
+
+    def put(self, user_name: str, profile: UserProfile) -> None:
+        self.profiles[user_name] = UserProfile(
+            profile, progress=dict(profile['progress'])
+            )
+        self.dirty.discard(user_name)
+
+    def mark_dirty(self, user_name: str) -> None:
+        if user_name in self.profiles:
+            self.dirty.add(user_name)
+
+    def remove(self, user_name: str) -> None:
+        self.profiles.pop(user_name, None)
+        self.dirty.discard(user_name)
+
+    def set_progress(self, user_name: str, progress: dict[int, bool]) -> None:
+        progress = dict(progress)
+        self.write(update_user_progress, user_name, progress)
+        if user_name in self.profiles:
+            self.profiles[user_name]['progress'] = progress
+
+    def set_last_enter_date(self, user_name: str,
+                            date: datetime.datetime) -> None:
+        self.write(update_last_enter_date, user_name, date)
+        if user_name in self.profiles:
+            self.profiles[user_name]['last_enter_date'] = date
+
+    def add_interview_duration(self, user_name: str, seconds: int) -> None:
+        """Adds the time of the interview to the total of the user."""
+        profile = self.profiles.get(user_name)
+        if profile is None:
+            self.write(increase_interview_duration, user_name, seconds)
+            return
+        profile['interview_duration'] += seconds
+        self.write(update_interview_duration, user_name,
+                   profile['interview_duration'])
+
+
+def increase_interview_duration(user_name: str, seconds: int) -> None:
+    update_interview_duration(
+        user_name, get_user_interview_duration(user_name) + seconds
+        )
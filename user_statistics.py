@@ -1,7 +1,9 @@
 import datetime
 from typing import TypedDict
 
-from settings import QuestionThreshold as qt
+from quantile_sketch import QuantileSketch
+from questions import THEME_RANGES
+from settings import MAX_PACK_THEMES, SHORT_THEME_NAMES
 
 
 class StatInformation(TypedDict):
@@ -16,67 +18,66 @@ class StatInformation(TypedDict):
     sql_progress: float
 
 
-def get_right_answers_amount(progress: dict) -> StatInformation:
-    # Summary progress
-    right_answers_amount = len([right for right in progress.values() if right])
-    amount_of_answers = max(progress) - 7
-    percentage_completion = (
-        f'{round(100 * right_answers_amount / amount_of_answers, 1)}%'
+def get_snapshot_statistics(
+        theme_snapshots: dict[int, dict],
+        theme_ranges: dict[int, tuple[int, int]] = THEME_RANGES
+        ) -> StatInformation:
+    """Makes the statistics from the precomputed theme snapshots.
+    Themes of the pack fill the progress bars in their order,
+    bars which the pack has no theme for are empty.
+    """
+    theme_progress = [
+        round(
+            theme_snapshots.get(theme, {}).get('right_amount', 0)
+            / (last_question - first_question + 1), 1
+            )
+        for theme, (first_question, last_question) in theme_ranges.items()
+        ]
+    theme_progress += [0.0] * (MAX_PACK_THEMES - len(theme_progress))
+    right_answers_amount = sum(
+        theme_snapshots.get(theme, {}).get('right_amount', 0)
+        for theme in theme_ranges
         )
-
-    # Patricular progress
-    basic_amount = qt.BASIC_LAST_QUESTION - qt.BASIC_FIRST_QUESTION
-    oop_amount = qt.OOP_LAST_QUESTION - qt.OOP_FIRST_QUESTION
-    pep_amount = qt.PEP8_LAST_QUESTION - qt.PEP8_FIRST_QUESTION
-    structures_amount = (
-        qt.STRUCTURES_LAST_QUESTION - qt.STRUCTURES_FIRST_QUESTION
-        )
-    alghorimts_amount = (
-        qt.ALGHORITMS_LAST_QUESTION - qt.ALGHORITMS_FIRST_QUESTION
-        )
-    git_amount = qt.GIT_LAST_QUESTION - qt.GIT_FIRST_QUESTION
-    sql_amount = qt.SQL_LAST_QUESTION - qt.SQL_FIRST_QUESTION
-
-    basic_progress = get_paticular_progress(
-        progress, basic_amount, qt.BASIC_FIRST_QUESTION, qt.BASIC_LAST_QUESTION
-        )
-    oop_progress = get_paticular_progress(
-        progress, oop_amount, qt.OOP_FIRST_QUESTION, qt.OOP_LAST_QUESTION
-        )
-    pep_progress = get_paticular_progress(
-        progress, pep_amount, qt.PEP8_FIRST_QUESTION, qt.PEP8_LAST_QUESTION
-        )
-    structures_progress = get_paticular_progress(
-        progress, structures_amount,
-        qt.STRUCTURES_FIRST_QUESTION,
-        qt.STRUCTURES_LAST_QUESTION
-        )
-    alghorimts_progress = get_paticular_progress(
-        progress,
-        alghorimts_amount,
-        qt.ALGHORITMS_FIRST_QUESTION,
-        qt.ALGHORITMS_LAST_QUESTION
-        )
-    git_progress = get_paticular_progress(
-        progress, git_amount, qt.GIT_FIRST_QUESTION, qt.GIT_LAST_QUESTION
+    amount_of_answers = sum(
+        last_question - first_question + 1
+        for first_question, last_question in theme_ranges.values()
         )
-    sql_progress = get_paticular_progress(
-        progress, sql_amount, qt.SQL_FIRST_QUESTION, qt.SQL_LAST_QUESTION
-        )
-
     return StatInformation(
         right_answers_amount=f'{right_answers_amount} из {amount_of_answers}',
-        percentage_completion=percentage_completion,
-        basic_progress=basic_progress,
-        oop_progress=oop_progress,
-        pep_progress=pep_progress,
-        structures_progress=structures_progress,
-        alghorimts_progress=alghorimts_progress,
-        git_progress=git_progress,
-        sql_progress=sql_progress,
+        percentage_completion=(
+            f'{round(100 * right_answers_amount / amount_of_answers, 1)}%'
+            ),
+        basic_progress=theme_progress[0],
+        oop_progress=theme_progress[1],
+        pep_progress=theme_progress[2],
+        structures_progress=theme_progress[3],
+        alghorimts_progress=theme_progress[4],
+        git_progress=theme_progress[5],
+        sql_progress=theme_progress[6],
         )
 
 
+def get_latency_message(theme_snapshots: dict[int, dict],
+                        theme_names: dict[int, str] | None = None) -> str:
+    """Makes lines with the median and 90th percentile
+    of answer time for every theme.
+    """
+    if theme_names is None:
+        theme_names = dict(enumerate(SHORT_THEME_NAMES))
+    lines = []
+    for theme, theme_name in theme_names.items():
+        sketch = QuantileSketch.from_bytes(
+            theme_snapshots.get(theme, {}).get('latency_sketch')
+            )
+        if sketch.count:
+            median = convert_ms_to_seconds(sketch.quantile(0.5))
+            slow = convert_ms_to_seconds(sketch.quantile(0.9))
+            lines.append(f'{theme_name}: {median} / {slow} с')
+        else:
+            lines.append(f'{theme_name}: нет ответов')
+    return '\n'.join(lines)
+
+
 def get_last_enter_message(date) -> str:
     return (
         f'{date.day}.{date.month}.{date.year}'
@@ -85,22 +86,16 @@ def get_last_enter_message(date) -> str:
         )
 
 
-def get_paticular_progress(
-        user_progress: dict, amount_kind: int, from_: int, to_: int) -> float:
-    return round(
-        len(
-            [is_right for question_number, is_right in user_progress.items()
-             if question_number
-             in range(from_, to_) and is_right]) / amount_kind, 1
-             )
-
-
 def count_interview_duration(start_date, stop_date) -> int:
     time_difference = stop_date - start_date
     difference_in_seconds = time_difference.total_seconds()
     return int(difference_in_seconds)
 
 
+def convert_ms_to_seconds(milliseconds: float) -> float:
+    return round(milliseconds / 1000, 1)
+
+
 def convert_seconds_to_hours(seconds: int) -> float:
     hours = seconds / 3600
     hours_decimal = round(hours, 1)
@@ -1,26 +1,57 @@
-from manage_db import get_user_names
-from settings import WRONG_SYMBOLS
-
-
-def is_name_empty(user_name: str) -> bool:
-    return len(user_name) == 0
-
-
-def is_name_too_short(user_name: str) -> bool:
-    return len(user_name) < 2
-
-
-def has_name_first_wrong_symbol(user_name: str) -> bool:
-    return user_name[0] in (' ', *WRONG_SYMBOLS, *map(str, range(10)))
-
-
-def has_name_wrong_symbols(user_name: str) -> bool:
-    return any({symbol in WRONG_SYMBOLS for symbol in user_name})
-
-
-def is_name_too_long(user_name: str) -> bool:
-    return len(user_name) > 25
-
-
-def is_user_already_exists(user_name: str) -> bool:
-    return user_name in get_user_names()
+"""Validation of user names.
+
+The checks are built once at import: a regex class of the wrong
+symbols, which finds them in one pass in C, and a set of symbols
+a name must not start with. validate_names checks whole rosters
+against the user directory and the names before them at once.
+"""
+import re
+from typing import Container, Iterable
+
+from user_directory import user_directory
+from settings import (MAX_NAME_LENGTH, MIN_NAME_LENGTH, ValidResponse,
+                      WRONG_FIRST_SYMBOLS, WRONG_SYMBOLS)
+
+WRONG_SYMBOLS_PATTERN = re.compile(f'[{re.escape("".join(WRONG_SYMBOLS))}]')
+WRONG_FIRST_SYMBOLS_SET = frozenset(WRONG_FIRST_SYMBOLS)
+
+
+def validate_name(user_name: str,
+                  user_names: Container[str] = user_directory
+                  ) -> list[ValidResponse]:
+    """Returns every violation of the name, the empty list if it is valid.
+
+    The first violation is the message shown to the user.
+    """
+    if not user_name:
+        return [ValidResponse.EMPTY_NAME]
+    violations = []
+    if len(user_name) < MIN_NAME_LENGTH:
+        violations.append(ValidResponse.SHORT_NAME)
+    elif len(user_name) > MAX_NAME_LENGTH:
+        violations.append(ValidResponse.NAME_TOO_LONG)
+    if user_name[0] in WRONG_FIRST_SYMBOLS_SET:
+        violations.append(ValidResponse.WRONG_FIRST_SYMBOL)
+    if WRONG_SYMBOLS_PATTERN.search(user_name) is not None:
+        violations.append(ValidResponse.WRONG_SYMBOLS)
+    if user_name in user_names:
+        violations.append(ValidResponse.USER_ALREADY_EXISTS)
+    return violations
+
+
+def validate_names(user_names: Iterable[str],
+                   existing_names: Container[str] = user_directory
+                   ) -> list[list[ValidResponse]]:
+    """Validates the names of a roster, a name repeated in it
+    is taken by its first occurrence.
+    """
+    seen: set[str] = set()
+    results = []
+    for user_name in user_names:
+        violations = validate_name(user_name, existing_names)
+        if (user_name in seen
+                and ValidResponse.USER_ALREADY_EXISTS not in violations):
+            violations.append(ValidResponse.USER_ALREADY_EXISTS)
+        seen.add(user_name)
+        results.append(violations)
+    return results